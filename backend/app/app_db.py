@@ -3,6 +3,8 @@ from __future__ import annotations
 import logging
 import os
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from typing import Any, Iterator, Sequence
@@ -45,19 +47,95 @@ def _dict_from_row(row: sqlite3.Row | None) -> dict[str, Any] | None:
     return {key: row[key] for key in row.keys()}
 
 
-@contextmanager
-def get_app_db() -> Iterator[sqlite3.Connection]:
-    connection = sqlite3.connect(settings.app_db_path, timeout=30, check_same_thread=False)
+def _open_connection(path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(
+        path,
+        timeout=settings.app_db_busy_timeout_ms / 1000,
+        check_same_thread=False,
+    )
     connection.row_factory = sqlite3.Row
+    # WAL itself is a property of the database file (set in init_app_db); these
+    # are per connection and only need applying once since connections are reused.
+    connection.execute("PRAGMA foreign_keys = ON")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    connection.execute(f"PRAGMA busy_timeout = {settings.app_db_busy_timeout_ms}")
+    connection.execute(f"PRAGMA cache_size = -{settings.app_db_cache_mb * 1024}")
+    connection.execute(f"PRAGMA mmap_size = {settings.app_db_mmap_mb * 1024 * 1024}")
+    connection.execute("PRAGMA temp_store = MEMORY")
+    return connection
+
+
+class _ConnectionPool:
+    """
+    Idle app DB connections shared across threads.
+
+    A connection is handed to one caller at a time and comes back with no open
+    transaction; up to APP_DB_POOL_SIZE are kept, extra ones are closed on
+    release. Connections for a previous APP_DB_PATH are never reused.
+    """
+
+    def __init__(self) -> None:
+        self._idle: list[tuple[str, sqlite3.Connection]] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> sqlite3.Connection:
+        path = settings.app_db_path
+        with self._lock:
+            while self._idle:
+                idle_path, connection = self._idle.pop()
+                if idle_path == path:
+                    return connection
+                connection.close()
+        return _open_connection(path)
+
+    def release(self, connection: sqlite3.Connection) -> None:
+        with self._lock:
+            if len(self._idle) < settings.app_db_pool_size:
+                self._idle.append((settings.app_db_path, connection))
+                return
+        connection.close()
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for _path, connection in idle:
+            connection.close()
+
+
+_POOL = _ConnectionPool()
+
+
+@contextmanager
+def get_app_db(*, readonly: bool = False) -> Iterator[sqlite3.Connection]:
+    """
+    Pooled connection for one unit of work: committed on success, rolled back on
+    error. Read-only callers skip the commit.
+    """
+    connection = _POOL.acquire()
+    reusable = False
     try:
-        connection.execute("PRAGMA foreign_keys = ON")
         yield connection
-        connection.commit()
-    except Exception:
-        connection.rollback()
+        if readonly:
+            connection.rollback()
+        else:
+            connection.commit()
+        reusable = True
+    except BaseException:
+        try:
+            connection.rollback()
+            reusable = True
+        except sqlite3.Error:
+            pass
         raise
     finally:
-        connection.close()
+        if reusable:
+            _POOL.release(connection)
+        else:
+            connection.close()
+
+
+def close_app_db() -> None:
+    _POOL.close_all()
 
 
 def init_app_db() -> None:
@@ -66,6 +144,8 @@ def init_app_db() -> None:
         os.makedirs(directory, exist_ok=True)
 
     with get_app_db() as conn:
+        # Persistent for the database file: readers no longer wait for writers.
+        conn.execute("PRAGMA journal_mode = WAL")
         conn.executescript(
             """
             CREATE TABLE IF NOT EXISTS users (
@@ -80,6 +160,13 @@ def init_app_db() -> None:
                 last_login_at TEXT NULL
             );
 
+            -- Version per user, taken from one sequence across all users, so
+            -- workers can ask for "everything changed since N".
+            CREATE TABLE IF NOT EXISTS user_changes (
+                user_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL
+            );
+
             CREATE TABLE IF NOT EXISTS password_resets (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 user_id INTEGER NOT NULL,
@@ -131,13 +218,93 @@ def init_app_db() -> None:
                 error TEXT
             );
 
+            CREATE TABLE IF NOT EXISTS notification_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT NOT NULL,
+                end_date TEXT NULL,
+                card_no TEXT NULL,
+                status TEXT NOT NULL,
+                requested_by TEXT NULL,
+                total_targets INTEGER NOT NULL DEFAULT 0,
+                results TEXT NULL,
+                error TEXT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at TEXT NOT NULL,
+                claim_token TEXT NULL,
+                claimed_at TEXT NULL,
+                created_at TEXT NOT NULL,
+                started_at TEXT NULL,
+                finished_at TEXT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS notification_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id INTEGER NOT NULL REFERENCES notification_jobs(id) ON DELETE CASCADE,
+                card_no TEXT NOT NULL,
+                date TEXT NOT NULL,
+                type TEXT NOT NULL,
+                employee_name TEXT NULL,
+                to_email TEXT NOT NULL,
+                cc TEXT NULL,
+                subject TEXT NOT NULL,
+                body TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at TEXT NOT NULL,
+                last_error TEXT NULL,
+                claim_token TEXT NULL,
+                claimed_at TEXT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                sent_at TEXT NULL,
+                UNIQUE (card_no, date, type)
+            );
+
+            CREATE TABLE IF NOT EXISTS schedules (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                task TEXT NOT NULL,
+                cron TEXT NOT NULL,
+                params TEXT NOT NULL DEFAULT '{}',
+                enabled INTEGER NOT NULL DEFAULT 1,
+                next_run_at TEXT NULL,
+                last_run_at TEXT NULL,
+                last_status TEXT NULL,
+                last_message TEXT NULL,
+                updated_at TEXT NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS scheduler_leases (
+                name TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at TEXT NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS report_cache (
+                kind TEXT NOT NULL,
+                period TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                computed_at TEXT NOT NULL,
+                PRIMARY KEY (kind, period)
+            );
+
             CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
+            CREATE INDEX IF NOT EXISTS idx_user_changes_version ON user_changes(version);
+            CREATE INDEX IF NOT EXISTS idx_notification_jobs_status ON notification_jobs(status, next_attempt_at);
+            CREATE INDEX IF NOT EXISTS idx_notification_outbox_due ON notification_outbox(status, next_attempt_at);
+            CREATE INDEX IF NOT EXISTS idx_notification_outbox_job ON notification_outbox(job_id);
             CREATE INDEX IF NOT EXISTS idx_password_resets_hash ON password_resets(token_hash);
             CREATE INDEX IF NOT EXISTS idx_employee_settings_card ON employee_settings(card_no);
-            CREATE INDEX IF NOT EXISTS idx_notifications_log_date ON notifications_log(date);
+            DROP INDEX IF EXISTS idx_notifications_log_date;
+            CREATE INDEX IF NOT EXISTS idx_notifications_log_card_id ON notifications_log(card_no, id);
+            CREATE INDEX IF NOT EXISTS idx_notifications_log_card_date ON notifications_log(card_no, date, type, status);
+            CREATE INDEX IF NOT EXISTS idx_notifications_log_date_type ON notifications_log(date, type, status);
+            CREATE INDEX IF NOT EXISTS idx_notifications_log_status_type ON notifications_log(status, type, id);
+            CREATE INDEX IF NOT EXISTS idx_notifications_log_type_id ON notifications_log(type, id);
             """
         )
         _migrate_users_role_schema(conn)
+        _migrate_notification_jobs_schema(conn)
         _normalize_legacy_roles(conn)
 
     ensure_default_admin_user()
@@ -203,6 +370,12 @@ def _migrate_users_role_schema(conn: sqlite3.Connection) -> None:
     )
 
 
+def _migrate_notification_jobs_schema(conn: sqlite3.Connection) -> None:
+    columns = {str(row["name"]) for row in conn.execute("PRAGMA table_info(notification_jobs)").fetchall()}
+    if "end_date" not in columns:
+        conn.execute("ALTER TABLE notification_jobs ADD COLUMN end_date TEXT NULL")
+
+
 def _normalize_legacy_roles(conn: sqlite3.Connection) -> None:
     now = utc_now_iso()
     conn.execute(
@@ -242,7 +415,7 @@ def get_user_by_login(login: str) -> dict[str, Any] | None:
     if not normalized:
         return None
 
-    with get_app_db() as conn:
+    with get_app_db(readonly=True) as conn:
         row = conn.execute(
             """
             SELECT id, email, username, role, password_hash, is_active, created_at, updated_at, last_login_at
@@ -260,7 +433,7 @@ def get_user_by_login(login: str) -> dict[str, Any] | None:
 
 
 def get_user_by_id(user_id: int) -> dict[str, Any] | None:
-    with get_app_db() as conn:
+    with get_app_db(readonly=True) as conn:
         row = conn.execute(
             """
             SELECT id, email, username, role, password_hash, is_active, created_at, updated_at, last_login_at
@@ -277,6 +450,107 @@ def get_user_by_id(user_id: int) -> dict[str, Any] | None:
     return _normalize_user_payload(payload)
 
 
+def _bump_user_version(conn: sqlite3.Connection, user_id: int) -> None:
+    # Writers are serialized by SQLite, so MAX + 1 stays unique.
+    conn.execute(
+        """
+        INSERT INTO user_changes (user_id, version)
+        VALUES (?, (SELECT COALESCE(MAX(version), 0) + 1 FROM user_changes))
+        ON CONFLICT(user_id) DO UPDATE SET version = excluded.version
+        """,
+        (user_id,),
+    )
+
+
+# Other workers' changes are looked up at most this often.
+_USER_SYNC_SECONDS = 1.0
+
+
+class _UserCache:
+    """
+    Users by id for the auth dependency, kept for AUTH_USER_CACHE_SECONDS.
+
+    Every entry remembers the user's version from user_changes. Writes in this
+    process drop the entry straight after commit; writes from other workers
+    are found by polling user_changes for versions newer than the last seen.
+    The generation counter stops a load that raced an invalidation from
+    storing what it read.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[int, tuple[dict[str, Any], int, float]] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._seen_version = 0
+        self._synced_at = 0.0
+
+    def get(self, user_id: int) -> dict[str, Any] | None:
+        now = time.monotonic()
+        if now - self._synced_at >= _USER_SYNC_SECONDS:
+            self._sync(now)
+
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[2] > now:
+            return entry[0]
+
+        generation = self._generation
+        with get_app_db(readonly=True) as conn:
+            row = conn.execute(
+                """
+                SELECT u.id, u.email, u.username, u.role, u.password_hash, u.is_active,
+                       u.created_at, u.updated_at, u.last_login_at, COALESCE(c.version, 0) AS version
+                FROM users u
+                LEFT JOIN user_changes c ON c.user_id = u.id
+                WHERE u.id = ?
+                """,
+                (user_id,),
+            ).fetchone()
+        payload = _dict_from_row(row)
+        if not payload:
+            return None
+        version = int(payload.pop("version"))
+        user = _normalize_user_payload(payload)
+        with self._lock:
+            if self._generation == generation:
+                self._entries[user_id] = (user, version, now + settings.auth_user_cache_seconds)
+        return user
+
+    def forget(self, user_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+
+    def _sync(self, now: float) -> None:
+        with self._lock:
+            if now - self._synced_at < _USER_SYNC_SECONDS:
+                return
+            self._synced_at = now
+            since = self._seen_version
+        with get_app_db(readonly=True) as conn:
+            rows = conn.execute(
+                "SELECT user_id, version FROM user_changes WHERE version > ?",
+                (since,),
+            ).fetchall()
+        if not rows:
+            return
+        with self._lock:
+            self._generation += 1
+            for row in rows:
+                entry = self._entries.get(int(row["user_id"]))
+                if entry is not None and entry[1] < int(row["version"]):
+                    del self._entries[int(row["user_id"])]
+            self._seen_version = max(self._seen_version, max(int(row["version"]) for row in rows))
+
+
+_USER_CACHE = _UserCache()
+
+
+def get_cached_user(user_id: int) -> dict[str, Any] | None:
+    if settings.auth_user_cache_seconds <= 0:
+        return get_user_by_id(user_id)
+    return _USER_CACHE.get(user_id)
+
+
 def touch_user_login(user_id: int) -> None:
     now = utc_now_iso()
     with get_app_db() as conn:
@@ -287,7 +561,7 @@ def touch_user_login(user_id: int) -> None:
 
 
 def list_users() -> list[dict[str, Any]]:
-    with get_app_db() as conn:
+    with get_app_db(readonly=True) as conn:
         rows = conn.execute(
             """
             SELECT id, email, username, role, is_active, created_at, updated_at, last_login_at
@@ -381,6 +655,8 @@ def update_user(
         sql += " WHERE id = ?"
         params.append(user_id)
         conn.execute(sql, tuple(params))
+        _bump_user_version(conn, user_id)
+    _USER_CACHE.forget(user_id)
 
     user = get_user_by_id(user_id)
     if not user:
@@ -392,10 +668,12 @@ def delete_user(user_id: int) -> None:
     with get_app_db() as conn:
         conn.execute("DELETE FROM password_resets WHERE user_id = ?", (user_id,))
         conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        _bump_user_version(conn, user_id)
+    _USER_CACHE.forget(user_id)
 
 
 def count_active_admin_users() -> int:
-    with get_app_db() as conn:
+    with get_app_db(readonly=True) as conn:
         row = conn.execute(
             "SELECT COUNT(1) AS cnt FROM users WHERE role = 'admin' AND is_active = 1"
         ).fetchone()
@@ -421,6 +699,8 @@ def set_user_active(user_id: int, is_active: bool) -> None:
             "UPDATE users SET is_active = ?, updated_at = ? WHERE id = ?",
             (1 if is_active else 0, now, user_id),
         )
+        _bump_user_version(conn, user_id)
+    _USER_CACHE.forget(user_id)
 
 
 def set_user_password(user_id: int, new_password: str) -> None:
@@ -430,6 +710,8 @@ def set_user_password(user_id: int, new_password: str) -> None:
             "UPDATE users SET password_hash = ?, updated_at = ? WHERE id = ?",
             (hash_password(new_password), now, user_id),
         )
+        _bump_user_version(conn, user_id)
+    _USER_CACHE.forget(user_id)
 
 
 def create_password_reset(user_id: int) -> str:
@@ -490,12 +772,14 @@ def redeem_password_reset(token: str, new_password: str) -> bool:
             "UPDATE password_resets SET used_at = ? WHERE id = ?",
             (updated_at, reset_id),
         )
+        _bump_user_version(conn, user_id)
+    _USER_CACHE.forget(user_id)
 
     return True
 
 
 def get_smtp_settings(include_password: bool = False) -> dict[str, Any]:
-    with get_app_db() as conn:
+    with get_app_db(readonly=True) as conn:
         row = conn.execute(
             """
             SELECT id, host, port, username, password_encrypted, from_email, from_name,
@@ -623,7 +907,7 @@ def get_employee_settings_map(card_nos: Sequence[str]) -> dict[str, dict[str, An
         f"FROM employee_settings WHERE card_no IN ({placeholders})"
     )
 
-    with get_app_db() as conn:
+    with get_app_db(readonly=True) as conn:
         rows = conn.execute(sql, tuple(normalized)).fetchall()
 
     data: dict[str, dict[str, Any]] = {}
@@ -640,7 +924,7 @@ def get_employee_settings_map(card_nos: Sequence[str]) -> dict[str, dict[str, An
 
 
 def get_employee_setting(card_no: str) -> dict[str, Any] | None:
-    with get_app_db() as conn:
+    with get_app_db(readonly=True) as conn:
         row = conn.execute(
             """
             SELECT id, card_no, emp_id, employee_name_cache, employee_email, work_start_time, work_end_time,
@@ -734,7 +1018,7 @@ def upsert_employee_setting(data: dict[str, Any]) -> dict[str, Any]:
 
 
 def list_notification_targets(card_no: str | None = None) -> list[dict[str, Any]]:
-    with get_app_db() as conn:
+    with get_app_db(readonly=True) as conn:
         if card_no:
             rows = conn.execute(
                 """
@@ -772,35 +1056,495 @@ def insert_notification_log(
     status: str,
     error: str | None,
 ) -> None:
+    insert_notification_logs(
+        [
+            {
+                "card_no": card_no,
+                "date_value": date_value,
+                "notice_type": notice_type,
+                "to_email": to_email,
+                "cc": cc,
+                "status": status,
+                "error": error,
+            }
+        ]
+    )
+
+
+def insert_notification_logs(entries: Sequence[dict[str, Any]]) -> None:
+    """Write many log rows in one transaction; entries take insert_notification_log's keywords."""
+    if not entries:
+        return
     with get_app_db() as conn:
-        conn.execute(
+        conn.executemany(
             """
             INSERT INTO notifications_log (card_no, date, type, to_email, cc, sent_at, status, error)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (
-                card_no,
-                date_value,
-                notice_type,
-                to_email,
-                cc,
-                utc_now_iso(),
-                status,
-                error,
-            ),
+            [
+                (
+                    entry["card_no"],
+                    entry["date_value"],
+                    entry["notice_type"],
+                    entry["to_email"],
+                    entry["cc"],
+                    entry.get("sent_at") or utc_now_iso(),
+                    entry["status"],
+                    entry.get("error"),
+                )
+                for entry in entries
+            ],
         )
 
 
-def list_notification_logs(limit: int = 100) -> list[dict[str, Any]]:
-    with get_app_db() as conn:
+def _notification_log_filters(
+    *,
+    card_no: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    notice_type: str | None = None,
+    status: str | None = None,
+) -> tuple[list[str], list[Any]]:
+    clauses: list[str] = []
+    params: list[Any] = []
+    for column, value in (("card_no", card_no), ("type", notice_type), ("status", status)):
+        if value:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if date_from:
+        clauses.append("date >= ?")
+        params.append(date_from)
+    if date_to:
+        clauses.append("date <= ?")
+        params.append(date_to)
+    return clauses, params
+
+
+def list_notification_logs(
+    limit: int = 100,
+    *,
+    after_id: int | None = None,
+    card_no: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    notice_type: str | None = None,
+    status: str | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Newest-first page of log rows.
+
+    `after_id` is a keyset cursor: pass the id of the last row of the previous
+    page to get the rows that follow it (older ids), without OFFSET scans.
+    """
+    clauses, params = _notification_log_filters(
+        card_no=card_no,
+        date_from=date_from,
+        date_to=date_to,
+        notice_type=notice_type,
+        status=status,
+    )
+    if after_id is not None:
+        clauses.append("id < ?")
+        params.append(after_id)
+    where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with get_app_db(readonly=True) as conn:
         rows = conn.execute(
-            """
+            f"""
             SELECT id, card_no, date, type, to_email, cc, sent_at, status, error
             FROM notifications_log
+            {where_sql}
             ORDER BY id DESC
             LIMIT ?
             """,
-            (max(1, min(limit, 500)),),
+            (*params, max(1, min(limit, 500))),
+        ).fetchall()
+
+    return [_dict_from_row(row) for row in rows if row is not None]
+
+
+def count_notification_logs(
+    *,
+    card_no: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    notice_type: str | None = None,
+    status: str | None = None,
+) -> int:
+    clauses, params = _notification_log_filters(
+        card_no=card_no,
+        date_from=date_from,
+        date_to=date_to,
+        notice_type=notice_type,
+        status=status,
+    )
+    where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with get_app_db(readonly=True) as conn:
+        row = conn.execute(f"SELECT COUNT(*) AS total FROM notifications_log {where_sql}", params).fetchone()
+    return int(row["total"]) if row else 0
+
+
+def list_sent_notice_keys(date_from: str, date_to: str) -> set[tuple[str, str, str]]:
+    """
+    (card_no, date, type) of notices logged as sent in the date range with no outbox row.
+
+    Those were sent before the outbox existed; anything that went through the
+    outbox is deduplicated by its unique key instead.
+    """
+    with get_app_db(readonly=True) as conn:
+        rows = conn.execute(
+            """
+            SELECT DISTINCT l.card_no, l.date, l.type
+            FROM notifications_log l
+            WHERE l.date >= ? AND l.date <= ? AND l.status = 'SENT'
+              AND NOT EXISTS (
+                  SELECT 1 FROM notification_outbox o
+                  WHERE o.card_no = l.card_no AND o.date = l.date AND o.type = l.type
+              )
+            """,
+            (date_from, date_to),
+        ).fetchall()
+    return {(str(row["card_no"]), str(row["date"]), str(row["type"])) for row in rows}
+
+
+def create_notification_job(
+    *,
+    date_value: str,
+    card_no: str | None,
+    requested_by: str | None,
+    end_date_value: str | None = None,
+) -> dict[str, Any]:
+    now = utc_now_iso()
+    with get_app_db() as conn:
+        cursor = conn.execute(
+            """
+            INSERT INTO notification_jobs (date, end_date, card_no, status, requested_by, next_attempt_at, created_at)
+            VALUES (?, ?, ?, 'queued', ?, ?, ?)
+            """,
+            (date_value, end_date_value, card_no, requested_by, now, now),
+        )
+        job_id = int(cursor.lastrowid)
+    return get_notification_job(job_id) or {}
+
+
+def get_notification_job(job_id: int) -> dict[str, Any] | None:
+    with get_app_db(readonly=True) as conn:
+        row = conn.execute("SELECT * FROM notification_jobs WHERE id = ?", (job_id,)).fetchone()
+    return _dict_from_row(row)
+
+
+def claim_notification_job(claim_token: str) -> dict[str, Any] | None:
+    # A single UPDATE picks and claims the job, so concurrent workers (one per
+    # API process) never take the same one.
+    now = utc_now_iso()
+    with get_app_db() as conn:
+        conn.execute(
+            """
+            UPDATE notification_jobs
+            SET status = 'running', claim_token = ?, claimed_at = ?, started_at = COALESCE(started_at, ?),
+                attempts = attempts + 1
+            WHERE id = (
+                SELECT id FROM notification_jobs
+                WHERE status = 'queued' AND next_attempt_at <= ?
+                ORDER BY id
+                LIMIT 1
+            )
+            """,
+            (claim_token, now, now, now),
+        )
+        row = conn.execute(
+            "SELECT * FROM notification_jobs WHERE claim_token = ? AND status = 'running'",
+            (claim_token,),
+        ).fetchone()
+    return _dict_from_row(row)
+
+
+def update_notification_job(job_id: int, **fields: Any) -> None:
+    allowed = {"status", "total_targets", "results", "error", "next_attempt_at", "claim_token", "claimed_at", "finished_at"}
+    columns = [name for name in fields if name in allowed]
+    if not columns:
+        return
+    with get_app_db() as conn:
+        conn.execute(
+            f"UPDATE notification_jobs SET {', '.join(f'{name} = ?' for name in columns)} WHERE id = ?",
+            (*(fields[name] for name in columns), job_id),
+        )
+
+
+def enqueue_notification_outbox(job_id: int, messages: Sequence[dict[str, Any]]) -> list[bool]:
+    """
+    Queue messages for delivery; one flag per message, False for a duplicate.
+
+    (card_no, date, type) is unique: a notice already pending or sent by
+    another job is not queued again, while one that finally failed is re-armed
+    under this job.
+    """
+    now = utc_now_iso()
+    queued: list[bool] = []
+    with get_app_db() as conn:
+        for message in messages:
+            cursor = conn.execute(
+                """
+                INSERT INTO notification_outbox (
+                    job_id, card_no, date, type, employee_name, to_email, cc, subject, body,
+                    status, next_attempt_at, created_at, updated_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending', ?, ?, ?)
+                ON CONFLICT (card_no, date, type) DO UPDATE SET
+                    job_id = excluded.job_id,
+                    employee_name = excluded.employee_name,
+                    to_email = excluded.to_email,
+                    cc = excluded.cc,
+                    subject = excluded.subject,
+                    body = excluded.body,
+                    status = 'pending',
+                    attempts = 0,
+                    next_attempt_at = excluded.next_attempt_at,
+                    last_error = NULL,
+                    updated_at = excluded.updated_at
+                WHERE notification_outbox.status = 'failed'
+                """,
+                (
+                    job_id,
+                    message["card_no"],
+                    message["date"],
+                    message["notice_type"],
+                    message.get("employee_name"),
+                    message["to_email"],
+                    message.get("cc") or "",
+                    message["subject"],
+                    message["body"],
+                    now,
+                    now,
+                    now,
+                ),
+            )
+            if cursor.rowcount > 0:
+                queued.append(True)
+                continue
+            # A resumed job re-evaluates; its own rows are not duplicates.
+            owner = conn.execute(
+                "SELECT job_id FROM notification_outbox WHERE card_no = ? AND date = ? AND type = ?",
+                (message["card_no"], message["date"], message["notice_type"]),
+            ).fetchone()
+            queued.append(bool(owner) and int(owner["job_id"]) == job_id)
+    return queued
+
+
+def claim_due_notification_outbox(claim_token: str, limit: int) -> list[dict[str, Any]]:
+    now = utc_now_iso()
+    with get_app_db() as conn:
+        conn.execute(
+            """
+            UPDATE notification_outbox
+            SET status = 'sending', claim_token = ?, claimed_at = ?, updated_at = ?
+            WHERE id IN (
+                SELECT id FROM notification_outbox
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                ORDER BY next_attempt_at, id
+                LIMIT ?
+            )
+            """,
+            (claim_token, now, now, now, max(1, limit)),
+        )
+        rows = conn.execute(
+            "SELECT * FROM notification_outbox WHERE claim_token = ? AND status = 'sending' ORDER BY id",
+            (claim_token,),
+        ).fetchall()
+    return [_dict_from_row(row) for row in rows if row is not None]
+
+
+def finish_notification_outbox(
+    outbox_id: int,
+    *,
+    status: str,
+    error: str | None = None,
+    next_attempt_at: str | None = None,
+) -> None:
+    now = utc_now_iso()
+    with get_app_db() as conn:
+        conn.execute(
+            """
+            UPDATE notification_outbox
+            SET status = ?, last_error = ?, attempts = attempts + 1,
+                next_attempt_at = COALESCE(?, next_attempt_at), claim_token = NULL, updated_at = ?,
+                sent_at = CASE WHEN ? = 'sent' THEN ? ELSE sent_at END
+            WHERE id = ?
+            """,
+            (status, error, next_attempt_at, now, status, now, outbox_id),
+        )
+
+
+def release_stale_notification_claims(older_than: str) -> None:
+    # Claims left behind by a process that died mid-run go back to the queue.
+    with get_app_db() as conn:
+        conn.execute(
+            """
+            UPDATE notification_outbox
+            SET status = 'pending', claim_token = NULL
+            WHERE status = 'sending' AND claimed_at < ?
+            """,
+            (older_than,),
+        )
+        conn.execute(
+            """
+            UPDATE notification_jobs
+            SET status = 'queued', claim_token = NULL
+            WHERE status = 'running' AND claimed_at < ?
+            """,
+            (older_than,),
+        )
+
+
+def complete_drained_notification_jobs() -> None:
+    now = utc_now_iso()
+    with get_app_db() as conn:
+        conn.execute(
+            """
+            UPDATE notification_jobs
+            SET status = 'completed', finished_at = ?
+            WHERE status = 'sending'
+              AND NOT EXISTS (
+                  SELECT 1 FROM notification_outbox o
+                  WHERE o.job_id = notification_jobs.id AND o.status IN ('pending', 'sending')
+              )
+            """,
+            (now,),
+        )
+
+
+def list_notification_outbox_for_job(job_id: int) -> list[dict[str, Any]]:
+    with get_app_db(readonly=True) as conn:
+        rows = conn.execute(
+            """
+            SELECT id, card_no, date, type, employee_name, to_email, cc, status, attempts,
+                   next_attempt_at, last_error, sent_at
+            FROM notification_outbox
+            WHERE job_id = ?
+            ORDER BY card_no, type
+            """,
+            (job_id,),
         ).fetchall()
+    return [_dict_from_row(row) for row in rows if row is not None]
+
+
+def ensure_schedules(defaults: Sequence[dict[str, Any]]) -> None:
+    # Defaults are only inserted once; edits made through the API are kept.
+    now = utc_now_iso()
+    with get_app_db() as conn:
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO schedules (name, task, cron, params, enabled, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (item["name"], item["task"], item["cron"], item.get("params") or "{}", 1 if item.get("enabled", True) else 0, now)
+                for item in defaults
+            ],
+        )
+
 
+def list_schedules() -> list[dict[str, Any]]:
+    with get_app_db(readonly=True) as conn:
+        rows = conn.execute("SELECT * FROM schedules ORDER BY name").fetchall()
     return [_dict_from_row(row) for row in rows if row is not None]
+
+
+def get_schedule(name: str) -> dict[str, Any] | None:
+    with get_app_db(readonly=True) as conn:
+        row = conn.execute("SELECT * FROM schedules WHERE name = ?", (name,)).fetchone()
+    return _dict_from_row(row)
+
+
+def update_schedule(name: str, *, cron: str | None = None, enabled: bool | None = None) -> dict[str, Any] | None:
+    with get_app_db() as conn:
+        if cron is not None:
+            # The next run is recomputed from the new rule by the scheduler.
+            conn.execute(
+                "UPDATE schedules SET cron = ?, next_run_at = NULL, updated_at = ? WHERE name = ?",
+                (cron, utc_now_iso(), name),
+            )
+        if enabled is not None:
+            conn.execute(
+                "UPDATE schedules SET enabled = ?, next_run_at = NULL, updated_at = ? WHERE name = ?",
+                (1 if enabled else 0, utc_now_iso(), name),
+            )
+    return get_schedule(name)
+
+
+def set_schedule_next_run(schedule_id: int, next_run_at: str) -> None:
+    with get_app_db() as conn:
+        conn.execute(
+            "UPDATE schedules SET next_run_at = ? WHERE id = ? AND next_run_at IS NULL",
+            (next_run_at, schedule_id),
+        )
+
+
+def claim_schedule_run(schedule_id: int, expected_next_run_at: str, next_run_at: str) -> bool:
+    # Compare-and-set on next_run_at: a run is started by exactly one process
+    # even if two briefly believe they hold the scheduler lease.
+    with get_app_db() as conn:
+        cursor = conn.execute(
+            """
+            UPDATE schedules
+            SET next_run_at = ?, last_run_at = ?, last_status = 'running', last_message = NULL
+            WHERE id = ? AND enabled = 1 AND next_run_at = ?
+            """,
+            (next_run_at, utc_now_iso(), schedule_id, expected_next_run_at),
+        )
+        return cursor.rowcount == 1
+
+
+def finish_schedule_run(schedule_id: int, *, status: str, message: str | None = None) -> None:
+    with get_app_db() as conn:
+        conn.execute(
+            "UPDATE schedules SET last_status = ?, last_message = ? WHERE id = ?",
+            (status, message, schedule_id),
+        )
+
+
+def acquire_lease(name: str, owner: str, ttl_seconds: int) -> bool:
+    """Take or renew the named lease; True while `owner` holds it."""
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    expires_at = (now + timedelta(seconds=ttl_seconds)).isoformat()
+    with get_app_db() as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO scheduler_leases (name, owner, expires_at) VALUES (?, ?, ?)",
+            (name, owner, expires_at),
+        )
+        cursor = conn.execute(
+            """
+            UPDATE scheduler_leases
+            SET owner = ?, expires_at = ?
+            WHERE name = ? AND (owner = ? OR expires_at < ?)
+            """,
+            (owner, expires_at, name, owner, now.isoformat()),
+        )
+        return cursor.rowcount == 1
+
+
+def release_lease(name: str, owner: str) -> None:
+    with get_app_db() as conn:
+        conn.execute("DELETE FROM scheduler_leases WHERE name = ? AND owner = ?", (name, owner))
+
+
+def get_cached_report(kind: str, period: str, *, newer_than: str) -> str | None:
+    with get_app_db(readonly=True) as conn:
+        row = conn.execute(
+            "SELECT payload FROM report_cache WHERE kind = ? AND period = ? AND computed_at >= ?",
+            (kind, period, newer_than),
+        ).fetchone()
+    return str(row["payload"]) if row else None
+
+
+def store_cached_report(kind: str, period: str, payload: str) -> None:
+    with get_app_db() as conn:
+        conn.execute(
+            """
+            INSERT INTO report_cache (kind, period, payload, computed_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (kind, period) DO UPDATE SET
+                payload = excluded.payload,
+                computed_at = excluded.computed_at
+            """,
+            (kind, period, payload, utc_now_iso()),
+        )
@@ -7,7 +7,7 @@ import jwt
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from .app_db import get_user_by_id
+from .app_db import get_cached_user
 from .config import settings
 
 TOKEN_COOKIE_NAME = "oc_hr_admin_token"
@@ -91,7 +91,7 @@ def get_current_user(
             detail="Invalid token subject",
         ) from exc
 
-    user = get_user_by_id(user_id)
+    user = get_cached_user(user_id)
     if not user or not bool(user.get("is_active")):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
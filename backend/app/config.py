@@ -34,6 +34,11 @@ def _default_app_db_path() -> str:
     return os.path.join(backend_root, "data", "app.db")
 
 
+def _default_pdf_cache_dir() -> str:
+    backend_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    return os.path.join(backend_root, "data", "pdf_cache")
+
+
 @dataclass(frozen=True)
 class Settings:
     db_server: str
@@ -47,11 +52,16 @@ class Settings:
     admin_email: str
 
     app_db_path: str
+    app_db_pool_size: int
+    app_db_busy_timeout_ms: int
+    app_db_cache_mb: int
+    app_db_mmap_mb: int
     app_encryption_key: str | None
 
     jwt_secret: str
     jwt_algorithm: str
     jwt_expires_minutes: int
+    auth_user_cache_seconds: int
     password_reset_expiry_minutes: int
 
     allow_origins: List[str]
@@ -59,11 +69,31 @@ class Settings:
     rate_limit_max_requests: int
     shift_out_cutoff_hours: int
     inout_swap: bool
+    punch_debounce_seconds: int
     cookie_domain: str | None
     cookie_secure: bool
 
     frontend_base_url: str
     smtp_timeout_seconds: int
+    smtp_pool_size: int
+    smtp_max_per_minute: int
+    smtp_session_max_messages: int
+    notify_worker_poll_seconds: int
+    notify_max_attempts: int
+    notify_retry_base_seconds: int
+    notify_log_flush_rows: int
+    notify_log_flush_seconds: int
+    scheduler_poll_seconds: int
+    report_cache_max_age_hours: int
+
+    pdf_workers: int
+    pdf_queue_max: int
+    pdf_job_timeout_seconds: int
+    pdf_cache_dir: str
+    pdf_cache_max_mb: int
+    pdf_cache_max_age_hours: int
+    pdf_spool_max_kb: int
+    pdf_parallel_min_rows: int
 
 
 def get_settings() -> Settings:
@@ -77,10 +107,15 @@ def get_settings() -> Settings:
         admin_password=os.getenv("ADMIN_PASSWORD", "change-me"),
         admin_email=os.getenv("ADMIN_EMAIL", "admin@local"),
         app_db_path=os.getenv("APP_DB_PATH", _default_app_db_path()),
+        app_db_pool_size=max(1, min(_to_int(os.getenv("APP_DB_POOL_SIZE"), 8), 64)),
+        app_db_busy_timeout_ms=max(0, _to_int(os.getenv("APP_DB_BUSY_TIMEOUT_MS"), 30000)),
+        app_db_cache_mb=max(0, _to_int(os.getenv("APP_DB_CACHE_MB"), 16)),
+        app_db_mmap_mb=max(0, _to_int(os.getenv("APP_DB_MMAP_MB"), 64)),
         app_encryption_key=(os.getenv("APP_ENCRYPTION_KEY") or os.getenv("JWT_SECRET") or None),
         jwt_secret=os.getenv("JWT_SECRET", "change-this-secret"),
         jwt_algorithm=os.getenv("JWT_ALGORITHM", "HS256"),
         jwt_expires_minutes=_to_int(os.getenv("JWT_EXPIRES_MINUTES"), 480),
+        auth_user_cache_seconds=max(0, _to_int(os.getenv("AUTH_USER_CACHE_SECONDS"), 30)),
         password_reset_expiry_minutes=max(5, _to_int(os.getenv("PASSWORD_RESET_EXPIRY_MINUTES"), 60)),
         allow_origins=_split_csv(
             os.getenv("ALLOW_ORIGIN"),
@@ -94,10 +129,29 @@ def get_settings() -> Settings:
         rate_limit_max_requests=_to_int(os.getenv("RATE_LIMIT_MAX_REQUESTS"), 120),
         shift_out_cutoff_hours=max(0, min(_to_int(os.getenv("SHIFT_OUT_CUTOFF_HOURS"), 12), 23)),
         inout_swap=_to_bool(os.getenv("INOUT_SWAP"), False),
+        punch_debounce_seconds=max(0, min(_to_int(os.getenv("PUNCH_DEBOUNCE_SECONDS"), 0), 600)),
         cookie_domain=os.getenv("COOKIE_DOMAIN") or None,
         cookie_secure=_to_bool(os.getenv("COOKIE_SECURE"), False),
         frontend_base_url=(os.getenv("FRONTEND_BASE_URL", "http://localhost:3000").strip().rstrip("/")),
         smtp_timeout_seconds=max(5, _to_int(os.getenv("SMTP_TIMEOUT_SECONDS"), 20)),
+        smtp_pool_size=max(1, min(_to_int(os.getenv("SMTP_POOL_SIZE"), 3), 10)),
+        smtp_max_per_minute=max(0, _to_int(os.getenv("SMTP_MAX_PER_MINUTE"), 0)),
+        smtp_session_max_messages=max(0, _to_int(os.getenv("SMTP_SESSION_MAX_MESSAGES"), 100)),
+        notify_worker_poll_seconds=max(0, _to_int(os.getenv("NOTIFY_WORKER_POLL_SECONDS"), 5)),
+        notify_max_attempts=max(1, _to_int(os.getenv("NOTIFY_MAX_ATTEMPTS"), 5)),
+        notify_retry_base_seconds=max(1, _to_int(os.getenv("NOTIFY_RETRY_BASE_SECONDS"), 60)),
+        notify_log_flush_rows=max(1, _to_int(os.getenv("NOTIFY_LOG_FLUSH_ROWS"), 200)),
+        notify_log_flush_seconds=max(0, _to_int(os.getenv("NOTIFY_LOG_FLUSH_SECONDS"), 2)),
+        scheduler_poll_seconds=max(0, _to_int(os.getenv("SCHEDULER_POLL_SECONDS"), 30)),
+        report_cache_max_age_hours=max(0, _to_int(os.getenv("REPORT_CACHE_MAX_AGE_HOURS"), 24)),
+        pdf_workers=max(0, min(_to_int(os.getenv("PDF_WORKERS"), 2), 16)),
+        pdf_queue_max=max(1, _to_int(os.getenv("PDF_QUEUE_MAX"), 8)),
+        pdf_job_timeout_seconds=max(0, _to_int(os.getenv("PDF_JOB_TIMEOUT_SECONDS"), 120)),
+        pdf_cache_dir=(os.getenv("PDF_CACHE_DIR") or "").strip() or _default_pdf_cache_dir(),
+        pdf_cache_max_mb=max(0, _to_int(os.getenv("PDF_CACHE_MAX_MB"), 512)),
+        pdf_cache_max_age_hours=max(0, _to_int(os.getenv("PDF_CACHE_MAX_AGE_HOURS"), 720)),
+        pdf_spool_max_kb=max(0, _to_int(os.getenv("PDF_SPOOL_MAX_KB"), 1024)),
+        pdf_parallel_min_rows=max(0, _to_int(os.getenv("PDF_PARALLEL_MIN_ROWS"), 2000)),
     )
 
 
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import logging
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.message import EmailMessage
+from threading import Lock
+from typing import Any, Iterable, Iterator, Sequence
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FROM_NAME = "Oilchem Entry/Exit Admin"
+
+_LIMITERS: dict[str, "_RateLimiter"] = {}
+_LIMITERS_LOCK = Lock()
+
+
+def build_message(
+    smtp_config: dict[str, Any],
+    *,
+    to_email: str,
+    subject: str,
+    body: str,
+    cc_list: Sequence[str] = (),
+) -> EmailMessage:
+    from_email = str(smtp_config.get("from_email") or "").strip()
+    from_name = str(smtp_config.get("from_name") or DEFAULT_FROM_NAME).strip() or DEFAULT_FROM_NAME
+
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = f"{from_name} <{from_email}>"
+    message["To"] = to_email
+    if cc_list:
+        message["Cc"] = ", ".join(cc_list)
+    message.set_content(body)
+    return message
+
+
+class _RateLimiter:
+    # Spaces sends evenly; shared by every pool talking to the same host so
+    # concurrent batches cannot add up past the provider's limit.
+    def __init__(self, per_minute: int) -> None:
+        self.per_minute = per_minute
+        self._interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = Lock()
+
+    def wait(self) -> None:
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _limiter_for(host: str) -> _RateLimiter:
+    per_minute = settings.smtp_max_per_minute
+    key = host.lower()
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(key)
+        if limiter is None or limiter.per_minute != per_minute:
+            limiter = _RateLimiter(per_minute)
+            _LIMITERS[key] = limiter
+        return limiter
+
+
+def _is_disconnect(exc: BaseException) -> bool:
+    if isinstance(exc, (smtplib.SMTPServerDisconnected, ConnectionError)):
+        return True
+    # 421: the server is closing the transmission channel.
+    return isinstance(exc, smtplib.SMTPResponseException) and exc.smtp_code == 421
+
+
+class _Session:
+    """One SMTP connection, opened and authenticated on first use and kept for reuse."""
+
+    def __init__(self, smtp_config: dict[str, Any]) -> None:
+        self._config = smtp_config
+        self._server: smtplib.SMTP | None = None
+        self._sent = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        host = str(self._config.get("host") or "").strip()
+        port = int(self._config.get("port") or 0)
+        from_email = str(self._config.get("from_email") or "").strip()
+        username = str(self._config.get("username") or "").strip()
+        password = str(self._config.get("password") or "")
+        use_tls = bool(self._config.get("use_tls"))
+        use_ssl = bool(self._config.get("use_ssl"))
+
+        if not host or not port or not from_email:
+            raise RuntimeError("SMTP settings are incomplete")
+
+        if use_ssl:
+            server: smtplib.SMTP = smtplib.SMTP_SSL(host, port, timeout=settings.smtp_timeout_seconds)
+        else:
+            server = smtplib.SMTP(host, port, timeout=settings.smtp_timeout_seconds)
+        try:
+            if not use_ssl and use_tls:
+                server.starttls()
+            if username:
+                server.login(username, password)
+        except BaseException:
+            server.close()
+            raise
+        self._sent = 0
+        return server
+
+    def send(self, message: EmailMessage, recipients: Sequence[str] | None) -> None:
+        for attempt in (1, 2):
+            reused = self._server is not None
+            if self._server is None:
+                self._server = self._connect()
+            try:
+                self._server.send_message(message, to_addrs=list(recipients) if recipients else None)
+            except smtplib.SMTPRecipientsRefused:
+                raise
+            except Exception as exc:
+                disconnected = _is_disconnect(exc)
+                if disconnected or not isinstance(exc, smtplib.SMTPResponseException):
+                    self.close()
+                # A kept-alive session the server has since dropped is reopened
+                # once; a fresh connection failing is the message's own failure.
+                if attempt == 1 and disconnected and reused:
+                    logger.info("SMTP session dropped (%s); reconnecting", exc)
+                    continue
+                raise
+            self._sent += 1
+            if settings.smtp_session_max_messages and self._sent >= settings.smtp_session_max_messages:
+                self.close()
+            return
+
+    def close(self) -> None:
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+
+class SMTPPool:
+    """
+    Reusable SMTP sessions for sending many messages.
+
+    Up to `size` sessions (SMTP_POOL_SIZE) are opened lazily, each doing the
+    TLS handshake and login once and then carrying messages until the batch
+    ends, the server drops it, or it reaches SMTP_SESSION_MAX_MESSAGES. Sends
+    to one host are paced by SMTP_MAX_PER_MINUTE across all pools. Use as a
+    context manager so sessions are closed with QUIT.
+    """
+
+    def __init__(self, smtp_config: dict[str, Any], *, size: int | None = None) -> None:
+        self._config = dict(smtp_config)
+        self._size = max(1, size if size is not None else settings.smtp_pool_size)
+        self._limiter = _limiter_for(str(self._config.get("host") or "").strip())
+        self._idle: list[_Session] = []
+        self._lock = Lock()
+
+    def __enter__(self) -> "SMTPPool":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+    def _checkout(self) -> _Session:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return _Session(self._config)
+
+    def _checkin(self, session: _Session) -> None:
+        with self._lock:
+            self._idle.append(session)
+
+    def send(self, message: EmailMessage, recipients: Sequence[str] | None = None) -> None:
+        session = self._checkout()
+        try:
+            self._limiter.wait()
+            session.send(message, recipients)
+        finally:
+            self._checkin(session)
+
+    def send_many(
+        self,
+        items: Iterable[tuple[Any, EmailMessage, Sequence[str] | None]],
+    ) -> Iterator[tuple[Any, Exception | None]]:
+        """Send (tag, message, recipients) items concurrently; yields (tag, error) as each completes."""
+        with ThreadPoolExecutor(max_workers=self._size, thread_name_prefix="smtp") as executor:
+            futures = {
+                executor.submit(self.send, message, recipients): tag
+                for tag, message, recipients in items
+            }
+            for future in as_completed(futures):
+                error = future.exception()
+                yield futures[future], error if isinstance(error, Exception) else None
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._idle = self._idle, []
+        for session in sessions:
+            session.close()
+
+
+def send_email(smtp_config: dict[str, Any], message: EmailMessage, recipients: Sequence[str] | None = None) -> None:
+    with SMTPPool(smtp_config, size=1) as pool:
+        pool.send(message, recipients)
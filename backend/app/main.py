@@ -1,23 +1,29 @@
 from __future__ import annotations
 
+import csv
+import io
+import itertools
+import json
+import os
 import re
-import smtplib
-from email.message import EmailMessage
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Iterable, Iterator, Sequence
 
 from fastapi import Depends, FastAPI, HTTPException, Query, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 
 from .app_db import (
+    close_app_db,
     count_active_admin_users,
+    count_notification_logs,
     create_user,
     create_hr_user,
     create_password_reset,
     delete_user,
     get_employee_settings_map,
+    get_schedule,
     get_smtp_settings,
     get_user_by_id,
     get_user_by_login,
@@ -25,9 +31,11 @@ from .app_db import (
     list_users,
     list_hr_users,
     list_notification_logs,
+    list_schedules,
     set_user_active,
     set_user_password,
     touch_user_login,
+    update_schedule,
     update_user,
     upsert_employee_setting,
     upsert_smtp_settings,
@@ -49,25 +57,40 @@ from .db import (
     log_db_connection_target_once,
     validate_db_server_for_startup,
 )
-from .notifications import run_notifications
-from .pdf_exports import (
-    build_daily_all_pdf,
-    build_daily_pdf,
-    build_monthly_all_pdf,
-    build_monthly_pdf,
-    build_yearly_all_pdf,
-    build_yearly_pdf,
+from .mailer import build_message, send_email
+from .notification_jobs import (
+    NotificationWorkerDisabledError,
+    enqueue_notification_run,
+    get_notification_job_status,
+    start_notification_worker,
+    stop_notification_worker,
+)
+from .notifications import EXCEPTION_COLUMNS, EXCEPTION_SORTS, fetch_exceptions_report
+from .report_cache import fetch_all_employees_report
+from .scheduler import parse_cron, start_scheduler, stop_scheduler
+from . import pdf_cache
+from .pdf_bundle import iter_pdf_bundle
+from .pdf_pool import (
+    PDFQueueFullError,
+    PDFRenderTimeoutError,
+    get_pdf_pool_stats,
+    render_pdf,
+    shutdown_pdf_pool,
 )
 from .rate_limit import build_rate_limit_middleware
 from .reports import (
     fetch_dashboard_summary,
     fetch_daily_report,
-    fetch_daily_report_all_employees,
+    fetch_daily_report_data,
+    fetch_department_report,
     fetch_employees,
     fetch_monthly_report,
-    fetch_monthly_report_all_employees,
+    fetch_report_batch,
+    fetch_report_bundle,
     fetch_yearly_report,
-    fetch_yearly_report_all_employees,
+    get_punch_debounce_stats,
+    stream_all_employee_rows,
+    stream_muster_rows,
 )
 from .schemas import (
     AuthMeResponse,
@@ -75,21 +98,31 @@ from .schemas import (
     CreateHRUserRequest,
     DashboardSummaryResponse,
     DailyReport,
+    DepartmentReportResponse,
     CreateUserRequest,
     EmployeeSettingItem,
     EmployeeSettingsResponse,
     EmployeeSettingUpsertRequest,
     EmployeesResponse,
+    ExceptionsReportResponse,
     HRUserItem,
     HRUsersResponse,
     LoginRequest,
     MonthlyReport,
+    NotificationLogCountResponse,
     NotificationLogsResponse,
-    NotificationRunResponse,
+    NotificationJobResponse,
+    PDFCacheStatsResponse,
+    PDFPoolStatsResponse,
+    PunchDebounceStatsResponse,
+    ReportBatchRequest,
     ResetLinkResponse,
     ResetPasswordRequest,
     SMTPSettingsRequest,
     SMTPSettingsResponse,
+    ScheduleItem,
+    SchedulesResponse,
+    ScheduleUpdateRequest,
     SetTempPasswordRequest,
     UpdateUserActiveRequest,
     UpdateUserRequest,
@@ -125,6 +158,16 @@ def startup_event() -> None:
     validate_db_server_for_startup()
     log_db_connection_target_once()
     init_app_db()
+    start_notification_worker()
+    start_scheduler()
+
+
+@app.on_event("shutdown")
+def shutdown_event() -> None:
+    stop_scheduler()
+    stop_notification_worker()
+    shutdown_pdf_pool()
+    close_app_db()
 
 
 def _db_connection_failed_response() -> JSONResponse:
@@ -134,10 +177,102 @@ def _db_connection_failed_response() -> JSONResponse:
     )
 
 
-def _build_inline_pdf_response(filename: str, payload: bytes) -> Response:
-    response = Response(content=payload, media_type="application/pdf")
-    response.headers["Content-Disposition"] = f'inline; filename="{filename}"'
-    return response
+def _iter_file_chunks(handle: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    try:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        handle.close()
+
+
+def _build_inline_pdf_response(filename: str, pdf_file: BinaryIO) -> Response:
+    pdf_file.seek(0, os.SEEK_END)
+    size = pdf_file.tell()
+    pdf_file.seek(0)
+    return StreamingResponse(
+        _iter_file_chunks(pdf_file),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f'inline; filename="{filename}"',
+            "Content-Length": str(size),
+        },
+    )
+
+
+def _render_pdf_response(kind: str, report: Any, filename: str) -> Response:
+    key = pdf_cache.cache_key(kind, report)
+    cached_path = pdf_cache.lookup(key)
+    if cached_path:
+        return FileResponse(
+            cached_path,
+            media_type="application/pdf",
+            headers={"Content-Disposition": f'inline; filename="{filename}"'},
+        )
+
+    try:
+        pdf_file = render_pdf(kind, report)
+    except PDFQueueFullError as exc:
+        return _pdf_busy_response(exc)
+    except PDFRenderTimeoutError:
+        return _pdf_timeout_response()
+    pdf_cache.store(key, pdf_file)
+    return _build_inline_pdf_response(filename=filename, pdf_file=pdf_file)
+
+
+def _pdf_busy_response(exc: PDFQueueFullError) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "PDF renderer is busy, please retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def _pdf_timeout_response() -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": "PDF rendering timed out"},
+    )
+
+
+def _iter_bundle_entries(results: Iterable[dict[str, Any]], prefix: str) -> Iterator[tuple[str, Any, str | None]]:
+    for result in results:
+        card_no = str(result.get("card_no") or "")
+        if not result.get("ok"):
+            yield f"{prefix}_{_sanitize_filename_part(card_no)}.pdf", None, str(result.get("error") or "failed")
+            continue
+        report = result["report"]
+        filename = _build_pdf_filename(
+            prefix=prefix,
+            employee_name=str(report.get("employee_name") or ""),
+            card_no=str(report.get("card_no") or card_no),
+            period=str(result.get("period") or ""),
+        )
+        yield filename, report, None
+
+
+def _pdf_bundle_response(*, kind: str, period: str, departments: list[str], prefix: str) -> Response:
+    try:
+        results = fetch_report_bundle(kind, period, departments=departments)
+        chunks = iter_pdf_bundle(kind, _iter_bundle_entries(results, prefix))
+        # Pull the first entry before answering so a dead database or a saturated
+        # render pool still gets a proper status code instead of a broken download.
+        first_chunk = next(chunks, b"")
+    except DBOperationalError:
+        return _db_connection_failed_response()
+    except PDFQueueFullError as exc:
+        return _pdf_busy_response(exc)
+    except PDFRenderTimeoutError:
+        return _pdf_timeout_response()
+
+    filename = f"{prefix}_Bundle_{_sanitize_filename_part(period)}.zip"
+    return StreamingResponse(
+        itertools.chain([first_chunk], chunks),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 def _sanitize_filename_part(value: str | None) -> str:
@@ -160,6 +295,70 @@ def _build_pdf_filename(prefix: str, employee_name: str, card_no: str, period: s
     return f"{prefix}_{safe_name}_{safe_card}_{safe_period}.pdf"
 
 
+def _split_query_values(values: list[str] | None) -> list[str]:
+    # Accept both repeated params (?card_no=1&card_no=2) and comma lists (?card_no=1,2).
+    parts: list[str] = []
+    for value in values or []:
+        parts.extend(item.strip() for item in value.split(",") if item.strip())
+    return parts
+
+
+def _iter_json_array(items: Iterable[dict[str, Any]]) -> Iterator[bytes]:
+    yield b"["
+    for position, item in enumerate(items):
+        if position:
+            yield b","
+        yield json.dumps(item, separators=(",", ":")).encode("utf-8")
+    yield b"]"
+
+
+def _iter_ndjson(items: Iterable[dict[str, Any]]) -> Iterator[bytes]:
+    for item in items:
+        yield json.dumps(item, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _iter_csv(columns: Sequence[str], rows: Iterable[dict[str, Any]], flush_bytes: int = 16 * 1024) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(columns), extrasaction="ignore", lineterminator="\r\n")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= flush_bytes:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _data_export_response(export: dict[str, Any], *, output_format: str, filename_stem: str) -> Response:
+    if output_format == "ndjson":
+        body = _iter_ndjson(export["rows"])
+        media_type = "application/x-ndjson"
+    else:
+        body = _iter_csv(export["columns"], export["rows"])
+        media_type = "text/csv; charset=utf-8"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename_stem}.{output_format}"'},
+    )
+
+
+def _serialize_schedule(row: dict[str, Any]) -> ScheduleItem:
+    return ScheduleItem(
+        name=str(row.get("name") or ""),
+        task=str(row.get("task") or ""),
+        cron=str(row.get("cron") or ""),
+        params=str(row.get("params") or "{}"),
+        enabled=bool(row.get("enabled")),
+        next_run_at=row.get("next_run_at"),
+        last_run_at=row.get("last_run_at"),
+        last_status=row.get("last_status"),
+        last_message=row.get("last_message"),
+        updated_at=str(row.get("updated_at") or ""),
+    )
+
+
 def _serialize_user(row: dict[str, Any]) -> UserItem:
     role = str(row.get("role") or "inspector").strip().lower()
     if role == "hr":
@@ -193,21 +392,11 @@ def _send_reset_email(to_email: str, username: str, reset_url: str) -> None:
     if not _smtp_is_ready(smtp_config):
         return
 
-    host = str(smtp_config.get("host") or "").strip()
-    port = int(smtp_config.get("port") or 0)
-    from_email = str(smtp_config.get("from_email") or "").strip()
-    from_name = str(smtp_config.get("from_name") or "Oilchem Entry/Exit Admin").strip() or "Oilchem Entry/Exit Admin"
-    smtp_username = str(smtp_config.get("username") or "").strip()
-    smtp_password = str(smtp_config.get("password") or "")
-    use_tls = bool(smtp_config.get("use_tls"))
-    use_ssl = bool(smtp_config.get("use_ssl"))
-
-    message = EmailMessage()
-    message["Subject"] = "Oilchem Entry/Exit Admin: Password Reset Link"
-    message["From"] = f"{from_name} <{from_email}>"
-    message["To"] = to_email
-    message.set_content(
-        "\n".join(
+    message = build_message(
+        smtp_config,
+        to_email=to_email,
+        subject="Oilchem Entry/Exit Admin: Password Reset Link",
+        body="\n".join(
             [
                 "Hello,",
                 "",
@@ -215,22 +404,9 @@ def _send_reset_email(to_email: str, username: str, reset_url: str) -> None:
                 f"Reset link: {reset_url}",
                 f"This link expires in {settings.password_reset_expiry_minutes} minutes.",
             ]
-        )
+        ),
     )
-
-    if use_ssl:
-        server = smtplib.SMTP_SSL(host, port, timeout=settings.smtp_timeout_seconds)
-    else:
-        server = smtplib.SMTP(host, port, timeout=settings.smtp_timeout_seconds)
-
-    try:
-        if not use_ssl and use_tls:
-            server.starttls()
-        if smtp_username:
-            server.login(smtp_username, smtp_password)
-        server.send_message(message)
-    finally:
-        server.quit()
+    send_email(smtp_config, message)
 
 
 @app.get("/healthz")
@@ -375,6 +551,44 @@ def save_admin_smtp_settings(
     return SMTPSettingsResponse(**data)
 
 
+@app.get("/api/admin/punch-debounce", response_model=PunchDebounceStatsResponse)
+def get_admin_punch_debounce_stats(_user: AuthUser = Depends(require_admin)) -> PunchDebounceStatsResponse:
+    return PunchDebounceStatsResponse(**get_punch_debounce_stats())
+
+
+@app.get("/api/admin/pdf-pool", response_model=PDFPoolStatsResponse)
+def get_admin_pdf_pool_stats(_user: AuthUser = Depends(require_admin)) -> PDFPoolStatsResponse:
+    return PDFPoolStatsResponse(**get_pdf_pool_stats())
+
+
+@app.get("/api/admin/pdf-cache", response_model=PDFCacheStatsResponse)
+def get_admin_pdf_cache_stats(_user: AuthUser = Depends(require_admin)) -> PDFCacheStatsResponse:
+    return PDFCacheStatsResponse(**pdf_cache.get_pdf_cache_stats())
+
+
+@app.get("/api/admin/schedules", response_model=SchedulesResponse)
+def get_admin_schedules(_user: AuthUser = Depends(require_admin)) -> SchedulesResponse:
+    return SchedulesResponse(schedules=[_serialize_schedule(row) for row in list_schedules()])
+
+
+@app.put("/api/admin/schedules/{name}", response_model=ScheduleItem)
+def update_admin_schedule(
+    name: str,
+    request: ScheduleUpdateRequest,
+    _user: AuthUser = Depends(require_admin),
+) -> ScheduleItem:
+    cron = " ".join(request.cron.split()) if request.cron is not None else None
+    if cron is not None:
+        try:
+            parse_cron(cron)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    if get_schedule(name) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Schedule not found")
+    row = update_schedule(name, cron=cron, enabled=request.enabled)
+    return _serialize_schedule(row or {})
+
+
 @app.get("/api/users", response_model=UsersResponse)
 def get_users(_user: AuthUser = Depends(require_admin)) -> UsersResponse:
     users = [_serialize_user(row) for row in list_users()]
@@ -665,23 +879,100 @@ def save_employee_setting(
     )
 
 
-@app.post("/api/notifications/run", response_model=NotificationRunResponse)
+@app.post(
+    "/api/notifications/run",
+    response_model=NotificationJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 def trigger_notifications(
-    date: str = Query(..., pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    date: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    start_date: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    end_date: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
     card_no: str | None = Query(default=None, max_length=64),
+    current_user: AuthUser = Depends(require_admin),
+) -> NotificationJobResponse:
+    if date and (start_date or end_date):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either date or start_date/end_date",
+        )
+    if not date and not (start_date and end_date):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date or start_date and end_date are required",
+        )
+    try:
+        payload = enqueue_notification_run(
+            date_value=date or str(start_date),
+            card_no=(card_no.strip() if card_no else None) or None,
+            requested_by=current_user["username"],
+            end_date_value=end_date,
+        )
+    except NotificationWorkerDisabledError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    return NotificationJobResponse(**payload)
+
+
+@app.get("/api/notifications/jobs/{job_id}", response_model=NotificationJobResponse)
+def get_notification_job_detail(
+    job_id: int,
     _user: AuthUser = Depends(require_admin),
-) -> NotificationRunResponse:
-    payload = run_notifications(date_value=date, card_no=(card_no.strip() if card_no else None))
-    return NotificationRunResponse(**payload)
+) -> NotificationJobResponse:
+    payload = get_notification_job_status(job_id)
+    if payload is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Notification job not found")
+    return NotificationJobResponse(**payload)
+
+
+def _notification_log_filter_args(
+    card_no: str | None,
+    date_from: str | None,
+    date_to: str | None,
+    notice_type: str | None,
+    status_value: str | None,
+) -> dict[str, str | None]:
+    return {
+        "card_no": (card_no or "").strip() or None,
+        "date_from": date_from,
+        "date_to": date_to,
+        "notice_type": (notice_type or "").strip().upper() or None,
+        "status": (status_value or "").strip().upper() or None,
+    }
 
 
 @app.get("/api/notifications/logs", response_model=NotificationLogsResponse)
 def get_notification_logs(
     limit: int = Query(default=100, ge=1, le=500),
+    after_id: int | None = Query(default=None, ge=1),
+    card_no: str | None = Query(default=None, max_length=64),
+    date_from: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    date_to: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    notice_type: str | None = Query(default=None, alias="type", max_length=32),
+    status_filter: str | None = Query(default=None, alias="status", max_length=32),
     _user: AuthUser = Depends(require_admin),
 ) -> NotificationLogsResponse:
-    logs = list_notification_logs(limit=limit)
-    return NotificationLogsResponse(logs=logs)
+    logs = list_notification_logs(
+        limit=limit,
+        after_id=after_id,
+        **_notification_log_filter_args(card_no, date_from, date_to, notice_type, status_filter),
+    )
+    next_after_id = int(logs[-1]["id"]) if len(logs) == limit else None
+    return NotificationLogsResponse(logs=logs, next_after_id=next_after_id)
+
+
+@app.get("/api/notifications/logs/count", response_model=NotificationLogCountResponse)
+def get_notification_log_count(
+    card_no: str | None = Query(default=None, max_length=64),
+    date_from: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    date_to: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    notice_type: str | None = Query(default=None, alias="type", max_length=32),
+    status_filter: str | None = Query(default=None, alias="status", max_length=32),
+    _user: AuthUser = Depends(require_admin),
+) -> NotificationLogCountResponse:
+    count = count_notification_logs(
+        **_notification_log_filter_args(card_no, date_from, date_to, notice_type, status_filter),
+    )
+    return NotificationLogCountResponse(count=count)
 
 
 @app.get("/api/reports/daily", response_model=DailyReport)
@@ -723,46 +1014,179 @@ def get_yearly_report(
     return YearlyReport(**payload)
 
 
+@app.get("/api/reports/departments", response_model=DepartmentReportResponse)
+def get_department_report(
+    period: str = Query(..., pattern=r"^\d{4}(-\d{2}(-\d{2})?)?$"),
+    _user: AuthUser = Depends(require_inspector_or_admin),
+) -> DepartmentReportResponse:
+    try:
+        payload = fetch_department_report(period_value=period)
+    except DBOperationalError:
+        return _db_connection_failed_response()
+    return DepartmentReportResponse(**payload)
+
+
+@app.post("/api/reports/batch")
+def post_report_batch(
+    payload: ReportBatchRequest,
+    output_format: str = Query("json", alias="format", pattern=r"^(json|ndjson)$"),
+    _user: AuthUser = Depends(require_inspector_or_admin),
+) -> Response:
+    try:
+        results = fetch_report_batch([item.model_dump() for item in payload.items])
+    except DBOperationalError:
+        return _db_connection_failed_response()
+
+    if output_format == "ndjson":
+        return StreamingResponse(_iter_ndjson(results), media_type="application/x-ndjson")
+    return StreamingResponse(_iter_json_array(results), media_type="application/json")
+
+
+_DATA_EXPORT_PREFIXES = {"daily": "OC_All_D", "monthly": "OC_All_M", "yearly": "OC_All_Y"}
+
+
+@app.get("/api/export/all-employees")
+def export_all_employees_data(
+    period: str = Query(..., pattern=r"^\d{4}(-\d{2}(-\d{2})?)?$"),
+    output_format: str = Query("csv", alias="format", pattern=r"^(csv|ndjson)$"),
+    department: list[str] | None = Query(default=None),
+    card_no: list[str] | None = Query(default=None),
+    _user: AuthUser = Depends(require_inspector_or_admin),
+) -> Response:
+    try:
+        export = stream_all_employee_rows(
+            period,
+            departments=_split_query_values(department),
+            card_nos=_split_query_values(card_no),
+        )
+    except DBOperationalError:
+        return _db_connection_failed_response()
+    prefix = _DATA_EXPORT_PREFIXES[export["period_type"]]
+    return _data_export_response(
+        export,
+        output_format=output_format,
+        filename_stem=f"{prefix}_{_sanitize_filename_part(export['period'])}",
+    )
+
+
+@app.get("/api/export/muster")
+def export_muster_data(
+    period: str = Query(..., pattern=r"^\d{4}(-\d{2}(-\d{2})?)?$"),
+    output_format: str = Query("csv", alias="format", pattern=r"^(csv|ndjson)$"),
+    department: list[str] | None = Query(default=None),
+    card_no: list[str] | None = Query(default=None),
+    _user: AuthUser = Depends(require_inspector_or_admin),
+) -> Response:
+    try:
+        export = stream_muster_rows(
+            period,
+            departments=_split_query_values(department),
+            card_nos=_split_query_values(card_no),
+        )
+    except DBOperationalError:
+        return _db_connection_failed_response()
+    return _data_export_response(
+        export,
+        output_format=output_format,
+        filename_stem=f"OC_Muster_{_sanitize_filename_part(export['period'])}",
+    )
+
+
+@app.get("/api/reports/exceptions", response_model=ExceptionsReportResponse)
+def get_exceptions_report(
+    date: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    month: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}$"),
+    department: list[str] | None = Query(default=None),
+    card_no: list[str] | None = Query(default=None),
+    sort: str = Query("date", pattern="^(" + "|".join(EXCEPTION_SORTS) + ")$"),
+    order: str = Query("asc", pattern=r"^(asc|desc)$"),
+    output_format: str = Query("json", alias="format", pattern=r"^(json|csv|pdf)$"),
+    _user: AuthUser = Depends(require_inspector_or_admin),
+) -> Response | ExceptionsReportResponse:
+    if bool(date) == bool(month):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide either date or month")
+    period = date or month or ""
+    try:
+        report = fetch_exceptions_report(
+            period,
+            departments=_split_query_values(department),
+            card_nos=_split_query_values(card_no),
+            sort=sort,
+            descending=order == "desc",
+        )
+    except DBOperationalError:
+        return _db_connection_failed_response()
+
+    filename_stem = f"OC_Exceptions_{_sanitize_filename_part(report['period'])}"
+    if output_format == "pdf":
+        return _render_pdf_response("exceptions", report, f"{filename_stem}.pdf")
+    if output_format == "csv":
+        return _data_export_response(
+            {"columns": EXCEPTION_COLUMNS, "rows": report["rows"]},
+            output_format="csv",
+            filename_stem=filename_stem,
+        )
+    return ExceptionsReportResponse(**report)
+
+
 @app.get("/api/reports/daily/all")
 def export_daily_all_employees_pdf(
     date: str = Query(..., pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    department: list[str] | None = Query(default=None),
+    card_no: list[str] | None = Query(default=None),
     _user: AuthUser = Depends(require_inspector_or_admin),
 ) -> Response:
     try:
-        report = fetch_daily_report_all_employees(date_value=date)
+        report = fetch_all_employees_report(
+            "daily_all",
+            date,
+            departments=_split_query_values(department),
+            card_nos=_split_query_values(card_no),
+        )
     except DBOperationalError:
         return _db_connection_failed_response()
-    payload = build_daily_all_pdf(report)
     filename = f"OC_All_D_{_sanitize_filename_part(date)}.pdf"
-    return _build_inline_pdf_response(filename=filename, payload=payload)
+    return _render_pdf_response("daily_all", report, filename)
 
 
 @app.get("/api/reports/monthly/all")
 def export_monthly_all_employees_pdf(
     month: str = Query(..., pattern=r"^\d{4}-\d{2}$"),
+    department: list[str] | None = Query(default=None),
+    card_no: list[str] | None = Query(default=None),
     _user: AuthUser = Depends(require_inspector_or_admin),
 ) -> Response:
     try:
-        report = fetch_monthly_report_all_employees(month_value=month)
+        report = fetch_all_employees_report(
+            "monthly_all",
+            month,
+            departments=_split_query_values(department),
+            card_nos=_split_query_values(card_no),
+        )
     except DBOperationalError:
         return _db_connection_failed_response()
-    payload = build_monthly_all_pdf(report)
     filename = f"OC_All_M_{_sanitize_filename_part(month)}.pdf"
-    return _build_inline_pdf_response(filename=filename, payload=payload)
+    return _render_pdf_response("monthly_all", report, filename)
 
 
 @app.get("/api/reports/yearly/all")
 def export_yearly_all_employees_pdf(
     year: str = Query(..., pattern=r"^\d{4}$"),
+    department: list[str] | None = Query(default=None),
+    card_no: list[str] | None = Query(default=None),
     _user: AuthUser = Depends(require_inspector_or_admin),
 ) -> Response:
     try:
-        report = fetch_yearly_report_all_employees(year_value=year)
+        report = fetch_all_employees_report(
+            "yearly_all",
+            year,
+            departments=_split_query_values(department),
+            card_nos=_split_query_values(card_no),
+        )
     except DBOperationalError:
         return _db_connection_failed_response()
-    payload = build_yearly_all_pdf(report)
     filename = f"OC_All_Y_{_sanitize_filename_part(year)}.pdf"
-    return _build_inline_pdf_response(filename=filename, payload=payload)
+    return _render_pdf_response("yearly_all", report, filename)
 
 
 @app.get("/api/export/daily.pdf")
@@ -772,17 +1196,16 @@ def export_daily_pdf(
     _user: AuthUser = Depends(require_inspector_or_admin),
 ) -> Response:
     try:
-        report = fetch_daily_report(card_no=card_no.strip(), date_value=date)
+        report = fetch_daily_report_data(card_no=card_no.strip(), date_value=date)
     except DBOperationalError:
         return _db_connection_failed_response()
-    payload = build_daily_pdf(report)
     filename = _build_pdf_filename(
         prefix="OC_Att_D",
-        employee_name=str(report.get("employee_name") or ""),
-        card_no=str(report.get("card_no") or ""),
-        period=str(report.get("date") or date),
+        employee_name=report.identity.employee_name,
+        card_no=report.identity.card_no,
+        period=report.detail.day.strftime("%Y-%m-%d"),
     )
-    return _build_inline_pdf_response(filename=filename, payload=payload)
+    return _render_pdf_response("daily", report, filename)
 
 
 @app.get("/api/export/monthly.pdf")
@@ -795,14 +1218,13 @@ def export_monthly_pdf(
         report = fetch_monthly_report(card_no=card_no.strip(), month_value=month)
     except DBOperationalError:
         return _db_connection_failed_response()
-    payload = build_monthly_pdf(report)
     filename = _build_pdf_filename(
         prefix="OC_Att_M",
         employee_name=str(report.get("employee_name") or ""),
         card_no=str(report.get("card_no") or ""),
         period=str(report.get("month") or month),
     )
-    return _build_inline_pdf_response(filename=filename, payload=payload)
+    return _render_pdf_response("monthly", report, filename)
 
 
 @app.get("/api/export/yearly.pdf")
@@ -815,11 +1237,52 @@ def export_yearly_pdf(
         report = fetch_yearly_report(card_no=card_no.strip(), year_value=year)
     except DBOperationalError:
         return _db_connection_failed_response()
-    payload = build_yearly_pdf(report)
     filename = _build_pdf_filename(
         prefix="OC_Att_Y",
         employee_name=str(report.get("employee_name") or ""),
         card_no=str(report.get("card_no") or ""),
         period=str(report.get("year") or year),
     )
-    return _build_inline_pdf_response(filename=filename, payload=payload)
+    return _render_pdf_response("yearly", report, filename)
+
+
+@app.get("/api/export/daily-bundle.zip")
+def export_daily_bundle(
+    date: str = Query(..., pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    department: list[str] | None = Query(default=None),
+    _user: AuthUser = Depends(require_inspector_or_admin),
+) -> Response:
+    return _pdf_bundle_response(
+        kind="daily",
+        period=date,
+        departments=_split_query_values(department),
+        prefix="OC_Att_D",
+    )
+
+
+@app.get("/api/export/monthly-bundle.zip")
+def export_monthly_bundle(
+    month: str = Query(..., pattern=r"^\d{4}-\d{2}$"),
+    department: list[str] | None = Query(default=None),
+    _user: AuthUser = Depends(require_inspector_or_admin),
+) -> Response:
+    return _pdf_bundle_response(
+        kind="monthly",
+        period=month,
+        departments=_split_query_values(department),
+        prefix="OC_Att_M",
+    )
+
+
+@app.get("/api/export/yearly-bundle.zip")
+def export_yearly_bundle(
+    year: str = Query(..., pattern=r"^\d{4}$"),
+    department: list[str] | None = Query(default=None),
+    _user: AuthUser = Depends(require_inspector_or_admin),
+) -> Response:
+    return _pdf_bundle_response(
+        kind="yearly",
+        period=year,
+        departments=_split_query_values(department),
+        prefix="OC_Att_Y",
+    )
@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import json
+import logging
+import smtplib
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from fastapi import HTTPException
+
+from .app_db import (
+    claim_due_notification_outbox,
+    claim_notification_job,
+    complete_drained_notification_jobs,
+    create_notification_job,
+    enqueue_notification_outbox,
+    finish_notification_outbox,
+    get_notification_job,
+    get_smtp_settings,
+    insert_notification_logs,
+    list_notification_outbox_for_job,
+    list_sent_notice_keys,
+    release_stale_notification_claims,
+    update_notification_job,
+)
+from .config import settings
+from .mailer import SMTPPool, build_message
+from .notifications import evaluate_notifications, parse_notification_span
+from .security import utc_now_iso
+
+logger = logging.getLogger(__name__)
+
+# A claim older than this belongs to a process that died; its work is retried.
+_STALE_CLAIM_SECONDS = 600
+_DELIVERY_BATCH_SIZE = 100
+_MAX_BACKOFF_SECONDS = 3600
+
+# Rows kept for a failed flush before the oldest are dropped.
+_LOG_BUFFER_MAX_ROWS = 10_000
+
+_WORKER: threading.Thread | None = None
+_WORKER_LOCK = threading.Lock()
+_WAKE = threading.Event()
+_STOP = threading.Event()
+
+
+class NotificationWorkerDisabledError(Exception):
+    def __init__(self) -> None:
+        super().__init__("Notification worker is disabled (NOTIFY_WORKER_POLL_SECONDS=0)")
+
+
+def _iso_after(seconds: float) -> str:
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).replace(microsecond=0).isoformat()
+
+
+def _backoff_seconds(attempts: int) -> float:
+    return min(settings.notify_retry_base_seconds * (2 ** max(0, attempts - 1)), _MAX_BACKOFF_SECONDS)
+
+
+def _is_permanent(error: Exception) -> bool:
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600
+
+
+def _split_cc(value: str | None) -> list[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+class _NotificationLogBuffer:
+    """
+    Collects notification log rows and writes them with one executemany.
+
+    Flushes once NOTIFY_LOG_FLUSH_ROWS rows are waiting or the oldest has
+    waited NOTIFY_LOG_FLUSH_SECONDS. The outbox stays the source of truth for
+    delivery state; a failed flush keeps the rows for the next attempt.
+    """
+
+    def __init__(self) -> None:
+        self._rows: list[dict[str, Any]] = []
+        self._oldest = 0.0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def add(self, **entry: Any) -> None:
+        entry.setdefault("sent_at", utc_now_iso())
+        with self._lock:
+            if not self._rows:
+                self._oldest = time.monotonic()
+            self._rows.append(entry)
+            full = len(self._rows) >= settings.notify_log_flush_rows
+        if full:
+            self.flush()
+
+    def flush_if_due(self) -> None:
+        with self._lock:
+            due = bool(self._rows) and time.monotonic() - self._oldest >= settings.notify_log_flush_seconds
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return
+            try:
+                insert_notification_logs(rows)
+            except Exception:
+                logger.exception("Could not write %s notification log rows; keeping them for retry", len(rows))
+                with self._lock:
+                    self._rows = (rows + self._rows)[-_LOG_BUFFER_MAX_ROWS:]
+                    self._oldest = time.monotonic()
+
+
+_LOG_BUFFER = _NotificationLogBuffer()
+
+
+def flush_notification_logs() -> None:
+    _LOG_BUFFER.flush()
+
+
+def enqueue_notification_run(
+    date_value: str,
+    card_no: str | None,
+    requested_by: str | None,
+    end_date_value: str | None = None,
+) -> dict[str, Any]:
+    # Nothing would ever pick the job up.
+    if settings.notify_worker_poll_seconds <= 0:
+        raise NotificationWorkerDisabledError()
+    parse_notification_span(date_value, end_date_value)
+    job = create_notification_job(
+        date_value=date_value,
+        card_no=card_no,
+        requested_by=requested_by,
+        end_date_value=end_date_value if end_date_value and end_date_value != date_value else None,
+    )
+    _WAKE.set()
+    return serialize_notification_job(job)
+
+
+def get_notification_job_status(job_id: int) -> dict[str, Any] | None:
+    job = get_notification_job(job_id)
+    return serialize_notification_job(job) if job else None
+
+
+def serialize_notification_job(job: dict[str, Any]) -> dict[str, Any]:
+    results: list[dict[str, Any]] = [
+        {key: item.get(key) for key in ("card_no", "date", "employee_name", "status", "notice_type", "to_email", "error")}
+        for item in json.loads(job.get("results") or "[]")
+    ]
+    for row in list_notification_outbox_for_job(int(job["id"])):
+        row_status = {"sent": "SENT", "failed": "FAILED"}.get(str(row["status"]), "PENDING")
+        results.append(
+            {
+                "card_no": row["card_no"],
+                "date": row["date"],
+                "employee_name": row["employee_name"] or row["card_no"],
+                "status": row_status,
+                "notice_type": row["type"],
+                "to_email": row["to_email"],
+                "error": None if row_status == "SENT" else row["last_error"],
+            }
+        )
+    results.sort(key=lambda item: (str(item.get("date") or ""), str(item["card_no"])))
+
+    counts = {"SENT": 0, "FAILED": 0, "PENDING": 0}
+    for item in results:
+        if item["status"] in counts:
+            counts[item["status"]] += 1
+    return {
+        "id": int(job["id"]),
+        "status": str(job["status"]),
+        "date": str(job["date"]),
+        "end_date": job.get("end_date"),
+        "card_no": job.get("card_no"),
+        "total_targets": int(job.get("total_targets") or 0),
+        "sent_count": counts["SENT"],
+        "skipped_count": len(results) - sum(counts.values()),
+        "failed_count": counts["FAILED"],
+        "pending_count": counts["PENDING"],
+        "results": results,
+        "error": job.get("error"),
+        "created_at": str(job["created_at"]),
+        "started_at": job.get("started_at"),
+        "finished_at": job.get("finished_at"),
+    }
+
+
+def _evaluate_job(job: dict[str, Any]) -> None:
+    job_id = int(job["id"])
+    try:
+        evaluation = evaluate_notifications(str(job["date"]), job.get("card_no"), job.get("end_date"))
+    except Exception as exc:
+        attempts = int(job.get("attempts") or 0)
+        error = str(exc.detail) if isinstance(exc, HTTPException) else str(exc) or type(exc).__name__
+        logger.warning("Notification job %s evaluation failed (attempt %s): %s", job_id, attempts, error)
+        if attempts >= settings.notify_max_attempts or isinstance(exc, HTTPException):
+            update_notification_job(job_id, status="failed", error=error, claim_token=None, finished_at=_iso_after(0))
+        else:
+            update_notification_job(
+                job_id,
+                status="queued",
+                error=error,
+                claim_token=None,
+                next_attempt_at=_iso_after(_backoff_seconds(attempts)),
+            )
+        return
+
+    results = list(evaluation["results"])
+    already_sent = list_sent_notice_keys(str(job["date"]), str(job.get("end_date") or job["date"]))
+    messages: list[dict[str, Any]] = []
+    duplicates: list[dict[str, Any]] = []
+    for message in evaluation["messages"]:
+        key = (message["card_no"], message["date"], message["notice_type"])
+        (duplicates if key in already_sent else messages).append(message)
+    queued = enqueue_notification_outbox(job_id, messages)
+    duplicates.extend(message for message, was_queued in zip(messages, queued) if not was_queued)
+    for message in duplicates:
+        results.append(
+            {
+                "card_no": message["card_no"],
+                "date": message["date"],
+                "employee_name": message["employee_name"],
+                "status": "DUPLICATE",
+                "notice_type": message["notice_type"],
+                "to_email": message["to_email"],
+                "error": "Already queued or sent by an earlier run",
+            }
+        )
+
+    for item in results:
+        if item["status"] == "FAILED":
+            _LOG_BUFFER.add(
+                card_no=item["card_no"],
+                date_value=str(item.get("date") or job["date"]),
+                notice_type=item["notice_type"],
+                to_email="",
+                cc=item.get("cc") or "",
+                status="FAILED",
+                error=item["error"],
+            )
+
+    update_notification_job(
+        job_id,
+        status="sending",
+        total_targets=int(evaluation["total_targets"]),
+        results=json.dumps(results),
+        error=None,
+        claim_token=None,
+    )
+
+
+def _record_delivery(row: dict[str, Any], error: Exception | None) -> None:
+    if error is None:
+        finish_notification_outbox(int(row["id"]), status="sent")
+        log_status, log_error = "SENT", None
+    else:
+        attempts = int(row["attempts"]) + 1
+        message = str(error) or type(error).__name__
+        if attempts < settings.notify_max_attempts and not _is_permanent(error):
+            finish_notification_outbox(
+                int(row["id"]),
+                status="pending",
+                error=message,
+                next_attempt_at=_iso_after(_backoff_seconds(attempts)),
+            )
+            return
+        finish_notification_outbox(int(row["id"]), status="failed", error=message)
+        log_status, log_error = "FAILED", message
+
+    _LOG_BUFFER.add(
+        card_no=row["card_no"],
+        date_value=row["date"],
+        notice_type=row["type"],
+        to_email=row["to_email"],
+        cc=row["cc"] or "",
+        status=log_status,
+        error=log_error,
+    )
+
+
+def _deliver_due() -> int:
+    # Keep a claimed batch short enough to finish well inside the stale-claim
+    # window even when sends are paced.
+    limit = _DELIVERY_BATCH_SIZE
+    if settings.smtp_max_per_minute:
+        limit = max(1, min(limit, settings.smtp_max_per_minute * (_STALE_CLAIM_SECONDS // 120)))
+
+    rows = claim_due_notification_outbox(uuid.uuid4().hex, limit)
+    if not rows:
+        return 0
+
+    smtp_config = get_smtp_settings(include_password=True)
+    items = []
+    for row in rows:
+        cc_list = _split_cc(row["cc"])
+        message = build_message(
+            smtp_config,
+            to_email=row["to_email"],
+            cc_list=cc_list,
+            subject=row["subject"],
+            body=row["body"],
+        )
+        items.append((row, message, [row["to_email"]] + cc_list))
+
+    try:
+        with SMTPPool(smtp_config) as pool:
+            for row, error in pool.send_many(items):
+                _record_delivery(row, error)
+    finally:
+        _LOG_BUFFER.flush()
+    return len(rows)
+
+
+def run_notification_worker_once() -> bool:
+    """One pass: evaluate a queued job, deliver due outbox rows, close finished jobs."""
+    release_stale_notification_claims(_iso_after(-_STALE_CLAIM_SECONDS))
+    busy = False
+
+    job = claim_notification_job(uuid.uuid4().hex)
+    if job:
+        _evaluate_job(job)
+        busy = True
+    if _deliver_due():
+        busy = True
+
+    complete_drained_notification_jobs()
+    return busy
+
+
+def _worker_loop() -> None:
+    while not _STOP.is_set():
+        try:
+            busy = run_notification_worker_once()
+        except Exception:
+            logger.exception("Notification worker pass failed")
+            busy = False
+        _LOG_BUFFER.flush_if_due()
+        if not busy:
+            _WAKE.wait(settings.notify_worker_poll_seconds)
+            _WAKE.clear()
+
+
+def start_notification_worker() -> None:
+    global _WORKER
+    if settings.notify_worker_poll_seconds <= 0:
+        return
+    with _WORKER_LOCK:
+        if _WORKER is not None and _WORKER.is_alive():
+            return
+        _STOP.clear()
+        _WORKER = threading.Thread(target=_worker_loop, name="notification-worker", daemon=True)
+        _WORKER.start()
+
+
+def stop_notification_worker() -> None:
+    global _WORKER
+    with _WORKER_LOCK:
+        worker, _WORKER = _WORKER, None
+    _STOP.set()
+    _WAKE.set()
+    if worker is not None:
+        worker.join(timeout=settings.smtp_timeout_seconds + 5)
+    _LOG_BUFFER.flush()
@@ -1,20 +1,21 @@
 from __future__ import annotations
 
-import smtplib
 from datetime import date, datetime, time, timedelta
-from email.message import EmailMessage
 from typing import Any
 
 from fastapi import HTTPException, status
 
 from .app_db import (
     get_employee_setting,
+    get_employee_settings_map,
     get_smtp_settings,
-    insert_notification_log,
     list_notification_targets,
 )
-from .config import settings
-from .reports import fetch_daily_report
+from .report_models import DailyReportData
+from .reports import fetch_daily_report_data_for_cards_span, stream_cohort_daily_details
+
+# Longest catch-up span a single run may cover.
+MAX_RANGE_DAYS = 31
 
 
 def _parse_date(value: str) -> date:
@@ -35,27 +36,6 @@ def _parse_hhmm(value: str | None, fallback: str) -> time:
         return datetime.strptime(fallback, "%H:%M").time()
 
 
-def _parse_report_datetime(value: str | None) -> datetime | None:
-    if not value:
-        return None
-    raw = value.strip()
-    if not raw:
-        return None
-
-    patterns = (
-        "%Y-%m-%d %H:%M:%S",
-        "%Y-%m-%dT%H:%M:%S",
-        "%Y-%m-%d %H:%M",
-        "%Y-%m-%dT%H:%M",
-    )
-    for pattern in patterns:
-        try:
-            return datetime.strptime(raw, pattern)
-        except ValueError:
-            continue
-    return None
-
-
 def _format_dt_12h(value: datetime | None) -> str:
     if not value:
         return "N/A"
@@ -136,91 +116,42 @@ def _subject_for_type(notice_type: str, date_value: str) -> str:
     return f"Entry/Exit Notice: Missing Punch - {date_value}"
 
 
-def _send_email(
-    *,
-    smtp_config: dict[str, Any],
-    to_email: str,
-    cc_list: list[str],
-    subject: str,
-    body: str,
-) -> None:
-    host = str(smtp_config.get("host") or "").strip()
-    port = int(smtp_config.get("port") or 0)
-    username = str(smtp_config.get("username") or "").strip()
-    password = str(smtp_config.get("password") or "")
-    from_email = str(smtp_config.get("from_email") or "").strip()
-    from_name = str(smtp_config.get("from_name") or "Oilchem Entry/Exit Admin").strip() or "Oilchem Entry/Exit Admin"
-    use_tls = bool(smtp_config.get("use_tls"))
-    use_ssl = bool(smtp_config.get("use_ssl"))
-
-    if not host or not port or not from_email:
-        raise RuntimeError("SMTP settings are incomplete")
-
-    message = EmailMessage()
-    message["Subject"] = subject
-    message["From"] = f"{from_name} <{from_email}>"
-    message["To"] = to_email
-    if cc_list:
-        message["Cc"] = ", ".join(cc_list)
-    message.set_content(body)
-
-    recipients = [to_email] + cc_list
-
-    if use_ssl:
-        server = smtplib.SMTP_SSL(host, port, timeout=settings.smtp_timeout_seconds)
-    else:
-        server = smtplib.SMTP(host, port, timeout=settings.smtp_timeout_seconds)
-
-    try:
-        if not use_ssl and use_tls:
-            server.starttls()
-        if username:
-            server.login(username, password)
-        server.send_message(message, to_addrs=recipients)
-    finally:
-        server.quit()
-
-
-def run_notifications(date_value: str, card_no: str | None = None) -> dict[str, Any]:
-    target_date = _parse_date(date_value)
-    smtp_config = get_smtp_settings(include_password=True)
-    default_cc = _split_csv(smtp_config.get("cc_list"))
-
-    if card_no:
-        setting = get_employee_setting(card_no)
-        targets = [setting] if setting else []
-    else:
-        targets = list_notification_targets(None)
-
-    results: list[dict[str, Any]] = []
-    sent_count = 0
-    skipped_count = 0
-    failed_count = 0
+def parse_notification_span(date_value: str, end_date_value: str | None = None) -> tuple[date, date]:
+    first_date = _parse_date(date_value)
+    last_date = _parse_date(end_date_value) if end_date_value else first_date
+    if last_date < first_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date",
+        )
+    if (last_date - first_date).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A notification run can cover at most {MAX_RANGE_DAYS} days",
+        )
+    return first_date, last_date
 
-    if card_no and not targets:
-        targets = [
-            {
-                "card_no": card_no,
-                "employee_email": "",
-                "work_start_time": "09:00",
-                "work_end_time": "18:00",
-                "late_grace_minutes": 0,
-                "early_grace_minutes": 0,
-                "notify_cc_override": "",
-            }
-        ]
 
+def _evaluate_day(
+    day_value: str,
+    targets: list[dict[str, Any]],
+    reports: dict[str, DailyReportData],
+    default_cc: list[str],
+    results: list[dict[str, Any]],
+    messages: list[dict[str, Any]],
+) -> None:
+    target_date = _parse_date(day_value)
     for target in targets:
         card = str(target.get("card_no") or "").strip()
         if not card:
             continue
 
-        report = fetch_daily_report(card_no=card, date_value=date_value)
-        employee_name = str(report.get("employee_name") or target.get("employee_name_cache") or card)
+        report = reports[card]
+        employee_name = str(report.identity.employee_name or target.get("employee_name_cache") or card)
         to_email = str(target.get("employee_email") or "").strip()
 
-        first_in = _parse_report_datetime(report.get("first_in"))
-        last_out = _parse_report_datetime(report.get("last_out"))
+        first_in = report.detail.first_in
+        last_out = report.detail.last_out
 
         shift_start, shift_end = _build_shift_window(
             base_date=target_date,
@@ -238,10 +169,10 @@ def run_notifications(date_value: str, card_no: str | None = None) -> dict[str,
         )
 
         if not notice_type:
-            skipped_count += 1
             results.append(
                 {
                     "card_no": card,
+                    "date": day_value,
                     "employee_name": employee_name,
                     "status": "SKIPPED",
                     "notice_type": None,
@@ -252,25 +183,16 @@ def run_notifications(date_value: str, card_no: str | None = None) -> dict[str,
             continue
 
         if not to_email:
-            failed_count += 1
-            error = "Missing employee email in settings"
-            insert_notification_log(
-                card_no=card,
-                date_value=date_value,
-                notice_type=notice_type,
-                to_email="",
-                cc=", ".join(default_cc),
-                status="FAILED",
-                error=error,
-            )
             results.append(
                 {
                     "card_no": card,
+                    "date": day_value,
                     "employee_name": employee_name,
                     "status": "FAILED",
                     "notice_type": notice_type,
                     "to_email": None,
-                    "error": error,
+                    "cc": ", ".join(default_cc),
+                    "error": "Missing employee email in settings",
                 }
             )
             continue
@@ -278,78 +200,192 @@ def run_notifications(date_value: str, card_no: str | None = None) -> dict[str,
         override_cc = _split_csv(str(target.get("notify_cc_override") or ""))
         cc_list = _split_csv(",".join(default_cc + override_cc))
 
-        subject = _subject_for_type(notice_type, date_value)
-        body = "\n".join(
-            [
-                "Oilchem Entry/Exit Notice",
-                "",
-                f"Employee: {employee_name}",
-                f"CardNo: {card}",
-                f"Date: {date_value}",
-                f"First IN: {_format_dt_12h(first_in)}",
-                f"Last OUT: {_format_dt_12h(last_out)}",
-                f"Scheduled Start: {_format_time_12h(shift_start.time())}",
-                f"Scheduled End: {_format_time_12h(shift_end.time())}",
-                f"Status: {status_label}",
-            ]
+        messages.append(
+            {
+                "card_no": card,
+                "date": day_value,
+                "notice_type": notice_type,
+                "employee_name": employee_name,
+                "to_email": to_email,
+                "cc": ", ".join(cc_list),
+                "subject": _subject_for_type(notice_type, day_value),
+                "body": "\n".join(
+                    [
+                        "Oilchem Entry/Exit Notice",
+                        "",
+                        f"Employee: {employee_name}",
+                        f"CardNo: {card}",
+                        f"Date: {day_value}",
+                        f"First IN: {_format_dt_12h(first_in)}",
+                        f"Last OUT: {_format_dt_12h(last_out)}",
+                        f"Scheduled Start: {_format_time_12h(shift_start.time())}",
+                        f"Scheduled End: {_format_time_12h(shift_end.time())}",
+                        f"Status: {status_label}",
+                    ]
+                ),
+            }
         )
 
-        try:
-            _send_email(
-                smtp_config=smtp_config,
-                to_email=to_email,
-                cc_list=cc_list,
-                subject=subject,
-                body=body,
-            )
-            sent_count += 1
-            insert_notification_log(
-                card_no=card,
-                date_value=date_value,
-                notice_type=notice_type,
-                to_email=to_email,
-                cc=", ".join(cc_list),
-                status="SENT",
-                error=None,
-            )
-            results.append(
-                {
-                    "card_no": card,
-                    "employee_name": employee_name,
-                    "status": "SENT",
-                    "notice_type": notice_type,
-                    "to_email": to_email,
-                    "error": None,
-                }
-            )
-        except Exception as exc:
-            failed_count += 1
-            insert_notification_log(
-                card_no=card,
-                date_value=date_value,
-                notice_type=notice_type,
-                to_email=to_email,
-                cc=", ".join(cc_list),
-                status="FAILED",
-                error=str(exc),
-            )
-            results.append(
-                {
-                    "card_no": card,
-                    "employee_name": employee_name,
-                    "status": "FAILED",
-                    "notice_type": notice_type,
-                    "to_email": to_email,
-                    "error": str(exc),
-                }
-            )
 
-    total_targets = len(targets)
+def evaluate_notifications(
+    date_value: str,
+    card_no: str | None = None,
+    end_date_value: str | None = None,
+) -> dict[str, Any]:
+    """
+    Work out which notices a run would send, without sending anything.
+
+    Covers `date_value` alone or every day through `end_date_value`, from one
+    extraction for the whole span. Returns the total target count, a result
+    row per target and day that needs no mail (status SKIPPED) or cannot get
+    one (FAILED, no email), and the rendered messages to deliver.
+    """
+    first_date, last_date = parse_notification_span(date_value, end_date_value)
+    smtp_config = get_smtp_settings()
+    default_cc = _split_csv(smtp_config.get("cc_list"))
+
+    if card_no:
+        setting = get_employee_setting(card_no)
+        targets = [setting] if setting else []
+    else:
+        targets = list_notification_targets(None)
+
+    if card_no and not targets:
+        targets = [
+            {
+                "card_no": card_no,
+                "employee_email": "",
+                "work_start_time": "09:00",
+                "work_end_time": "18:00",
+                "late_grace_minutes": 0,
+                "early_grace_minutes": 0,
+                "notify_cc_override": "",
+            }
+        ]
+
+    # One extraction for every target and day instead of a round of queries per card.
+    reports_by_day = fetch_daily_report_data_for_cards_span(
+        [str(target.get("card_no") or "").strip() for target in targets],
+        first_date.strftime("%Y-%m-%d"),
+        last_date.strftime("%Y-%m-%d"),
+    )
+
+    results: list[dict[str, Any]] = []
+    messages: list[dict[str, Any]] = []
+    for day_value, reports in reports_by_day.items():
+        _evaluate_day(day_value, targets, reports, default_cc, results, messages)
+
     return {
         "date": date_value,
-        "total_targets": total_targets,
-        "sent_count": sent_count,
-        "skipped_count": skipped_count,
-        "failed_count": failed_count,
+        "end_date": end_date_value,
+        "total_targets": len(targets),
         "results": results,
+        "messages": messages,
+    }
+
+
+EXCEPTION_COLUMNS = (
+    "date",
+    "employee_name",
+    "card_no",
+    "department",
+    "notice_type",
+    "status",
+    "first_in",
+    "last_out",
+    "scheduled_start",
+    "scheduled_end",
+    "late_minutes",
+    "early_minutes",
+)
+
+_EXCEPTION_SORT_KEYS = {
+    "date": lambda row: (row["date"], row["employee_name"].lower(), row["card_no"]),
+    "employee": lambda row: (row["employee_name"].lower(), row["card_no"], row["date"]),
+    "card_no": lambda row: (row["card_no"], row["date"]),
+    "department": lambda row: (str(row["department"] or "").lower(), row["employee_name"].lower(), row["date"]),
+    "type": lambda row: (row["notice_type"], row["date"], row["employee_name"].lower()),
+    "late": lambda row: (row["late_minutes"], row["date"], row["employee_name"].lower()),
+    "early": lambda row: (row["early_minutes"], row["date"], row["employee_name"].lower()),
+}
+EXCEPTION_SORTS = tuple(_EXCEPTION_SORT_KEYS)
+
+
+def _minutes_between(later: datetime | None, earlier: datetime | None) -> int:
+    if not later or not earlier or later <= earlier:
+        return 0
+    return int((later - earlier).total_seconds() // 60)
+
+
+def fetch_exceptions_report(
+    period_value: str,
+    *,
+    departments: list[str] | None = None,
+    card_nos: list[str] | None = None,
+    sort: str = "date",
+    descending: bool = False,
+) -> dict[str, Any]:
+    """
+    Late, early and missing-punch exceptions for all active employees over a day or month.
+
+    Uses the same shift and grace rules as notifications (employee settings,
+    09:00-18:00 and no grace when unset) on one bulk extraction; nothing is
+    sent. Days without any punch are absences, not punch exceptions, and are
+    left out.
+    """
+    export = stream_cohort_daily_details(period_value, departments=departments, card_nos=card_nos)
+    settings_by_card = get_employee_settings_map([str(item["card_no"]) for item in export["employees"]])
+    rows: list[dict[str, Any]] = []
+    for employee, detail in export["details"]:
+        card = str(employee["card_no"])
+        setting = settings_by_card.get(card) or {}
+
+        shift_start, shift_end = _build_shift_window(
+            base_date=detail.day,
+            start_hhmm=str(setting.get("work_start_time") or "09:00"),
+            end_hhmm=str(setting.get("work_end_time") or "18:00"),
+        )
+        notice_type, status_label = _build_status(
+            first_in=detail.first_in,
+            last_out=detail.last_out,
+            shift_start=shift_start,
+            shift_end=shift_end,
+            late_grace_minutes=int(setting.get("late_grace_minutes") or 0),
+            early_grace_minutes=int(setting.get("early_grace_minutes") or 0),
+        )
+        if not notice_type:
+            continue
+
+        # Minutes past the shift boundary, counted only for the flagged side.
+        late_minutes = _minutes_between(detail.first_in, shift_start) if "LATE" in notice_type else 0
+        early_minutes = _minutes_between(shift_end, detail.last_out) if "EARLY" in notice_type else 0
+        rows.append(
+            {
+                "date": detail.day.strftime("%Y-%m-%d"),
+                "employee_name": str(employee.get("employee_name") or card),
+                "card_no": card,
+                "department": employee.get("department"),
+                "notice_type": notice_type,
+                "status": status_label,
+                "first_in": detail.first_in.strftime("%Y-%m-%d %H:%M:%S") if detail.first_in else None,
+                "last_out": detail.last_out.strftime("%Y-%m-%d %H:%M:%S") if detail.last_out else None,
+                "scheduled_start": shift_start.strftime("%H:%M"),
+                "scheduled_end": shift_end.strftime("%H:%M"),
+                "late_minutes": late_minutes,
+                "early_minutes": early_minutes,
+            }
+        )
+
+    rows.sort(key=_EXCEPTION_SORT_KEYS.get(sort, _EXCEPTION_SORT_KEYS["date"]), reverse=descending)
+    counts = {"LATE": 0, "EARLY": 0, "LATE_EARLY": 0, "MISSING_PUNCH": 0}
+    for row in rows:
+        counts[row["notice_type"]] += 1
+    return {
+        "period_type": export["period_type"],
+        "period": export["period"],
+        "total_employees": len(export["employees"]),
+        "employees_with_exceptions": len({row["card_no"] for row in rows}),
+        "counts": counts,
+        "filters": {"departments": departments or [], "card_nos": card_nos or []},
+        "rows": rows,
     }
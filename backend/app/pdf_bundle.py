@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import shutil
+import time
+import zipfile
+from collections import deque
+from typing import Any, BinaryIO, Iterable, Iterator
+
+from . import pdf_cache
+from .pdf_pool import render_pdf_many
+
+
+class _ZipSink:
+    # Write-only, non-seekable target: zipfile falls back to data descriptors,
+    # so entries can be flushed to the client as soon as each one is complete.
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._offset = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _unique_name(filename: str, used: set[str]) -> str:
+    candidate = filename
+    stem, dot, extension = filename.rpartition(".")
+    counter = 2
+    while candidate in used:
+        candidate = f"{stem}_{counter}{dot}{extension}" if dot else f"{filename}_{counter}"
+        counter += 1
+    used.add(candidate)
+    return candidate
+
+
+def _write_entry(archive: zipfile.ZipFile, filename: str, source: BinaryIO, used: set[str]) -> None:
+    info = zipfile.ZipInfo(_unique_name(filename, used), date_time=time.localtime()[:6])
+    # PDF page streams are already compressed; deflating them again only costs CPU.
+    info.compress_type = zipfile.ZIP_STORED
+    with archive.open(info, "w") as target:
+        shutil.copyfileobj(source, target, 64 * 1024)
+
+
+def iter_pdf_bundle(kind: str, entries: Iterable[tuple[str, Any, str | None]]) -> Iterator[bytes]:
+    """
+    Stream a ZIP of per-employee PDFs.
+
+    entries yields (filename, report, error); entries with an error are not
+    rendered and are listed in errors.txt instead. Cached PDFs are reused,
+    the rest are rendered through the pool, and each file is written to the
+    archive as soon as it is ready.
+    """
+    sink = _ZipSink()
+    used: set[str] = set()
+    failures: list[tuple[str, str]] = []
+    cached: deque[tuple[str, str]] = deque()
+
+    def _to_render() -> Iterator[tuple[tuple[str, str], Any]]:
+        for filename, report, error in entries:
+            if error:
+                failures.append((filename, error))
+                continue
+            key = pdf_cache.cache_key(kind, report)
+            cached_path = pdf_cache.lookup(key)
+            if cached_path:
+                cached.append((filename, cached_path))
+                continue
+            yield (filename, key), report
+
+    def _write_cached(archive: zipfile.ZipFile) -> Iterator[bytes]:
+        while cached:
+            filename, cached_path = cached.popleft()
+            try:
+                with open(cached_path, "rb") as handle:
+                    _write_entry(archive, filename, handle, used)
+            except OSError as exc:
+                failures.append((filename, f"cached PDF unavailable: {exc}"))
+                continue
+            yield sink.drain()
+
+    with zipfile.ZipFile(sink, "w", allowZip64=True) as archive:
+        for (filename, key), result in render_pdf_many(kind, _to_render()):
+            if isinstance(result, Exception):
+                failures.append((filename, str(result) or type(result).__name__))
+            else:
+                with result:
+                    pdf_cache.store(key, result)
+                    _write_entry(archive, filename, result, used)
+                yield sink.drain()
+            yield from _write_cached(archive)
+        yield from _write_cached(archive)
+
+        if failures:
+            lines = [f"{filename}\t{error}" for filename, error in failures]
+            archive.writestr("errors.txt", "\n".join(lines) + "\n")
+
+    yield sink.drain()
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from threading import Lock
+from typing import Any, BinaryIO
+
+from .config import settings
+from .pdf_exports import PDF_TEMPLATE_VERSION
+
+logger = logging.getLogger(__name__)
+
+_EVICT_LOCK = Lock()
+_STATS_LOCK = Lock()
+_STATS = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+
+def _cache_enabled() -> bool:
+    return settings.pdf_cache_max_mb > 0 and bool(settings.pdf_cache_dir)
+
+
+def _bump(counter: str, amount: int = 1) -> None:
+    with _STATS_LOCK:
+        _STATS[counter] += amount
+
+
+def _jsonable(report: Any) -> Any:
+    if dataclasses.is_dataclass(report) and not isinstance(report, type):
+        return dataclasses.asdict(report)
+    return report
+
+
+def cache_key(kind: str, report: Any) -> str:
+    # Same payload + same template => byte-for-byte the same document, so the
+    # hash of both is a safe identity for the rendered file.
+    material = json.dumps(
+        {"kind": kind, "template": PDF_TEMPLATE_VERSION, "report": _jsonable(report)},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _path_for(key: str) -> str:
+    return os.path.join(settings.pdf_cache_dir, f"{key}.pdf")
+
+
+def lookup(key: str) -> str | None:
+    if not _cache_enabled():
+        return None
+
+    path = _path_for(key)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        _bump("misses")
+        return None
+
+    max_age_seconds = settings.pdf_cache_max_age_hours * 3600
+    if max_age_seconds and time.time() - stat.st_mtime > max_age_seconds:
+        _bump("misses")
+        return None
+
+    try:
+        # mtime doubles as the LRU clock; a hit moves the entry to the back.
+        os.utime(path, None)
+    except OSError:
+        pass
+    _bump("hits")
+    return path
+
+
+def store(key: str, source: BinaryIO) -> None:
+    # Copies from the current position of source and rewinds it afterwards so
+    # the caller can still stream the same file back to the client.
+    if not _cache_enabled():
+        return
+
+    directory = settings.pdf_cache_dir
+    start = source.tell()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".pdf")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                shutil.copyfileobj(source, handle)
+                handle.flush()
+                os.fsync(handle.fileno())
+            # Readers only ever see complete files: rename is atomic on one filesystem.
+            os.replace(temp_path, _path_for(key))
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+    except OSError as exc:
+        logger.warning("PDF cache write failed: %s", exc)
+        return
+    finally:
+        source.seek(start)
+
+    _bump("stores")
+    _evict()
+
+
+def _evict() -> None:
+    if not _EVICT_LOCK.acquire(blocking=False):
+        # Another request is already trimming the cache.
+        return
+    try:
+        directory = settings.pdf_cache_dir
+        now = time.time()
+        max_age_seconds = settings.pdf_cache_max_age_hours * 3600
+        max_bytes = settings.pdf_cache_max_mb * 1024 * 1024
+
+        entries: list[tuple[float, int, str]] = []
+        total_bytes = 0
+        removed = 0
+        with os.scandir(directory) as scan:
+            for entry in scan:
+                if not entry.is_file() or not entry.name.endswith(".pdf"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                stale_temp = entry.name.startswith(".tmp-") and now - stat.st_mtime > 3600
+                expired = bool(max_age_seconds) and now - stat.st_mtime > max_age_seconds
+                if stale_temp or expired:
+                    removed += _remove(entry.path)
+                    continue
+                if entry.name.startswith(".tmp-"):
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_bytes += stat.st_size
+
+        if total_bytes > max_bytes:
+            entries.sort()
+            for _mtime, size, path in entries:
+                if total_bytes <= max_bytes:
+                    break
+                if _remove(path):
+                    removed += 1
+                    total_bytes -= size
+
+        if removed:
+            _bump("evictions", removed)
+    except OSError as exc:
+        logger.warning("PDF cache eviction failed: %s", exc)
+    finally:
+        _EVICT_LOCK.release()
+
+
+def _remove(path: str) -> int:
+    try:
+        os.unlink(path)
+        return 1
+    except OSError:
+        return 0
+
+
+def get_pdf_cache_stats() -> dict[str, Any]:
+    with _STATS_LOCK:
+        snapshot = dict(_STATS)
+
+    entries = 0
+    total_bytes = 0
+    if _cache_enabled() and os.path.isdir(settings.pdf_cache_dir):
+        with os.scandir(settings.pdf_cache_dir) as scan:
+            for entry in scan:
+                if entry.is_file() and entry.name.endswith(".pdf") and not entry.name.startswith(".tmp-"):
+                    entries += 1
+                    try:
+                        total_bytes += entry.stat().st_size
+                    except OSError:
+                        continue
+
+    return {
+        "enabled": _cache_enabled(),
+        "max_mb": settings.pdf_cache_max_mb,
+        "max_age_hours": settings.pdf_cache_max_age_hours,
+        "entries": entries,
+        "size_bytes": total_bytes,
+        **snapshot,
+    }
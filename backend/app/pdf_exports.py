@@ -1,20 +1,30 @@
 from __future__ import annotations
 
+import copy
 import os
 import re
+from bisect import bisect_right
 from datetime import datetime
+from functools import lru_cache, partial
 from io import BytesIO
-from typing import Any, Sequence
+from typing import Any, BinaryIO, Sequence
 from xml.sax.saxutils import escape
 
+from pypdf import PdfReader, PdfWriter
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.lib.units import mm
 from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfgen import canvas
 from reportlab.platypus import Flowable, LongTable, Paragraph, SimpleDocTemplate, Spacer, TableStyle
 
+from .report_models import DailyReportData
+
+# Bump whenever layout or styling changes so cached PDFs are not reused.
+PDF_TEMPLATE_VERSION = "3"
+
 LEFT_MARGIN = 14 * mm
 RIGHT_MARGIN = 14 * mm
 BOTTOM_MARGIN = 16 * mm
@@ -40,6 +50,13 @@ KPI_CARD_PAD_Y = 10.0
 KPI_VALUE_FONT_SIZE = 12
 KPI_LABEL_FONT_SIZE = 8
 
+PAGE_HEADER_FORM = "pageHeader"
+FOOTER_LINE_Y = 11 * mm
+FOOTER_TEXT_Y = 7.6 * mm
+
+FAST_TABLE_PAD_X = 6.0
+FAST_TABLE_PAD_Y = 5.0
+
 PDF_LOGO_PATH = os.path.join(os.path.dirname(__file__), "assets", "logo.png")
 
 PALETTE = {
@@ -249,15 +266,31 @@ def _cell_paragraph(value: Any, *, style: ParagraphStyle, fallback: str = "-") -
     return Paragraph(escape(text), style)
 
 
+def _load_logo(logo_path: str) -> ImageReader | None:
+    try:
+        modified_at = os.path.getmtime(logo_path)
+    except OSError:
+        return None
+    return _decode_logo(logo_path, modified_at)
+
+
+@lru_cache(maxsize=8)
+def _decode_logo(logo_path: str, modified_at: float) -> ImageReader:
+    # Keyed on mtime so replacing the logo file takes effect without a restart.
+    reader = ImageReader(logo_path)
+    reader.getRGBData()
+    return reader
+
+
 def _draw_logo_in_square(canv: canvas.Canvas, *, logo_path: str | None, x: float, y: float, size: float) -> None:
     canv.saveState()
     canv.setFillColor(colors.HexColor("#EEF3FA"))
     canv.roundRect(x - 4, y - 4, size + 8, size + 8, 6, stroke=0, fill=1)
 
-    if logo_path and os.path.exists(logo_path):
+    if logo_path:
         try:
-            reader = ImageReader(logo_path)
-            image_width, image_height = reader.getSize()
+            reader = _load_logo(logo_path)
+            image_width, image_height = reader.getSize() if reader else (0, 0)
             if image_width > 0 and image_height > 0:
                 scale = min(size / float(image_width), size / float(image_height))
                 draw_w = float(image_width) * scale
@@ -356,35 +389,53 @@ def draw_header(
 
 
 class NumberedCanvas(canvas.Canvas):
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
+    """
+    Stamps "Page X of Y" without holding per-page state until save().
+
+    Each page's footer is drawn as it is finished, with the page label left as a
+    reference to a small form XObject; the forms are defined in save() once the
+    total is known. PDF allows the forward reference, so memory stays flat no
+    matter how many pages the report runs to.
+
+    A chunk of a larger document passes page_offset and total_pages so its
+    pages are numbered as part of the whole.
+    """
+
+    def __init__(self, *args: Any, page_offset: int = 0, total_pages: int | None = None, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
-        self._saved_page_states: list[dict[str, Any]] = []
+        self._footer_pages = page_offset
+        self._page_offset = page_offset
+        self._total_pages = total_pages
 
     def showPage(self) -> None:
-        self._saved_page_states.append(dict(self.__dict__))
-        self._startPage()
+        self._footer_pages += 1
+        self._draw_footer(self._footer_pages)
+        canvas.Canvas.showPage(self)
 
     def save(self) -> None:
-        total_pages = len(self._saved_page_states)
-        for state in self._saved_page_states:
-            self.__dict__.update(state)
-            self._draw_footer(total_pages)
-            canvas.Canvas.showPage(self)
+        total_pages = self._total_pages or self._footer_pages
+        for page_number in range(self._page_offset + 1, self._footer_pages + 1):
+            self.beginForm(self._page_label_form(page_number))
+            self.setFillColor(PALETTE["muted"])
+            self.setFont("Helvetica", 8)
+            self.drawRightString(PAGE_WIDTH - RIGHT_MARGIN, FOOTER_TEXT_Y, f"Page {page_number} of {total_pages}")
+            self.endForm()
         canvas.Canvas.save(self)
 
-    def _draw_footer(self, total_pages: int) -> None:
-        line_y = 11 * mm
-        text_y = 7.6 * mm
+    @staticmethod
+    def _page_label_form(page_number: int) -> str:
+        return f"footerPageLabel{page_number}"
 
+    def _draw_footer(self, page_number: int) -> None:
         self.saveState()
         self.setStrokeColor(PALETTE["line"])
         self.setLineWidth(0.5)
-        self.line(LEFT_MARGIN, line_y, PAGE_WIDTH - RIGHT_MARGIN, line_y)
+        self.line(LEFT_MARGIN, FOOTER_LINE_Y, PAGE_WIDTH - RIGHT_MARGIN, FOOTER_LINE_Y)
 
         self.setFillColor(PALETTE["muted"])
         self.setFont("Helvetica", 8)
-        self.drawString(LEFT_MARGIN, text_y, "Generated by Oilchem Entry/Exit Dashboard")
-        self.drawRightString(PAGE_WIDTH - RIGHT_MARGIN, text_y, f"Page {self._pageNumber} of {total_pages}")
+        self.drawString(LEFT_MARGIN, FOOTER_TEXT_Y, "Generated by Oilchem Entry/Exit Dashboard")
+        self.doForm(self._page_label_form(page_number))
         self.restoreState()
 
 
@@ -570,6 +621,250 @@ def _build_table(
     return table
 
 
+@lru_cache(maxsize=16384)
+def _string_width(text: str, font_name: str, font_size: float) -> float:
+    return pdfmetrics.stringWidth(text, font_name, font_size)
+
+
+def _break_word(word: str, font_name: str, font_size: float, max_width: float) -> list[str]:
+    pieces: list[str] = []
+    current = ""
+    for char in word:
+        if current and _string_width(current + char, font_name, font_size) > max_width:
+            pieces.append(current)
+            current = char
+        else:
+            current += char
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+@lru_cache(maxsize=16384)
+def _wrap_words(text: str, font_name: str, font_size: float, max_width: float) -> tuple[str, ...]:
+    if not text or _string_width(text, font_name, font_size) <= max_width:
+        return (text,)
+
+    # Words wrap like the Paragraph cells did; a single word wider than the
+    # column (a long total, a one-word header) breaks across lines instead.
+    lines: list[str] = []
+    current = ""
+    for word in text.split():
+        candidate = f"{current} {word}" if current else word
+        if _string_width(candidate, font_name, font_size) <= max_width:
+            current = candidate
+            continue
+        if current:
+            lines.append(current)
+        pieces = _break_word(word, font_name, font_size, max_width)
+        lines.extend(pieces[:-1])
+        current = pieces[-1]
+    if current:
+        lines.append(current)
+    return tuple(lines) or ("",)
+
+
+class FastTable(Flowable):
+    """
+    Table drawn straight onto the canvas.
+
+    Same look as _build_table (navy header repeated per page, striped rows, grid,
+    totals rows with the label spanning to total_span_end). Cells wrap onto as
+    many lines as they need, but lines are measured with memoised stringWidth
+    calls instead of laid out as Paragraphs, and rows are paginated from
+    precomputed heights, so a 1,200-row all-employee table lays out in linear time.
+    """
+
+    def __init__(
+        self,
+        *,
+        headers: Sequence[str],
+        body_rows: Sequence[Sequence[str]],
+        col_widths: Sequence[float],
+        total_rows: Sequence[tuple[str, str]] | None = None,
+        total_span_end: int | None = None,
+        _rows: list[tuple[str, Sequence[str]]] | None = None,
+        _start: int = 0,
+        _end: int | None = None,
+    ) -> None:
+        super().__init__()
+        self.headers = [_safe_text(cell, fallback="") for cell in headers]
+        self.col_widths = [float(width) for width in col_widths]
+        self.width = sum(self.col_widths)
+        self.hAlign = "LEFT"
+
+        span_end = total_span_end if total_span_end is not None else len(self.headers) - 2
+        self.total_span_end = max(0, min(span_end, len(self.headers) - 2))
+
+        if _rows is None:
+            _rows = [("body", row) for row in body_rows] or [("body", ["No data"])]
+            _rows.extend(("total", (label, value)) for label, value in total_rows or ())
+        self._rows = _rows
+        self._start = _start
+        self._end = len(_rows) if _end is None else _end
+
+        pad_x = FAST_TABLE_PAD_X * 2
+        self._header_lines = [
+            _wrap_words(text, "Helvetica-Bold", TABLE_HEADER_STYLE.fontSize, width - pad_x)
+            for text, width in zip(self.headers, self.col_widths)
+        ]
+        line_count = max((len(lines) for lines in self._header_lines), default=1)
+        self.header_height = (line_count * TABLE_HEADER_STYLE.leading) + (FAST_TABLE_PAD_Y * 2)
+
+        # Wrapped lines and running row offsets are computed once and shared by
+        # every slice, so split() is a bisect rather than a relayout.
+        self._cell_lines = [self._wrap_row(kind, cells) for kind, cells in _rows]
+        self._offsets = [0.0]
+        for cells in self._cell_lines:
+            line_count = max(len(lines) for lines in cells)
+            self._offsets.append(self._offsets[-1] + (line_count * TABLE_CELL_STYLE.leading) + (FAST_TABLE_PAD_Y * 2))
+        self.height = self.header_height + self._offsets[self._end] - self._offsets[self._start]
+
+    def _wrap_row(self, kind: str, cells: Sequence[str]) -> list[tuple[str, ...]]:
+        font_size = TABLE_CELL_STYLE.fontSize
+        pad_x = FAST_TABLE_PAD_X * 2
+        if kind == "total":
+            label, value = cells
+            span_width = sum(self.col_widths[: self.total_span_end + 1])
+            return [
+                _wrap_words(_safe_text(label), "Helvetica-Bold", font_size, span_width - pad_x),
+                _wrap_words(_safe_text(value, fallback="N/A"), "Helvetica-Bold", font_size, self.col_widths[-1] - pad_x),
+            ]
+
+        lines: list[tuple[str, ...]] = []
+        for index, width in enumerate(self.col_widths):
+            raw = cells[index] if index < len(cells) else ""
+            text = _safe_text(raw, fallback="-" if index < len(cells) else "")
+            lines.append(_wrap_words(text, "Helvetica", font_size, width - pad_x))
+        return lines
+
+    def wrap(self, avail_width: float, avail_height: float) -> tuple[float, float]:
+        return self.width, self.height
+
+    def split(self, avail_width: float, avail_height: float) -> list[Flowable]:
+        limit = self._offsets[self._start] + (avail_height - self.header_height)
+        cut = bisect_right(self._offsets, limit, self._start, self._end + 1) - 1
+        if cut <= self._start:
+            return []
+        if cut >= self._end:
+            return [self]
+        return [self._slice(self._start, cut), self._slice(cut, self._end)]
+
+    def _slice(self, start: int, end: int) -> "FastTable":
+        part = copy.copy(self)
+        # split() runs with the frame's canv/_frame attached; the parts must not inherit them.
+        for attr in ("canv", "_frame", "_postponed"):
+            part.__dict__.pop(attr, None)
+        part._start = start
+        part._end = end
+        part.height = self.header_height + self._offsets[end] - self._offsets[start]
+        return part
+
+    def draw(self) -> None:
+        canv = self.canv
+        col_x = [0.0]
+        for width in self.col_widths:
+            col_x.append(col_x[-1] + width)
+
+        canv.saveState()
+        top = self.height
+        header_bottom = top - self.header_height
+
+        canv.setFillColor(PALETTE["navy"])
+        canv.rect(0, header_bottom, self.width, self.header_height, stroke=0, fill=1)
+        canv.setFillColor(colors.white)
+        header_font_size = TABLE_HEADER_STYLE.fontSize
+        header_leading = TABLE_HEADER_STYLE.leading
+        canv.setFont("Helvetica-Bold", header_font_size)
+        for index, lines in enumerate(self._header_lines):
+            block_height = len(lines) * header_leading
+            baseline = header_bottom + (self.header_height + block_height) / 2.0 - header_font_size
+            for line in lines:
+                canv.drawString(col_x[index] + FAST_TABLE_PAD_X, baseline, line)
+                baseline -= header_leading
+
+        cell_font_size = TABLE_CELL_STYLE.fontSize
+        cell_leading = TABLE_CELL_STYLE.leading
+        baseline_offset = (cell_leading - cell_font_size) / 2.0 + (cell_font_size * 0.22)
+        row_tops = [header_bottom]
+        y = header_bottom
+        for position in range(self._start, self._end):
+            kind = self._rows[position][0]
+            cell_lines = self._cell_lines[position]
+            row_height = self._offsets[position + 1] - self._offsets[position]
+            y -= row_height
+            row_tops.append(y)
+            if kind == "total":
+                background = PALETTE["totals"]
+            else:
+                background = PALETTE["stripe_even"] if position % 2 == 0 else PALETTE["stripe_odd"]
+            canv.setFillColor(background)
+            canv.rect(0, y, self.width, row_height, stroke=0, fill=1)
+
+            if kind == "total":
+                canv.setFillColor(PALETTE["navy"])
+                canv.setFont("Helvetica-Bold", cell_font_size)
+                cell_x = [FAST_TABLE_PAD_X, col_x[-2] + FAST_TABLE_PAD_X]
+            else:
+                canv.setFillColor(PALETTE["text"])
+                canv.setFont("Helvetica", cell_font_size)
+                cell_x = [x + FAST_TABLE_PAD_X for x in col_x[:-1]]
+
+            # Each cell's lines are centred vertically, matching VALIGN MIDDLE.
+            for x, lines in zip(cell_x, cell_lines):
+                baseline = y + (row_height + (len(lines) - 2) * cell_leading) / 2.0 + baseline_offset
+                for line in lines:
+                    if line:
+                        canv.drawString(x, baseline, line)
+                    baseline -= cell_leading
+
+        canv.setStrokeColor(PALETTE["grid"])
+        canv.setLineWidth(0.4)
+        bottom = y
+        path = canv.beginPath()
+        for row_top in [top] + row_tops:
+            path.moveTo(0, row_top)
+            path.lineTo(self.width, row_top)
+        path.moveTo(0, top)
+        path.lineTo(0, bottom)
+        path.moveTo(self.width, top)
+        path.lineTo(self.width, bottom)
+
+        # Interior verticals run in unbroken segments, stopping at totals rows
+        # for the columns their label spans.
+        for index in range(1, len(self.col_widths)):
+            segment_top = top
+            for offset, position in enumerate(range(self._start, self._end)):
+                row_top, row_bottom = row_tops[offset], row_tops[offset + 1]
+                if self._rows[position][0] == "total" and index <= self.total_span_end:
+                    if segment_top > row_top:
+                        path.moveTo(col_x[index], segment_top)
+                        path.lineTo(col_x[index], row_top)
+                    segment_top = row_bottom
+            if segment_top > bottom:
+                path.moveTo(col_x[index], segment_top)
+                path.lineTo(col_x[index], bottom)
+        canv.drawPath(path, stroke=1, fill=0)
+        canv.restoreState()
+
+
+def _build_fast_table(
+    *,
+    headers: Sequence[str],
+    body_rows: Sequence[Sequence[str]],
+    col_widths: Sequence[float],
+    total_rows: Sequence[tuple[str, str]] | None = None,
+    total_span_end: int | None = None,
+) -> FastTable:
+    return FastTable(
+        headers=headers,
+        body_rows=body_rows,
+        col_widths=col_widths,
+        total_rows=total_rows,
+        total_span_end=total_span_end,
+    )
+
+
 def _month_label(month_value: str) -> str:
     text = _safe_text(month_value, fallback="")
     if re.match(r"^\d{4}-\d{2}$", text):
@@ -581,6 +876,50 @@ def _month_label(month_value: str) -> str:
     return text
 
 
+def _paired_transaction_rows(parsed_tx: list[tuple[datetime, str]]) -> tuple[list[list[str]], int]:
+    # Pairs IN/OUT punches in time order; an IN left open gets a "Missing OUT" row.
+    rows: list[list[str]] = []
+    sessions = 0
+    parsed_tx = sorted(parsed_tx, key=lambda item: item[0])
+
+    current_in: datetime | None = None
+    for stamp, tx_type in parsed_tx:
+        if tx_type == "IN":
+            if current_in is None:
+                current_in = stamp
+            continue
+
+        if current_in is None:
+            continue
+
+        if stamp < current_in:
+            continue
+
+        duration_minutes = int((stamp - current_in).total_seconds() // 60)
+        rows.append(
+            [
+                current_in.strftime("%Y-%m-%d"),
+                current_in.strftime("%I:%M:%S %p"),
+                stamp.strftime("%I:%M:%S %p"),
+                _safe_text(_minutes_to_hhmm(duration_minutes), fallback="-"),
+            ]
+        )
+        sessions += 1
+        current_in = None
+
+    if current_in is not None:
+        rows.append(
+            [
+                current_in.strftime("%Y-%m-%d"),
+                current_in.strftime("%I:%M:%S %p"),
+                "Missing OUT",
+                "-",
+            ]
+        )
+
+    return rows, sessions
+
+
 def _table_rows_from_daily_rows_payload(report: dict[str, Any]) -> tuple[list[list[str]], int]:
     date_fallback = _safe_text(report.get("date"), fallback="-")
     rows_payload = report.get("rows", []) or []
@@ -649,52 +988,17 @@ def _table_rows_from_daily_rows_payload(report: dict[str, Any]) -> tuple[list[li
 
         parsed_tx.append((parsed_stamp, tx_type))
 
-    parsed_tx.sort(key=lambda item: item[0])
-
-    current_in: datetime | None = None
-    for stamp, tx_type in parsed_tx:
-        if tx_type == "IN":
-            if current_in is None:
-                current_in = stamp
-            continue
-
-        if current_in is None:
-            continue
-
-        if stamp < current_in:
-            continue
-
-        duration_minutes = int((stamp - current_in).total_seconds() // 60)
-        rows.append(
-            [
-                current_in.strftime("%Y-%m-%d"),
-                current_in.strftime("%I:%M:%S %p"),
-                stamp.strftime("%I:%M:%S %p"),
-                _safe_text(_minutes_to_hhmm(duration_minutes), fallback="-"),
-            ]
-        )
-        sessions += 1
-        current_in = None
-
-    if current_in is not None:
-        rows.append(
-            [
-                current_in.strftime("%Y-%m-%d"),
-                current_in.strftime("%I:%M:%S %p"),
-                "Missing OUT",
-                "-",
-            ]
-        )
+    return _paired_transaction_rows(parsed_tx)
 
-    return rows, sessions
-
-
-def _daily_summary_cards(report: dict[str, Any], sessions_count: int) -> list[dict[str, str]]:
-    first_in = _format_time_12h(report.get("first_in")) if _has_value(report.get("first_in")) else "N/A"
-    last_out = _format_time_12h(report.get("last_out")) if _has_value(report.get("last_out")) else "N/A"
-
-    total_in_hhmm, total_out_hhmm = _resolve_total_in_out_hhmm(report)
 
+def _daily_summary_cards(
+    *,
+    first_in: str,
+    last_out: str,
+    total_in_hhmm: str,
+    total_out_hhmm: str,
+    sessions_count: int,
+) -> list[dict[str, str]]:
     return [
         {"label": "First IN", "value": first_in},
         {"label": "Last OUT", "value": last_out},
@@ -733,19 +1037,33 @@ def _build_document(
     title: str,
     subtitle_lines: Sequence[str],
     story: Sequence[Any],
-) -> bytes:
-    buffer = BytesIO()
+    output: BinaryIO | None = None,
+    page_offset: int = 0,
+    total_pages: int | None = None,
+    canvasmaker: Any = None,
+) -> bytes | None:
+    # With an output file the PDF is written straight into it and nothing is
+    # returned, so callers that stream from disk never hold a second copy.
+    buffer = output if output is not None else BytesIO()
     logo_path = resolve_logo_path()
+    header_state = {"defined": False}
 
     def _draw_page_header(canv: canvas.Canvas, doc: SimpleDocTemplate) -> None:
-        draw_header(
-            canv,
-            page_width=doc.pagesize[0],
-            page_height=doc.pagesize[1],
-            title=title,
-            subtitle_lines=subtitle_lines,
-            logo_path=logo_path,
-        )
+        # The header is identical on every page: draw it once into a form
+        # XObject and reference that, instead of re-emitting logo and text.
+        if not header_state["defined"]:
+            canv.beginForm(PAGE_HEADER_FORM)
+            draw_header(
+                canv,
+                page_width=doc.pagesize[0],
+                page_height=doc.pagesize[1],
+                title=title,
+                subtitle_lines=subtitle_lines,
+                logo_path=logo_path,
+            )
+            canv.endForm()
+            header_state["defined"] = True
+        canv.doForm(PAGE_HEADER_FORM)
 
     doc = SimpleDocTemplate(
         buffer,
@@ -760,21 +1078,83 @@ def _build_document(
         list(story),
         onFirstPage=_draw_page_header,
         onLaterPages=_draw_page_header,
-        canvasmaker=NumberedCanvas,
+        canvasmaker=canvasmaker or partial(NumberedCanvas, page_offset=page_offset, total_pages=total_pages),
     )
+    if output is not None:
+        return None
     return buffer.getvalue()
 
 
-def generate_daily_pdf(report: dict[str, Any]) -> bytes:
-    generated_at = datetime.now().strftime("%Y-%m-%d %I:%M %p")
-    report_date = _safe_text(report.get("date"), fallback="N/A")
-    employee_name = _safe_text(report.get("employee_name"), fallback="Unknown")
-    card_no = _safe_text(report.get("card_no"), fallback="Unknown")
-
+def _daily_pdf_view_from_model(report: DailyReportData) -> dict[str, Any]:
+    detail = report.detail
+    rows = [
+        [
+            interval.start.strftime("%Y-%m-%d"),
+            interval.start.strftime("%I:%M:%S %p"),
+            interval.end.strftime("%I:%M:%S %p"),
+            _safe_text(_minutes_to_hhmm(interval.minutes), fallback="-"),
+        ]
+        for interval in detail.intervals
+    ]
+    sessions_count = len(rows)
+    if not rows:
+        # Same fallback as the payload view: no closed interval, show the open INs.
+        rows, sessions_count = _paired_transaction_rows(
+            [(tx.event_time, "IN" if tx.state == 1 else "OUT") for tx in detail.transactions]
+        )
+    return {
+        "date": detail.day.strftime("%Y-%m-%d"),
+        "employee_name": report.identity.employee_name,
+        "card_no": report.identity.card_no,
+        "rows": rows,
+        "sessions_count": sessions_count,
+        "first_in": detail.first_in.strftime("%I:%M:%S %p") if detail.first_in else "N/A",
+        "last_out": detail.last_out.strftime("%I:%M:%S %p") if detail.last_out else "N/A",
+        "total_in_hhmm": _safe_text(_minutes_to_hhmm(detail.total_in_minutes), fallback="N/A"),
+        "total_out_hhmm": _safe_text(_minutes_to_hhmm(detail.total_out_minutes), fallback="N/A"),
+        "notes": list(detail.notes),
+    }
+
+
+def _daily_pdf_view_from_payload(report: dict[str, Any]) -> dict[str, Any]:
     rows, sessions_count = _table_rows_from_daily_rows_payload(report)
     total_in_hhmm, total_out_hhmm = _resolve_total_in_out_hhmm(report)
+    return {
+        "date": report.get("date"),
+        "employee_name": report.get("employee_name"),
+        "card_no": report.get("card_no"),
+        "rows": rows,
+        "sessions_count": sessions_count,
+        "first_in": _format_time_12h(report.get("first_in")) if _has_value(report.get("first_in")) else "N/A",
+        "last_out": _format_time_12h(report.get("last_out")) if _has_value(report.get("last_out")) else "N/A",
+        "total_in_hhmm": total_in_hhmm,
+        "total_out_hhmm": total_out_hhmm,
+        "notes": report.get("notes", []) or [],
+    }
+
+
+def generate_daily_pdf(report: DailyReportData | dict[str, Any], output: BinaryIO | None = None) -> bytes | None:
+    if isinstance(report, DailyReportData):
+        view = _daily_pdf_view_from_model(report)
+    else:
+        view = _daily_pdf_view_from_payload(report)
 
-    cards = _daily_summary_cards(report, sessions_count)
+    generated_at = datetime.now().strftime("%Y-%m-%d %I:%M %p")
+    report_date = _safe_text(view["date"], fallback="N/A")
+    employee_name = _safe_text(view["employee_name"], fallback="Unknown")
+    card_no = _safe_text(view["card_no"], fallback="Unknown")
+
+    rows = view["rows"]
+    total_in_hhmm = view["total_in_hhmm"]
+    total_out_hhmm = view["total_out_hhmm"]
+
+    cards = _daily_summary_cards(
+        first_in=view["first_in"],
+        last_out=view["last_out"],
+        total_in_hhmm=total_in_hhmm,
+        total_out_hhmm=total_out_hhmm,
+        sessions_count=view["sessions_count"],
+    )
 
     story: list[Any] = []
     story.append(KpiRow(cards=cards, cols=5, gap=8.0, card_h=KPI_CARD_HEIGHT))
@@ -795,7 +1175,7 @@ def generate_daily_pdf(report: dict[str, Any]) -> bytes:
         )
     )
 
-    notes = report.get("notes", []) or []
+    notes = view["notes"]
     if notes:
         story.append(Spacer(1, 8))
         story.append(_build_section_heading("Notes"))
@@ -809,10 +1189,11 @@ def generate_daily_pdf(report: dict[str, Any]) -> bytes:
             f"Report Date: {report_date} | Generated: {generated_at}",
         ],
         story=story,
+        output=output,
     )
 
 
-def generate_monthly_pdf(report: dict[str, Any]) -> bytes:
+def generate_monthly_pdf(report: dict[str, Any], output: BinaryIO | None = None) -> bytes | None:
     generated_at = datetime.now().strftime("%Y-%m-%d %I:%M %p")
     period = _safe_text(report.get("month"), fallback="N/A")
     employee_name = _safe_text(report.get("employee_name"), fallback="Unknown")
@@ -930,10 +1311,11 @@ def generate_monthly_pdf(report: dict[str, Any]) -> bytes:
             f"Period: {period} | Generated: {generated_at}",
         ],
         story=story,
+        output=output,
     )
 
 
-def generate_yearly_pdf(report: dict[str, Any]) -> bytes:
+def generate_yearly_pdf(report: dict[str, Any], output: BinaryIO | None = None) -> bytes | None:
     generated_at = datetime.now().strftime("%Y-%m-%d %I:%M %p")
     year_label = _safe_text(report.get("year"), fallback="N/A")
     employee_name = _safe_text(report.get("employee_name"), fallback="Unknown")
@@ -1070,6 +1452,7 @@ def generate_yearly_pdf(report: dict[str, Any]) -> bytes:
             f"Year: {year_label} | Generated: {generated_at}",
         ],
         story=story,
+        output=output,
     )
 
 
@@ -1099,13 +1482,25 @@ def _summary_cards_for_all_report(
     return cards
 
 
-def generate_daily_all_pdf(report: dict[str, Any]) -> bytes:
+def _all_report_period_line(label: str, value: str, report: dict[str, Any]) -> str:
+    filters = dict(report.get("filters") or {})
+    departments = [str(item) for item in filters.get("departments") or []]
+    card_nos = [str(item) for item in filters.get("card_nos") or []]
+
+    parts = [f"{label}: {value}"]
+    if departments:
+        parts.append(f"Department: {', '.join(departments)}")
+    if card_nos:
+        parts.append(f"Cards: {len(card_nos)} selected")
+    return " | ".join(parts)
+
+
+def _daily_all_view(report: dict[str, Any]) -> dict[str, Any]:
     generated_at = datetime.now().strftime("%Y-%m-%d %I:%M %p")
     report_date = _safe_text(report.get("date"), fallback="N/A")
     summary = dict(report.get("summary") or {})
     rows_payload = list(report.get("rows") or [])
 
-    cards = _summary_cards_for_all_report(summary=summary, include_working_days=False)
     row_data: list[list[str]] = []
     for row in rows_payload:
         first_in = _format_time_12h(row.get("first_in")) if _has_value(row.get("first_in")) else "-"
@@ -1139,51 +1534,46 @@ def generate_daily_all_pdf(report: dict[str, Any]) -> bytes:
         summary.get("total_duration_readable"),
         fallback=_safe_text(_minutes_to_readable(_to_int(summary.get("total_duration_minutes"))), fallback="N/A"),
     )
-    story: list[Any] = []
-    _append_kpi_grid(story, cards=cards, max_cols=4, gap=KPI_GAP_X, card_h=KPI_CARD_HEIGHT, row_gap=KPI_GAP_Y)
-    story.append(Spacer(1, KPI_GAP_AFTER))
-    story.append(_build_section_heading("Daily Entry/Exit Summary (All Employees)"))
-    story.append(Spacer(1, 2))
-    story.append(
-        _build_table(
-            headers=["Employee", "CardNo", "First IN", "Last OUT", "Total Duration", "Total In Hours", "Total Out Hours", "Sessions"],
-            body_rows=row_data,
-            col_widths=[
-                CONTENT_WIDTH * 0.19,
-                CONTENT_WIDTH * 0.11,
-                CONTENT_WIDTH * 0.14,
-                CONTENT_WIDTH * 0.14,
-                CONTENT_WIDTH * 0.12,
-                CONTENT_WIDTH * 0.11,
-                CONTENT_WIDTH * 0.11,
-                CONTENT_WIDTH * 0.08,
-            ],
-            total_rows=[
-                ("Grand Total Duration", total_duration_text),
-                ("Total In Hour", _safe_text(summary.get("total_in_hhmm"), fallback="N/A")),
-                ("Total Out Hour", _safe_text(summary.get("total_out_hhmm"), fallback="N/A")),
-            ],
-            total_span_end=6,
-        )
-    )
-
-    return _build_document(
-        title="Oilchem Daily Entry/Exit Report (All Employees)",
-        subtitle_lines=[
-            f"Period: {report_date}",
+    return {
+        "title": "Oilchem Daily Entry/Exit Report (All Employees)",
+        "subtitle_lines": [
+            _all_report_period_line("Period", report_date, report),
             f"Generated: {generated_at}",
         ],
-        story=story,
-    )
+        "cards": _summary_cards_for_all_report(summary=summary, include_working_days=False),
+        "heading": "Daily Entry/Exit Summary (All Employees)",
+        "headers": ["Employee", "CardNo", "First IN", "Last OUT", "Total Duration", "Total In Hours", "Total Out Hours", "Sessions"],
+        "body_rows": row_data,
+        "col_widths": [
+            CONTENT_WIDTH * 0.19,
+            CONTENT_WIDTH * 0.11,
+            CONTENT_WIDTH * 0.14,
+            CONTENT_WIDTH * 0.14,
+            CONTENT_WIDTH * 0.12,
+            CONTENT_WIDTH * 0.11,
+            CONTENT_WIDTH * 0.11,
+            CONTENT_WIDTH * 0.08,
+        ],
+        "total_rows": [
+            ("Grand Total Duration", total_duration_text),
+            ("Total In Hour", _safe_text(summary.get("total_in_hhmm"), fallback="N/A")),
+            ("Total Out Hour", _safe_text(summary.get("total_out_hhmm"), fallback="N/A")),
+        ],
+        "total_span_end": 6,
+    }
 
 
-def generate_monthly_all_pdf(report: dict[str, Any]) -> bytes:
+def _period_all_view(report: dict[str, Any], *, period_type: str) -> dict[str, Any]:
     generated_at = datetime.now().strftime("%Y-%m-%d %I:%M %p")
-    month_value = _safe_text(report.get("month"), fallback="N/A")
     summary = dict(report.get("summary") or {})
     rows_payload = list(report.get("rows") or [])
+    if period_type == "monthly":
+        period_line = _all_report_period_line("Period", _safe_text(report.get("month"), fallback="N/A"), report)
+        label, total_label = "Monthly", "Grand Total Hours (Month)"
+    else:
+        period_line = _all_report_period_line("Year", _safe_text(report.get("year"), fallback="N/A"), report)
+        label, total_label = "Yearly", "Grand Total Hours (Year)"
 
-    cards = _summary_cards_for_all_report(summary=summary, include_working_days=True)
     row_data: list[list[str]] = []
     for row in rows_payload:
         total_hours = _safe_text(
@@ -1206,128 +1596,257 @@ def generate_monthly_all_pdf(report: dict[str, Any]) -> bytes:
             ]
         )
 
-    story: list[Any] = []
-    _append_kpi_grid(story, cards=cards, max_cols=4, gap=KPI_GAP_X, card_h=KPI_CARD_HEIGHT, row_gap=KPI_GAP_Y)
-    story.append(Spacer(1, KPI_GAP_AFTER))
-    story.append(_build_section_heading("Monthly Entry/Exit Summary (All Employees)"))
-    story.append(Spacer(1, 2))
-    story.append(
-        _build_table(
-            headers=["Employee", "CardNo", "Working Days", "Total Hours", "Avg Hours/Day", "Missing Punch Days", "Total Sessions"],
-            body_rows=row_data,
-            col_widths=[
-                CONTENT_WIDTH * 0.22,
-                CONTENT_WIDTH * 0.12,
-                CONTENT_WIDTH * 0.11,
-                CONTENT_WIDTH * 0.20,
-                CONTENT_WIDTH * 0.13,
-                CONTENT_WIDTH * 0.12,
-                CONTENT_WIDTH * 0.10,
-            ],
-            total_rows=[
-                ("Grand Total Hours (Month)", _safe_text(summary.get("total_work_readable"), fallback="N/A")),
-                ("Total In Hour", _safe_text(summary.get("total_in_hhmm"), fallback="N/A")),
-                ("Total Out Hour", _safe_text(summary.get("total_out_hhmm"), fallback="N/A")),
-            ],
-            total_span_end=5,
-        )
-    )
-
-    return _build_document(
-        title="Oilchem Monthly Entry/Exit Report (All Employees)",
-        subtitle_lines=[
-            f"Period: {month_value}",
-            f"Generated: {generated_at}",
+    return {
+        "title": f"Oilchem {label} Entry/Exit Report (All Employees)",
+        "subtitle_lines": [period_line, f"Generated: {generated_at}"],
+        "cards": _summary_cards_for_all_report(summary=summary, include_working_days=True),
+        "heading": f"{label} Entry/Exit Summary (All Employees)",
+        "headers": ["Employee", "CardNo", "Working Days", "Total Hours", "Avg Hours/Day", "Missing Punch Days", "Total Sessions"],
+        "body_rows": row_data,
+        "col_widths": [
+            CONTENT_WIDTH * 0.22,
+            CONTENT_WIDTH * 0.12,
+            CONTENT_WIDTH * 0.11,
+            CONTENT_WIDTH * 0.20,
+            CONTENT_WIDTH * 0.13,
+            CONTENT_WIDTH * 0.12,
+            CONTENT_WIDTH * 0.10,
         ],
-        story=story,
-    )
+        "total_rows": [
+            (total_label, _safe_text(summary.get("total_work_readable"), fallback="N/A")),
+            ("Total In Hour", _safe_text(summary.get("total_in_hhmm"), fallback="N/A")),
+            ("Total Out Hour", _safe_text(summary.get("total_out_hhmm"), fallback="N/A")),
+        ],
+        "total_span_end": 5,
+    }
 
 
-def generate_yearly_all_pdf(report: dict[str, Any]) -> bytes:
+def _exceptions_view(report: dict[str, Any]) -> dict[str, Any]:
     generated_at = datetime.now().strftime("%Y-%m-%d %I:%M %p")
-    year_value = _safe_text(report.get("year"), fallback="N/A")
-    summary = dict(report.get("summary") or {})
+    counts = dict(report.get("counts") or {})
     rows_payload = list(report.get("rows") or [])
 
-    cards = _summary_cards_for_all_report(summary=summary, include_working_days=True)
     row_data: list[list[str]] = []
     for row in rows_payload:
-        total_hours = _safe_text(
-            row.get("total_duration_readable"),
-            fallback=_safe_text(_minutes_to_readable(_to_int(row.get("total_minutes"))), fallback="N/A"),
-        )
-        avg_hours = _safe_text(
-            row.get("avg_duration_hhmm"),
-            fallback=_safe_text(_minutes_to_hhmm(_to_int(row.get("avg_minutes_per_day"))), fallback="N/A"),
-        )
         row_data.append(
             [
+                _safe_text(row.get("date"), fallback="-"),
                 _safe_text(row.get("employee_name"), fallback="-"),
                 _safe_text(row.get("card_no"), fallback="-"),
-                str(_to_int(row.get("working_days")) or 0),
-                total_hours,
-                avg_hours,
-                str(_to_int(row.get("missing_punch_days")) or 0),
-                str(_to_int(row.get("sessions_count")) or 0),
+                _safe_text(row.get("status"), fallback="-"),
+                _format_time_12h(row.get("first_in")) if _has_value(row.get("first_in")) else "-",
+                _format_time_12h(row.get("last_out")) if _has_value(row.get("last_out")) else "-",
+                f"{_safe_text(row.get('scheduled_start'))} - {_safe_text(row.get('scheduled_end'))}",
+                f"{_to_int(row.get('late_minutes')) or '-'} / {_to_int(row.get('early_minutes')) or '-'}",
             ]
         )
 
-    story: list[Any] = []
-    _append_kpi_grid(story, cards=cards, max_cols=4, gap=KPI_GAP_X, card_h=KPI_CARD_HEIGHT, row_gap=KPI_GAP_Y)
-    story.append(Spacer(1, KPI_GAP_AFTER))
-    story.append(_build_section_heading("Yearly Entry/Exit Summary (All Employees)"))
-    story.append(Spacer(1, 2))
-    story.append(
-        _build_table(
-            headers=["Employee", "CardNo", "Working Days", "Total Hours", "Avg Hours/Day", "Missing Punch Days", "Total Sessions"],
-            body_rows=row_data,
-            col_widths=[
-                CONTENT_WIDTH * 0.22,
-                CONTENT_WIDTH * 0.12,
-                CONTENT_WIDTH * 0.11,
-                CONTENT_WIDTH * 0.20,
-                CONTENT_WIDTH * 0.13,
-                CONTENT_WIDTH * 0.12,
-                CONTENT_WIDTH * 0.10,
-            ],
-            total_rows=[
-                ("Grand Total Hours (Year)", _safe_text(summary.get("total_work_readable"), fallback="N/A")),
-                ("Total In Hour", _safe_text(summary.get("total_in_hhmm"), fallback="N/A")),
-                ("Total Out Hour", _safe_text(summary.get("total_out_hhmm"), fallback="N/A")),
-            ],
-            total_span_end=5,
-        )
+    label = "Daily" if report.get("period_type") == "daily" else "Monthly"
+    return {
+        "title": f"Oilchem {label} Exceptions Report",
+        "subtitle_lines": [
+            _all_report_period_line("Period", _safe_text(report.get("period"), fallback="N/A"), report),
+            f"Generated: {generated_at}",
+        ],
+        "cards": [
+            {"label": "Employees With Exceptions", "value": str(_to_int(report.get("employees_with_exceptions")) or 0)},
+            {"label": "Late Check-ins", "value": str((_to_int(counts.get("LATE")) or 0) + (_to_int(counts.get("LATE_EARLY")) or 0))},
+            {"label": "Early Check-outs", "value": str((_to_int(counts.get("EARLY")) or 0) + (_to_int(counts.get("LATE_EARLY")) or 0))},
+            {"label": "Missing Punches", "value": str(_to_int(counts.get("MISSING_PUNCH")) or 0)},
+        ],
+        "heading": f"{label} Late / Early / Missing Punch Exceptions (All Employees)",
+        "headers": ["Date", "Employee", "CardNo", "Status", "First IN", "Last OUT", "Shift", "Late / Early (min)"],
+        "body_rows": row_data,
+        "col_widths": [
+            CONTENT_WIDTH * 0.11,
+            CONTENT_WIDTH * 0.20,
+            CONTENT_WIDTH * 0.10,
+            CONTENT_WIDTH * 0.11,
+            CONTENT_WIDTH * 0.14,
+            CONTENT_WIDTH * 0.14,
+            CONTENT_WIDTH * 0.10,
+            CONTENT_WIDTH * 0.10,
+        ],
+        "total_rows": [("Total Exceptions", str(len(rows_payload)))],
+        "total_span_end": 6,
+    }
+
+
+_ALL_VIEWS = {
+    "daily_all": _daily_all_view,
+    "monthly_all": lambda report: _period_all_view(report, period_type="monthly"),
+    "yearly_all": lambda report: _period_all_view(report, period_type="yearly"),
+    "exceptions": _exceptions_view,
+}
+
+
+def _all_view_table(view: dict[str, Any], table_class: type[FastTable] = FastTable) -> FastTable:
+    return table_class(
+        headers=view["headers"],
+        body_rows=view["body_rows"],
+        col_widths=view["col_widths"],
+        total_rows=view["total_rows"],
+        total_span_end=view["total_span_end"],
     )
 
+
+def _all_view_story(view: dict[str, Any], table: FastTable, *, intro: bool = True) -> list[Any]:
+    story: list[Any] = []
+    if intro:
+        _append_kpi_grid(story, cards=view["cards"], max_cols=4, gap=KPI_GAP_X, card_h=KPI_CARD_HEIGHT, row_gap=KPI_GAP_Y)
+        story.append(Spacer(1, KPI_GAP_AFTER))
+        story.append(_build_section_heading(view["heading"]))
+        story.append(Spacer(1, 2))
+    story.append(table)
+    return story
+
+
+def _render_all_view(
+    view: dict[str, Any],
+    *,
+    output: BinaryIO | None = None,
+    start: int = 0,
+    end: int | None = None,
+    intro: bool = True,
+    page_offset: int = 0,
+    total_pages: int | None = None,
+) -> bytes | None:
+    table = _all_view_table(view)
+    if start or end is not None:
+        table = table._slice(start, table._end if end is None else end)
+
     return _build_document(
-        title="Oilchem Yearly Entry/Exit Report (All Employees)",
-        subtitle_lines=[
-            f"Year: {year_value}",
-            f"Generated: {generated_at}",
-        ],
-        story=story,
+        title=view["title"],
+        subtitle_lines=view["subtitle_lines"],
+        story=_all_view_story(view, table, intro=intro),
+        output=output,
+        page_offset=page_offset,
+        total_pages=total_pages,
+    )
+
+
+class _PageProbeTable(FastTable):
+    # Lays out exactly like FastTable but draws nothing; it only records which
+    # rows land on which page, so chunk boundaries can follow page breaks.
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.placements: list[tuple[int, int, int]] = []
+
+    def draw(self) -> None:
+        self.placements.append((self.canv.getPageNumber(), self._start, self._end))
+
+
+def plan_all_pdf_chunks(kind: str, report: dict[str, Any], *, parts: int) -> list[dict[str, Any]]:
+    """
+    Split an all-employee report into page-aligned chunks that render independently.
+
+    A layout-only pass finds the rows on each page; the pages are then divided
+    into up to `parts` runs of similar row count. Each chunk carries the shared
+    view (header text, KPI cards, table rows), its row range, and the page
+    offset and total needed for continuous "Page X of Y" numbering. Only the
+    first chunk has the KPI section. Render each with render_all_pdf_chunk and
+    join them in order with merge_pdf_files.
+    """
+    view = _ALL_VIEWS[kind](report)
+    probe = _all_view_table(view, _PageProbeTable)
+    _build_document(
+        title=view["title"],
+        subtitle_lines=view["subtitle_lines"],
+        story=_all_view_story(view, probe),
+        canvasmaker=canvas.Canvas,
     )
+    placements = probe.placements
+    total_pages = placements[-1][0] if placements else 1
+    total_rows = probe._end
+    parts = max(1, min(parts, len(placements)))
+
+    chunks: list[dict[str, Any]] = []
+    target = total_rows / parts
+    run_start = 0
+    page_offset = 0
+    for index, (page_number, _start, end) in enumerate(placements):
+        last_page = index == len(placements) - 1
+        if not last_page and end < target * (len(chunks) + 1):
+            continue
+        if not last_page and len(chunks) == parts - 1:
+            continue
+        chunks.append(
+            {
+                "view": view,
+                "start": run_start,
+                "end": end,
+                "intro": not chunks,
+                "page_offset": page_offset,
+                "total_pages": total_pages,
+            }
+        )
+        run_start = end
+        page_offset = page_number
+    return chunks
+
+
+def render_all_pdf_chunk(chunk: dict[str, Any], output: BinaryIO | None = None) -> bytes | None:
+    return _render_all_view(
+        chunk["view"],
+        output=output,
+        start=chunk["start"],
+        end=chunk["end"],
+        intro=chunk["intro"],
+        page_offset=chunk["page_offset"],
+        total_pages=chunk["total_pages"],
+    )
+
+
+def merge_pdf_files(paths: Sequence[str], output: BinaryIO) -> None:
+    writer = PdfWriter()
+    for index, path in enumerate(paths):
+        reader = PdfReader(path)
+        if index == 0 and reader.metadata:
+            writer.add_metadata(dict(reader.metadata))
+        for page in reader.pages:
+            writer.add_page(page)
+    writer.write(output)
+
+
+def generate_daily_all_pdf(report: dict[str, Any], output: BinaryIO | None = None) -> bytes | None:
+    return _render_all_view(_ALL_VIEWS["daily_all"](report), output=output)
+
+
+def generate_monthly_all_pdf(report: dict[str, Any], output: BinaryIO | None = None) -> bytes | None:
+    return _render_all_view(_ALL_VIEWS["monthly_all"](report), output=output)
+
+
+def generate_yearly_all_pdf(report: dict[str, Any], output: BinaryIO | None = None) -> bytes | None:
+    return _render_all_view(_ALL_VIEWS["yearly_all"](report), output=output)
+
+
+def generate_exceptions_pdf(report: dict[str, Any], output: BinaryIO | None = None) -> bytes | None:
+    return _render_all_view(_ALL_VIEWS["exceptions"](report), output=output)
+
+
+def build_daily_pdf(report: DailyReportData | dict[str, Any], output: BinaryIO | None = None) -> bytes | None:
+    return generate_daily_pdf(report, output=output)
 
 
-def build_daily_pdf(report: dict[str, Any]) -> bytes:
-    return generate_daily_pdf(report)
+def build_monthly_pdf(report: dict[str, Any], output: BinaryIO | None = None) -> bytes | None:
+    return generate_monthly_pdf(report, output=output)
 
 
-def build_monthly_pdf(report: dict[str, Any]) -> bytes:
-    return generate_monthly_pdf(report)
+def build_yearly_pdf(report: dict[str, Any], output: BinaryIO | None = None) -> bytes | None:
+    return generate_yearly_pdf(report, output=output)
 
 
-def build_yearly_pdf(report: dict[str, Any]) -> bytes:
-    return generate_yearly_pdf(report)
+def build_daily_all_pdf(report: dict[str, Any], output: BinaryIO | None = None) -> bytes | None:
+    return generate_daily_all_pdf(report, output=output)
 
 
-def build_daily_all_pdf(report: dict[str, Any]) -> bytes:
-    return generate_daily_all_pdf(report)
+def build_monthly_all_pdf(report: dict[str, Any], output: BinaryIO | None = None) -> bytes | None:
+    return generate_monthly_all_pdf(report, output=output)
 
 
-def build_monthly_all_pdf(report: dict[str, Any]) -> bytes:
-    return generate_monthly_all_pdf(report)
+def build_yearly_all_pdf(report: dict[str, Any], output: BinaryIO | None = None) -> bytes | None:
+    return generate_yearly_all_pdf(report, output=output)
 
 
-def build_yearly_all_pdf(report: dict[str, Any]) -> bytes:
-    return generate_yearly_all_pdf(report)
+def build_exceptions_pdf(report: dict[str, Any], output: BinaryIO | None = None) -> bytes | None:
+    return generate_exceptions_pdf(report, output=output)
@@ -0,0 +1,436 @@
+from __future__ import annotations
+
+import logging
+import math
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, FIRST_EXCEPTION, Future, ProcessPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from typing import Any, BinaryIO, Iterable, Iterator
+
+from .config import settings
+from .pdf_exports import (
+    build_daily_all_pdf,
+    build_daily_pdf,
+    build_exceptions_pdf,
+    build_monthly_all_pdf,
+    build_monthly_pdf,
+    build_yearly_all_pdf,
+    build_yearly_pdf,
+    merge_pdf_files,
+    plan_all_pdf_chunks,
+    render_all_pdf_chunk,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rough rows-per-cost-unit; a single-employee report costs 1, a 1,200-row
+# all-employee report costs several slots of the admission budget.
+_ROWS_PER_COST_UNIT = 250
+_RENDERERS = {
+    "daily": build_daily_pdf,
+    "monthly": build_monthly_pdf,
+    "yearly": build_yearly_pdf,
+    "daily_all": build_daily_all_pdf,
+    "monthly_all": build_monthly_all_pdf,
+    "yearly_all": build_yearly_all_pdf,
+    "exceptions": build_exceptions_pdf,
+    # Internal: one page run of a split all-employee report.
+    "all_chunk": render_all_pdf_chunk,
+}
+_CHUNKABLE_KINDS = {"daily_all", "monthly_all", "yearly_all", "exceptions"}
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = Lock()
+_STATE_LOCK = Lock()
+_STATE = {
+    "queued_jobs": 0,
+    "queued_cost": 0,
+    "completed": 0,
+    "failed": 0,
+    "rejected": 0,
+    "timed_out": 0,
+    "avg_seconds": 0.0,
+}
+
+
+class PDFQueueFullError(Exception):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("PDF render queue is full")
+        self.retry_after = retry_after
+
+
+class PDFRenderTimeoutError(Exception):
+    pass
+
+
+def _raise_render_timeout(_signum: int, _frame: Any) -> None:
+    raise PDFRenderTimeoutError("PDF rendering exceeded its time budget")
+
+
+def _render_in_worker(kind: str, report: Any, timeout_seconds: int, output_path: str) -> None:
+    # Runs inside a pool process. SIGALRM stops a runaway ReportLab layout so the
+    # worker is freed instead of grinding on after the caller has given up.
+    # The PDF goes to disk rather than back through the result pipe.
+    use_alarm = timeout_seconds > 0 and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_render_timeout)
+        signal.setitimer(signal.ITIMER_REAL, float(timeout_seconds))
+    try:
+        with open(output_path, "wb") as handle:
+            _RENDERERS[kind](report, output=handle)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            # Spawned (not forked) workers: the API process runs threads and holds
+            # sockets that must not be duplicated into the renderers.
+            _POOL = ProcessPoolExecutor(
+                max_workers=settings.pdf_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _POOL
+
+
+def _estimate_cost(report: Any) -> int:
+    if not isinstance(report, dict):
+        return 1
+    if "view" in report:
+        rows = range(report["start"], report["end"])
+    else:
+        rows = report.get("rows") or report.get("records") or report.get("months") or []
+    cost = 1 + len(rows) // _ROWS_PER_COST_UNIT
+    return max(1, min(cost, settings.pdf_queue_max))
+
+
+def _retry_after_seconds() -> int:
+    with _STATE_LOCK:
+        queued_jobs = int(_STATE["queued_jobs"])
+        avg_seconds = float(_STATE["avg_seconds"]) or 5.0
+    workers = max(1, settings.pdf_workers)
+    return max(1, math.ceil(avg_seconds * max(1, queued_jobs) / workers))
+
+
+def _try_admit(cost: int, jobs: int = 1) -> bool:
+    with _STATE_LOCK:
+        queued_cost = int(_STATE["queued_cost"])
+        # An idle queue always admits, so one oversized report can still run.
+        if queued_cost and queued_cost + cost > settings.pdf_queue_max:
+            return False
+        _STATE["queued_jobs"] += jobs
+        _STATE["queued_cost"] += cost
+        return True
+
+
+def _admit(cost: int, jobs: int = 1) -> None:
+    if _try_admit(cost, jobs):
+        return
+    with _STATE_LOCK:
+        _STATE["rejected"] += 1
+    raise PDFQueueFullError(retry_after=_retry_after_seconds())
+
+
+def _release(cost: int, started_at: float, outcome: str) -> None:
+    elapsed = time.monotonic() - started_at
+    with _STATE_LOCK:
+        _STATE["queued_jobs"] -= 1
+        _STATE["queued_cost"] -= cost
+        _STATE[outcome] += 1
+        if outcome == "completed":
+            previous = float(_STATE["avg_seconds"])
+            _STATE["avg_seconds"] = elapsed if not previous else (previous * 0.8) + (elapsed * 0.2)
+
+
+def _new_spool() -> BinaryIO:
+    if settings.pdf_spool_max_kb <= 0:
+        return tempfile.TemporaryFile(mode="w+b")
+    return tempfile.SpooledTemporaryFile(max_size=settings.pdf_spool_max_kb * 1024, mode="w+b")
+
+
+def _render_inline(kind: str, report: Any) -> BinaryIO:
+    spool = _new_spool()
+    try:
+        _RENDERERS[kind](report, output=spool)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def _new_output_path() -> str:
+    fd, output_path = tempfile.mkstemp(prefix="pdf-render-", suffix=".pdf")
+    os.close(fd)
+    return output_path
+
+
+def _remove_output(output_path: str) -> None:
+    try:
+        os.unlink(output_path)
+    except OSError:
+        pass
+
+
+def _collect(output_path: str) -> BinaryIO:
+    spool = _new_spool()
+    with open(output_path, "rb") as rendered:
+        shutil.copyfileobj(rendered, spool)
+    spool.seek(0)
+    return spool
+
+
+def _result_timeout() -> float | None:
+    # The grace period covers queueing behind other jobs and pickling overhead.
+    timeout_seconds = settings.pdf_job_timeout_seconds
+    return timeout_seconds + 30 if timeout_seconds > 0 else None
+
+
+def _submit(kind: str, report: Any, cost: int, output_path: str) -> Future[None]:
+    started_at = time.monotonic()
+    try:
+        future: Future[None] = _get_pool().submit(
+            _render_in_worker,
+            kind,
+            report,
+            settings.pdf_job_timeout_seconds,
+            output_path,
+        )
+    except Exception:
+        _release(cost, started_at, "failed")
+        raise
+
+    def _on_done(done: Future[None]) -> None:
+        if done.cancelled():
+            outcome = "timed_out"
+        elif isinstance(done.exception(), PDFRenderTimeoutError):
+            outcome = "timed_out"
+        elif done.exception() is not None:
+            logger.error("PDF render job (%s) failed: %s", kind, done.exception())
+            outcome = "failed"
+        else:
+            outcome = "completed"
+        _release(cost, started_at, outcome)
+
+    # Admission is released when the job actually leaves the pool, not when the
+    # caller stops waiting, so the queue depth reflects real worker load.
+    future.add_done_callback(_on_done)
+    return future
+
+
+def render_pdf(kind: str, report: Any) -> BinaryIO:
+    """
+    Render a PDF off the request thread in the shared process pool.
+
+    Returns a SpooledTemporaryFile rewound to the start: small documents stay in
+    memory, anything over PDF_SPOOL_MAX_KB rolls over to disk. The caller closes it.
+
+    Raises PDFQueueFullError when admission would exceed PDF_QUEUE_MAX cost units
+    and PDFRenderTimeoutError when the job overruns PDF_JOB_TIMEOUT_SECONDS.
+    All-employee reports of PDF_PARALLEL_MIN_ROWS rows or more are split into
+    page runs rendered on several workers at once and merged.
+    With PDF_WORKERS=0 the report is rendered inline (development fallback).
+    """
+    if kind not in _RENDERERS:
+        raise ValueError(f"Unknown PDF kind: {kind}")
+
+    if settings.pdf_workers <= 0:
+        return _render_inline(kind, report)
+
+    cost = _estimate_cost(report)
+    _admit(cost)
+
+    if _should_split(kind, report):
+        # The layout pass that finds the page breaks is a sizeable share of a full
+        # render, so it runs under the report's admission rather than ahead of it.
+        try:
+            chunks = plan_all_pdf_chunks(kind, report, parts=settings.pdf_workers)
+        except BaseException:
+            _release(cost, time.monotonic(), "failed")
+            raise
+        if len(chunks) > 1:
+            return _render_chunks(chunks, cost)
+
+    output_path = _new_output_path()
+    try:
+        future = _submit(kind, report, cost, output_path)
+        try:
+            future.result(timeout=_result_timeout())
+        except FutureTimeoutError as exc:
+            future.cancel()
+            raise PDFRenderTimeoutError("PDF rendering timed out") from exc
+        except BrokenProcessPool:
+            # A worker died (OOM, segfault); drop the pool so the next job gets a fresh one.
+            logger.error("PDF render pool is broken; recreating on next job")
+            _discard_pool()
+            raise
+        return _collect(output_path)
+    finally:
+        _remove_output(output_path)
+
+
+def _should_split(kind: str, report: Any) -> bool:
+    if kind not in _CHUNKABLE_KINDS or settings.pdf_workers < 2 or settings.pdf_parallel_min_rows <= 0:
+        return False
+    return isinstance(report, dict) and len(report.get("rows") or []) >= settings.pdf_parallel_min_rows
+
+
+def _render_chunks(chunks: list[dict[str, Any]], cost: int) -> BinaryIO:
+    # The page runs inherit the whole report's admission, split into one job per
+    # run, so a split report is never left half queued. They render side by side
+    # and are merged in page order.
+    shares = [cost // len(chunks)] * len(chunks)
+    shares[-1] += cost - sum(shares)
+    with _STATE_LOCK:
+        _STATE["queued_jobs"] += len(chunks) - 1
+
+    output_paths: list[str] = []
+    futures: list[Future[None]] = []
+    try:
+        for index, chunk in enumerate(chunks):
+            output_path = _new_output_path()
+            output_paths.append(output_path)
+            try:
+                futures.append(_submit("all_chunk", chunk, shares[index], output_path))
+            except Exception:
+                # _submit already released this chunk; release the ones never submitted.
+                for share in shares[index + 1 :]:
+                    _release(share, time.monotonic(), "failed")
+                raise
+
+        done, not_done = wait(futures, timeout=_result_timeout(), return_when=FIRST_EXCEPTION)
+        for future in not_done:
+            future.cancel()
+        for future in futures:
+            if future not in done:
+                continue
+            try:
+                future.result()
+            except BrokenProcessPool:
+                logger.error("PDF render pool is broken; recreating on next job")
+                _discard_pool()
+                raise
+        if not_done:
+            raise PDFRenderTimeoutError("PDF rendering timed out")
+
+        spool = _new_spool()
+        try:
+            merge_pdf_files(output_paths, spool)
+        except BaseException:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool
+    finally:
+        for output_path in output_paths:
+            _remove_output(output_path)
+
+
+def render_pdf_many(kind: str, reports: Iterable[tuple[Any, Any]]) -> Iterator[tuple[Any, BinaryIO | Exception]]:
+    """
+    Render (tag, report) pairs in the pool, yielding (tag, pdf_file) as each finishes.
+
+    At most PDF_WORKERS jobs are in flight. Each goes through the same admission
+    as render_pdf, but a full queue makes the batch wait on its own jobs rather
+    than fail; PDFQueueFullError is raised only when it cannot get a single slot.
+    A job that fails yields its exception in place of the file.
+    """
+    if kind not in _RENDERERS:
+        raise ValueError(f"Unknown PDF kind: {kind}")
+
+    if settings.pdf_workers <= 0:
+        for tag, report in reports:
+            try:
+                pdf_file: BinaryIO | Exception = _render_inline(kind, report)
+            except Exception as exc:
+                pdf_file = exc
+            yield tag, pdf_file
+        return
+
+    pending: dict[Future[None], tuple[Any, str]] = {}
+    try:
+        for tag, report in reports:
+            cost = _estimate_cost(report)
+            while len(pending) >= settings.pdf_workers or not _try_admit(cost):
+                if not pending:
+                    _admit(cost)
+                    break
+                yield from _finish_some(pending)
+
+            output_path = _new_output_path()
+            try:
+                future = _submit(kind, report, cost, output_path)
+            except Exception:
+                _remove_output(output_path)
+                raise
+            pending[future] = (tag, output_path)
+
+        while pending:
+            yield from _finish_some(pending)
+    finally:
+        for future, (_tag, output_path) in pending.items():
+            future.cancel()
+            _remove_output(output_path)
+
+
+def _finish_some(pending: dict[Future[None], tuple[Any, str]]) -> Iterator[tuple[Any, BinaryIO | Exception]]:
+    done, _ = wait(pending, timeout=_result_timeout(), return_when=FIRST_COMPLETED)
+    if not done:
+        raise PDFRenderTimeoutError("PDF rendering timed out")
+
+    for future in done:
+        tag, output_path = pending.pop(future)
+        try:
+            future.result()
+        except BrokenProcessPool:
+            logger.error("PDF render pool is broken; recreating on next job")
+            _discard_pool()
+            _remove_output(output_path)
+            raise
+        except Exception as exc:
+            pdf_file: BinaryIO | Exception = exc
+        else:
+            pdf_file = _collect(output_path)
+        _remove_output(output_path)
+        yield tag, pdf_file
+
+
+def get_pdf_pool_stats() -> dict[str, Any]:
+    with _STATE_LOCK:
+        snapshot = dict(_STATE)
+
+    return {
+        "workers": settings.pdf_workers,
+        "queue_max": settings.pdf_queue_max,
+        "job_timeout_seconds": settings.pdf_job_timeout_seconds,
+        "queued_jobs": int(snapshot["queued_jobs"]),
+        "queued_cost": int(snapshot["queued_cost"]),
+        "completed": int(snapshot["completed"]),
+        "failed": int(snapshot["failed"]),
+        "rejected": int(snapshot["rejected"]),
+        "timed_out": int(snapshot["timed_out"]),
+        "avg_render_seconds": round(float(snapshot["avg_seconds"]), 3),
+    }
+
+
+def _discard_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        pool = _POOL
+        _POOL = None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pdf_pool() -> None:
+    _discard_pool()
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Sequence
+
+from .app_db import get_cached_report, store_cached_report
+from .config import settings
+from .reports import (
+    fetch_daily_report_all_employees,
+    fetch_monthly_report_all_employees,
+    fetch_yearly_report_all_employees,
+)
+
+_FETCHERS: dict[str, Callable[..., dict[str, Any]]] = {
+    "daily_all": fetch_daily_report_all_employees,
+    "monthly_all": fetch_monthly_report_all_employees,
+    "yearly_all": fetch_yearly_report_all_employees,
+}
+
+
+def period_end(kind: str, period: str) -> datetime:
+    if kind == "daily_all":
+        return datetime.strptime(period, "%Y-%m-%d") + timedelta(days=1)
+    if kind == "monthly_all":
+        start = datetime.strptime(period, "%Y-%m")
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    if kind == "yearly_all":
+        return datetime.strptime(period, "%Y").replace(year=int(period) + 1)
+    raise ValueError(f"Unknown report kind: {kind}")
+
+
+def is_period_closed(kind: str, period: str, now: datetime | None = None) -> bool:
+    """A period is final once its last shift can no longer receive an out punch."""
+    try:
+        end = period_end(kind, period)
+    except ValueError:
+        return False
+    return (now or datetime.now()) >= end + timedelta(hours=settings.shift_out_cutoff_hours)
+
+
+def fetch_all_employees_report(
+    kind: str,
+    period: str,
+    *,
+    departments: Sequence[str] | None = None,
+    card_nos: Sequence[str] | None = None,
+) -> dict[str, Any]:
+    """
+    All-employee report for a period, served from the app DB when available.
+
+    Only unfiltered reports of closed periods are cached (they no longer
+    change), for up to REPORT_CACHE_MAX_AGE_HOURS so late-synced punches are
+    still picked up. The scheduler pre-warms these entries off-peak.
+    """
+    fetch = _FETCHERS[kind]
+    cacheable = (
+        settings.report_cache_max_age_hours > 0
+        and not departments
+        and not card_nos
+        and is_period_closed(kind, period)
+    )
+    if cacheable:
+        newer_than = (
+            datetime.now(timezone.utc) - timedelta(hours=settings.report_cache_max_age_hours)
+        ).replace(microsecond=0).isoformat()
+        payload = get_cached_report(kind, period, newer_than=newer_than)
+        if payload is not None:
+            return json.loads(payload)
+
+    report = fetch(period, departments=departments, card_nos=card_nos)
+    if cacheable:
+        store_cached_report(kind, period, json.dumps(report, default=str))
+    return report
+
+
+def refresh_all_employees_report(kind: str, period: str) -> dict[str, Any]:
+    report = _FETCHERS[kind](period)
+    store_cached_report(kind, period, json.dumps(report, default=str))
+    return report
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+# Internal report model shared by the API, notifications and PDF rendering.
+# Values stay native (datetime/int) here; string formatting happens only when a
+# payload leaves the process (JSON response, e-mail body, PDF cell).
+
+
+@dataclass(slots=True)
+class EmployeeIdentity:
+    card_no: str
+    employee_name: str
+    employee_id: int | str = ""
+    department: str | None = None
+
+
+@dataclass(slots=True)
+class Transaction:
+    event_time: datetime
+    state: int
+    inferred: bool = False
+
+
+@dataclass(slots=True)
+class Interval:
+    start: datetime
+    end: datetime
+    minutes: int
+
+
+@dataclass(slots=True)
+class DailyDetail:
+    day: date
+    first_in: datetime | None = None
+    last_out: datetime | None = None
+    duration_minutes: int | None = None
+    missing_punch: bool = False
+    transactions: list[Transaction] = field(default_factory=list)
+    intervals: list[Interval] = field(default_factory=list)
+    total_in_minutes: int = 0
+    total_out_minutes: int = 0
+    notes: list[str] = field(default_factory=list)
+
+    @property
+    def sessions_count(self) -> int:
+        return len(self.intervals)
+
+
+@dataclass(slots=True)
+class DailyReportData:
+    identity: EmployeeIdentity
+    detail: DailyDetail
+    mapping_variant: str
+    swap_applied: bool
@@ -1,14 +1,17 @@
+from bisect import bisect_left
 from collections import defaultdict
 from datetime import date, datetime, timedelta
+from itertools import chain
 import logging
 from threading import Lock
 import time
-from typing import Any, Dict, List, Sequence
+from typing import Any, Dict, Iterator, List, Sequence
 
 from fastapi import HTTPException, status
 
 from .config import settings
-from .db import get_cursor
+from .db import DBOperationalError, get_cursor
+from .report_models import DailyDetail, DailyReportData, EmployeeIdentity, Interval, Transaction
 
 _SCHEMA_CACHE: dict[str, Any] | None = None
 _SCHEMA_LOCK = Lock()
@@ -17,6 +20,10 @@ _MAPPING_CACHE: dict[str, Any] | None = None
 _MAPPING_LOCK = Lock()
 _MAPPING_CACHE_TTL_SECONDS = 300
 _EMPLOYEE_SAMPLE_LOGGED = False
+_EVENT_FETCH_BATCH_SIZE = 2000
+_IN_LIST_CHUNK_SIZE = 500
+_PUNCH_DEBOUNCE_STATS = {"rows_seen": 0, "rows_dropped": 0}
+_PUNCH_DEBOUNCE_LOCK = Lock()
 logger = logging.getLogger(__name__)
 
 _NAME_COLUMN_CANDIDATES = (
@@ -782,7 +789,60 @@ def fetch_employees(search: str) -> List[Dict[str, Any]]:
     return employees
 
 
-def _fetch_all_active_employees() -> list[dict[str, Any]]:
+def _chunked(values: Sequence[str], size: int = _IN_LIST_CHUNK_SIZE) -> Iterator[Sequence[str]]:
+    for offset in range(0, len(values), size):
+        yield values[offset : offset + size]
+
+
+def _in_list_placeholders(count: int) -> str:
+    return ", ".join(["%s"] * count)
+
+
+def _normalize_cohort_values(values: Sequence[str] | None) -> list[str]:
+    ordered: list[str] = []
+    seen: set[str] = set()
+    for value in values or ():
+        text = _clean_text(value)
+        if not text or text in seen:
+            continue
+        seen.add(text)
+        ordered.append(text)
+    return ordered
+
+
+def _cohort_card_chunks(card_nos: Sequence[str]) -> list[Sequence[str]]:
+    # An empty card list means "no card filter": run the query once, unfiltered.
+    return list(_chunked(list(card_nos))) if card_nos else [()]
+
+
+def _cohort_filter_sql(
+    *,
+    schema: dict[str, Any],
+    department_expr: str,
+    departments: Sequence[str],
+    card_chunk: Sequence[str],
+) -> tuple[str, tuple[str, ...]]:
+    employee_card_col = schema.get("employee_card_col") or "CardNo"
+    clauses: list[str] = []
+    params: list[str] = []
+
+    if departments:
+        clauses.append(f"{department_expr} IN ({_in_list_placeholders(len(departments))})")
+        params.extend(departments)
+    if card_chunk:
+        clauses.append(
+            f"CONVERT(VARCHAR(64), emp.[{employee_card_col}]) IN ({_in_list_placeholders(len(card_chunk))})"
+        )
+        params.extend(card_chunk)
+
+    return "".join(f"\n                  AND {clause}" for clause in clauses), tuple(params)
+
+
+def _fetch_all_active_employees(
+    *,
+    departments: Sequence[str] | None = None,
+    card_nos: Sequence[str] | None = None,
+) -> list[dict[str, Any]]:
     schema = _get_schema()
     employee_id_expr = _employee_id_expr_for_alias("emp", schema)
     employee_card_col = schema["employee_card_col"] or "CardNo"
@@ -793,22 +853,31 @@ def _fetch_all_active_employees() -> list[dict[str, Any]]:
         schema=schema,
         department_alias="dept",
     )
+    departments = _normalize_cohort_values(departments)
+    card_nos = _normalize_cohort_values(card_nos)
 
-    sql = f"""
-        SELECT
-            {employee_id_expr} AS EmployeeID,
-            CONVERT(VARCHAR(64), emp.[{employee_card_col}]) AS CardNo,
-            {employee_name_expr} AS EmployeeName,
-            {department_expr} AS Department
-        FROM [dbo].[TEmployee] emp
-        {department_join_sql}
-        WHERE {active_where}
-        ORDER BY EmployeeName, CardNo
-    """
-
+    rows: list[dict[str, Any]] = []
     with get_cursor() as cursor:
-        cursor.execute(sql)
-        rows = cursor.fetchall()
+        for card_chunk in _cohort_card_chunks(card_nos):
+            cohort_sql, params = _cohort_filter_sql(
+                schema=schema,
+                department_expr=department_expr,
+                departments=departments,
+                card_chunk=card_chunk,
+            )
+            sql = f"""
+                SELECT
+                    {employee_id_expr} AS EmployeeID,
+                    CONVERT(VARCHAR(64), emp.[{employee_card_col}]) AS CardNo,
+                    {employee_name_expr} AS EmployeeName,
+                    {department_expr} AS Department
+                FROM [dbo].[TEmployee] emp
+                {department_join_sql}
+                WHERE {active_where}{cohort_sql}
+                ORDER BY EmployeeName, CardNo
+            """
+            cursor.execute(sql, params)
+            rows.extend(cursor.fetchall())
 
     employees: list[dict[str, Any]] = []
     for row in rows:
@@ -830,55 +899,174 @@ def _fetch_all_active_employees() -> list[dict[str, Any]]:
     return employees
 
 
-def _fetch_all_active_events(
+def _iter_cursor_rows(cursor: Any, batch_size: int = _EVENT_FETCH_BATCH_SIZE) -> Iterator[dict[str, Any]]:
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        yield from batch
+
+
+def _punch_debounce_window() -> timedelta | None:
+    seconds = int(settings.punch_debounce_seconds or 0)
+    if seconds <= 0:
+        return None
+    return timedelta(seconds=seconds)
+
+
+def _is_duplicate_punch(
+    previous: dict[str, Any] | None,
+    event: dict[str, Any],
+    window: timedelta | None,
+) -> bool:
+    # Readers often log the same tap two or three times within seconds. Only a
+    # repeat of the same state directly after the last kept punch is collapsed.
+    if window is None or previous is None:
+        return False
+    if previous["inout_flag"] != event["inout_flag"]:
+        return False
+    return timedelta(0) <= event["event_time"] - previous["event_time"] <= window
+
+
+def _record_punch_debounce(rows_seen: int, rows_dropped: int) -> None:
+    with _PUNCH_DEBOUNCE_LOCK:
+        _PUNCH_DEBOUNCE_STATS["rows_seen"] += rows_seen
+        _PUNCH_DEBOUNCE_STATS["rows_dropped"] += rows_dropped
+
+
+def get_punch_debounce_stats() -> dict[str, Any]:
+    with _PUNCH_DEBOUNCE_LOCK:
+        rows_seen = int(_PUNCH_DEBOUNCE_STATS["rows_seen"])
+        rows_dropped = int(_PUNCH_DEBOUNCE_STATS["rows_dropped"])
+
+    return {
+        "enabled": _punch_debounce_window() is not None,
+        "window_seconds": int(settings.punch_debounce_seconds or 0),
+        "rows_seen": rows_seen,
+        "rows_dropped": rows_dropped,
+    }
+
+
+def _iter_all_active_events(
     *,
     start: datetime,
     end: datetime,
     detector: dict[str, str] | None = None,
-) -> dict[str, list[dict[str, Any]]]:
+    departments: Sequence[str] | None = None,
+    card_nos: Sequence[str] | None = None,
+    include_department: bool = False,
+) -> Iterator[tuple[str, str | None, list[dict[str, Any]]]]:
+    """
+    Stream active-employee events one card at a time as (card_no, department, events).
+
+    Rows arrive ordered by card, so a card's events are complete as soon as the
+    next card starts; callers can fold them without holding the whole extraction.
+    The department is only selected (and joined) when filtering or asked for.
+    """
     schema = _get_schema()
     event_card_col = schema.get("event_card_col")
     event_time_col = schema.get("event_time_col")
     employee_card_col = schema.get("employee_card_col") or "CardNo"
     if not event_card_col or not event_time_col:
-        return {}
+        return
 
     resolved_detector = detector or _detect_event_variant(event_alias="e", event_type_alias="et")
     if resolved_detector["variant"] == "UNSUPPORTED":
-        return {}
+        return
 
     active_where = _active_employee_where("emp", schema)
-    sql = f"""
-        SELECT
-            CONVERT(VARCHAR(64), emp.[{employee_card_col}]) AS CardNo,
-            e.[{event_time_col}] AS EventTime,
-            {resolved_detector['inout_expr']} AS InOutFlag
-        FROM [TEvent] e
-        {resolved_detector['join_sql']}
-        INNER JOIN [dbo].[TEmployee] emp
-            ON CONVERT(VARCHAR(64), e.[{event_card_col}]) = CONVERT(VARCHAR(64), emp.[{employee_card_col}])
-        WHERE {active_where}
-          AND e.[{event_time_col}] >= %s
-          AND e.[{event_time_col}] < %s
-        ORDER BY CardNo ASC, e.[{event_time_col}] ASC
-    """
+    departments = _normalize_cohort_values(departments)
+    card_nos = _normalize_cohort_values(card_nos)
+    department_expr = "''"
+    department_join_sql = ""
+    if departments or include_department:
+        department_expr, department_join_sql = _employee_department_select_components(
+            employee_alias="emp",
+            schema=schema,
+            department_alias="dept",
+        )
+
+    window = _punch_debounce_window()
+    rows_seen = 0
+    rows_dropped = 0
 
     with get_cursor() as cursor:
-        cursor.execute(sql, (start, end))
-        rows = cursor.fetchall()
+        # Card chunks are disjoint, so per-card ordering survives across chunks.
+        for card_chunk in _cohort_card_chunks(card_nos):
+            cohort_sql, cohort_params = _cohort_filter_sql(
+                schema=schema,
+                department_expr=department_expr,
+                departments=departments,
+                card_chunk=card_chunk,
+            )
+            sql = f"""
+                SELECT
+                    CONVERT(VARCHAR(64), emp.[{employee_card_col}]) AS CardNo,
+                    {department_expr} AS Department,
+                    e.[{event_time_col}] AS EventTime,
+                    {resolved_detector['inout_expr']} AS InOutFlag
+                FROM [TEvent] e
+                {resolved_detector['join_sql']}
+                INNER JOIN [dbo].[TEmployee] emp
+                    ON CONVERT(VARCHAR(64), e.[{event_card_col}]) = CONVERT(VARCHAR(64), emp.[{employee_card_col}])
+                {department_join_sql}
+                WHERE {active_where}{cohort_sql}
+                  AND e.[{event_time_col}] >= %s
+                  AND e.[{event_time_col}] < %s
+                ORDER BY CardNo ASC, e.[{event_time_col}] ASC
+            """
+            cursor.execute(sql, (*cohort_params, start, end))
+
+            current_card: str | None = None
+            current_department: str | None = None
+            card_events: list[dict[str, Any]] = []
+            for row in _iter_cursor_rows(cursor):
+                card_no = _clean_text(row.get("CardNo"))
+                event_time = row.get("EventTime")
+                if not card_no or not isinstance(event_time, datetime):
+                    continue
+
+                if card_no != current_card:
+                    if current_card is not None:
+                        yield current_card, current_department, card_events
+                    current_card = card_no
+                    current_department = _clean_text(row.get("Department")) or None
+                    card_events = []
 
+                event = {
+                    "event_time": event_time,
+                    "inout_flag": _normalize_inout_flag(row.get("InOutFlag")),
+                }
+                rows_seen += 1
+                if _is_duplicate_punch(card_events[-1] if card_events else None, event, window):
+                    rows_dropped += 1
+                    continue
+                card_events.append(event)
+
+            if current_card is not None:
+                yield current_card, current_department, card_events
+
+    if window is not None:
+        _record_punch_debounce(rows_seen, rows_dropped)
+
+
+def _fetch_all_active_events(
+    *,
+    start: datetime,
+    end: datetime,
+    detector: dict[str, str] | None = None,
+    departments: Sequence[str] | None = None,
+    card_nos: Sequence[str] | None = None,
+) -> dict[str, list[dict[str, Any]]]:
     grouped: dict[str, list[dict[str, Any]]] = defaultdict(list)
-    for row in rows:
-        card_no = _clean_text(row.get("CardNo"))
-        event_time = row.get("EventTime")
-        if not card_no or not isinstance(event_time, datetime):
-            continue
-        grouped[card_no].append(
-            {
-                "event_time": event_time,
-                "inout_flag": _normalize_inout_flag(row.get("InOutFlag")),
-            }
-        )
+    for card_no, _department, events in _iter_all_active_events(
+        start=start,
+        end=end,
+        detector=detector,
+        departments=departments,
+        card_nos=card_nos,
+    ):
+        grouped[card_no].extend(events)
     return grouped
 
 
@@ -990,32 +1178,13 @@ def _build_daily_transactions_and_intervals_from_events(
     selected_date: date,
     raw_window_events: Sequence[dict[str, Any]],
     swap_applied: bool,
-) -> dict[str, Any]:
+) -> DailyDetail:
     day_start = datetime.combine(selected_date, datetime.min.time())
     day_end = day_start + timedelta(days=1)
     window_end = day_end + timedelta(hours=settings.shift_out_cutoff_hours)
 
     if not raw_window_events:
-        return {
-            "date": day_start.strftime("%Y-%m-%d"),
-            "first_in": None,
-            "last_out": None,
-            "duration_minutes": None,
-            "duration_hhmm": None,
-            "missing_punch": False,
-            "rows": [],
-            "transactions": [],
-            "intervals": [],
-            "total_in_minutes": 0,
-            "total_out_minutes": 0,
-            "total_in": _minutes_to_hhmm(0),
-            "total_out": _minutes_to_hhmm(0),
-            "totalInMinutes": 0,
-            "totalOutMinutes": 0,
-            "totalInHHMM": _minutes_to_hhmm(0),
-            "totalOutHHMM": _minutes_to_hhmm(0),
-            "notes": [],
-        }
+        return DailyDetail(day=selected_date)
 
     in_scope_events = [
         event for event in raw_window_events if day_start <= event["event_time"] < window_end
@@ -1023,26 +1192,7 @@ def _build_daily_transactions_and_intervals_from_events(
     normalized_events = _normalize_event_sequence(events=in_scope_events, swap_applied=swap_applied)
 
     if not normalized_events:
-        return {
-            "date": day_start.strftime("%Y-%m-%d"),
-            "first_in": None,
-            "last_out": None,
-            "duration_minutes": None,
-            "duration_hhmm": None,
-            "missing_punch": False,
-            "rows": [],
-            "transactions": [],
-            "intervals": [],
-            "total_in_minutes": 0,
-            "total_out_minutes": 0,
-            "total_in": _minutes_to_hhmm(0),
-            "total_out": _minutes_to_hhmm(0),
-            "totalInMinutes": 0,
-            "totalOutMinutes": 0,
-            "totalInHHMM": _minutes_to_hhmm(0),
-            "totalOutHHMM": _minutes_to_hhmm(0),
-            "notes": [],
-        }
+        return DailyDetail(day=selected_date)
 
     notes: list[str] = []
 
@@ -1062,26 +1212,12 @@ def _build_daily_transactions_and_intervals_from_events(
     if first_in_index is None:
         if out_on_day:
             notes.append("No IN punch found on selected date; OUT-only transactions were ignored.")
-        return {
-            "date": day_start.strftime("%Y-%m-%d"),
-            "first_in": None,
-            "last_out": _format_dt(out_on_day[-1]["event_time"]) if out_on_day else None,
-            "duration_minutes": None,
-            "duration_hhmm": None,
-            "missing_punch": bool(out_on_day),
-            "rows": [],
-            "transactions": [],
-            "intervals": [],
-            "total_in_minutes": 0,
-            "total_out_minutes": 0,
-            "total_in": _minutes_to_hhmm(0),
-            "total_out": _minutes_to_hhmm(0),
-            "totalInMinutes": 0,
-            "totalOutMinutes": 0,
-            "totalInHHMM": _minutes_to_hhmm(0),
-            "totalOutHHMM": _minutes_to_hhmm(0),
-            "notes": notes,
-        }
+        return DailyDetail(
+            day=selected_date,
+            last_out=out_on_day[-1]["event_time"] if out_on_day else None,
+            missing_punch=bool(out_on_day),
+            notes=notes,
+        )
 
     first_in_dt = normalized_events[first_in_index]["event_time"]
     last_out_index: int | None = None
@@ -1094,9 +1230,8 @@ def _build_daily_transactions_and_intervals_from_events(
     sequence_end_index = last_out_index if last_out_index is not None else len(normalized_events) - 1
     sequence_events = normalized_events[first_in_index : sequence_end_index + 1]
 
-    transactions: list[dict[str, Any]] = []
-    intervals: list[dict[str, Any]] = []
-    rows: list[dict[str, Any]] = []
+    transactions: list[Transaction] = []
+    intervals: list[Interval] = []
     total_in_minutes = 0
     total_out_minutes = 0
     open_in: datetime | None = None
@@ -1105,16 +1240,8 @@ def _build_daily_transactions_and_intervals_from_events(
     for event in sequence_events:
         event_time = event["event_time"]
         state = int(event["state"])
-        inferred = bool(event["inferred"])
-        event_label = _event_type_label(state)
-
         transactions.append(
-            {
-                "type": event_label,
-                "time": _format_time_only(event_time),
-                "timestamp": _format_dt(event_time),
-                "inferred": inferred,
-            }
+            Transaction(event_time=event_time, state=state, inferred=bool(event["inferred"]))
         )
 
         if state == 1:
@@ -1139,28 +1266,7 @@ def _build_daily_transactions_and_intervals_from_events(
         in_minutes = int((event_time - open_in).total_seconds() // 60)
         if in_minutes >= 0:
             total_in_minutes += in_minutes
-            intervals.append(
-                {
-                    "date": open_in.strftime("%Y-%m-%d"),
-                    "in": _format_dt(open_in),
-                    "out": _format_dt(event_time),
-                    "in_time": _format_time_only(open_in),
-                    "out_time": _format_time_only(event_time),
-                    "in_duration_minutes": in_minutes,
-                    "in_duration_hhmm": _minutes_to_hhmm(in_minutes),
-                }
-            )
-            rows.append(
-                {
-                    "date": open_in.strftime("%Y-%m-%d"),
-                    "in": _format_time_12h(open_in),
-                    "out": _format_time_12h(event_time),
-                    "duration": _minutes_to_hhmm(in_minutes),
-                    "in_raw": _format_dt(open_in),
-                    "out_raw": _format_dt(event_time),
-                    "duration_minutes": in_minutes,
-                }
-            )
+            intervals.append(Interval(start=open_in, end=event_time, minutes=in_minutes))
         else:
             notes.append(
                 f"Skipped negative IN interval from {_format_dt(open_in)} to {_format_dt(event_time)}."
@@ -1177,25 +1283,72 @@ def _build_daily_transactions_and_intervals_from_events(
     if duration_minutes is None and first_in_dt is not None and last_out_dt is None:
         notes.append("Missing OUT punch in selected work window.")
 
+    return DailyDetail(
+        day=selected_date,
+        first_in=first_in_dt,
+        last_out=last_out_dt,
+        duration_minutes=duration_minutes,
+        missing_punch=(first_in_dt is None) ^ (last_out_dt is None),
+        transactions=transactions,
+        intervals=intervals,
+        total_in_minutes=total_in_minutes,
+        total_out_minutes=total_out_minutes,
+        notes=notes,
+    )
+
+
+def _serialize_daily_detail(detail: DailyDetail) -> dict[str, Any]:
+    total_in_hhmm = _minutes_to_hhmm(detail.total_in_minutes)
+    total_out_hhmm = _minutes_to_hhmm(detail.total_out_minutes)
     return {
-        "date": day_start.strftime("%Y-%m-%d"),
-        "first_in": _format_dt(first_in_dt),
-        "last_out": _format_dt(last_out_dt),
-        "duration_minutes": duration_minutes,
-        "duration_hhmm": _minutes_to_hhmm(duration_minutes),
-        "missing_punch": (first_in_dt is None) ^ (last_out_dt is None),
-        "rows": rows,
-        "transactions": transactions,
-        "intervals": intervals,
-        "total_in_minutes": total_in_minutes,
-        "total_out_minutes": total_out_minutes,
-        "total_in": _minutes_to_hhmm(total_in_minutes),
-        "total_out": _minutes_to_hhmm(total_out_minutes),
-        "totalInMinutes": total_in_minutes,
-        "totalOutMinutes": total_out_minutes,
-        "totalInHHMM": _minutes_to_hhmm(total_in_minutes),
-        "totalOutHHMM": _minutes_to_hhmm(total_out_minutes),
-        "notes": notes,
+        "date": detail.day.strftime("%Y-%m-%d"),
+        "first_in": _format_dt(detail.first_in),
+        "last_out": _format_dt(detail.last_out),
+        "duration_minutes": detail.duration_minutes,
+        "duration_hhmm": _minutes_to_hhmm(detail.duration_minutes),
+        "missing_punch": detail.missing_punch,
+        "rows": [
+            {
+                "date": interval.start.strftime("%Y-%m-%d"),
+                "in": _format_time_12h(interval.start),
+                "out": _format_time_12h(interval.end),
+                "duration": _minutes_to_hhmm(interval.minutes),
+                "in_raw": _format_dt(interval.start),
+                "out_raw": _format_dt(interval.end),
+                "duration_minutes": interval.minutes,
+            }
+            for interval in detail.intervals
+        ],
+        "transactions": [
+            {
+                "type": _event_type_label(transaction.state),
+                "time": _format_time_only(transaction.event_time),
+                "timestamp": _format_dt(transaction.event_time),
+                "inferred": transaction.inferred,
+            }
+            for transaction in detail.transactions
+        ],
+        "intervals": [
+            {
+                "date": interval.start.strftime("%Y-%m-%d"),
+                "in": _format_dt(interval.start),
+                "out": _format_dt(interval.end),
+                "in_time": _format_time_only(interval.start),
+                "out_time": _format_time_only(interval.end),
+                "in_duration_minutes": interval.minutes,
+                "in_duration_hhmm": _minutes_to_hhmm(interval.minutes),
+            }
+            for interval in detail.intervals
+        ],
+        "total_in_minutes": detail.total_in_minutes,
+        "total_out_minutes": detail.total_out_minutes,
+        "total_in": total_in_hhmm,
+        "total_out": total_out_hhmm,
+        "totalInMinutes": detail.total_in_minutes,
+        "totalOutMinutes": detail.total_out_minutes,
+        "totalInHHMM": total_in_hhmm,
+        "totalOutHHMM": total_out_hhmm,
+        "notes": list(detail.notes),
     }
 
 
@@ -1476,22 +1629,30 @@ def _fetch_events_for_card(
         ORDER BY e.[{event_time_col}] ASC
     """
 
+    window = _punch_debounce_window()
+    rows_seen = 0
+    rows_dropped = 0
+    events: list[dict[str, Any]] = []
+
     with get_cursor() as cursor:
         cursor.execute(sql, (card_no, start, end))
-        rows = cursor.fetchall()
+        for row in _iter_cursor_rows(cursor):
+            event_time = row.get("EventTime")
+            if not isinstance(event_time, datetime):
+                continue
 
-    events: list[dict[str, Any]] = []
-    for row in rows:
-        event_time = row.get("EventTime")
-        if not isinstance(event_time, datetime):
-            continue
-        events.append(
-            {
+            event = {
                 "event_time": event_time,
                 "inout_flag": _normalize_inout_flag(row.get("InOutFlag")),
             }
-        )
+            rows_seen += 1
+            if _is_duplicate_punch(events[-1] if events else None, event, window):
+                rows_dropped += 1
+                continue
+            events.append(event)
 
+    if window is not None:
+        _record_punch_debounce(rows_seen, rows_dropped)
     return events
 
 
@@ -1538,6 +1699,182 @@ def _fetch_last_event_before(
     }
 
 
+def _fetch_employee_identities(card_nos: Sequence[str]) -> dict[str, dict[str, Any]]:
+    schema = _get_schema()
+    employee_id_expr = _employee_id_expr_for_alias("emp", schema)
+    employee_card_col = schema["employee_card_col"] or "CardNo"
+    active_where = _active_employee_where("emp", schema)
+    employee_name_expr = _employee_name_expr_for_alias("emp", schema)
+    department_expr, department_join_sql = _employee_department_select_components(
+        employee_alias="emp",
+        schema=schema,
+        department_alias="dept",
+    )
+
+    found: dict[str, dict[str, Any]] = {}
+    with get_cursor() as cursor:
+        for chunk in _chunked(list(card_nos)):
+            sql = f"""
+                SELECT
+                    {employee_id_expr} AS EmployeeID,
+                    CONVERT(VARCHAR(64), emp.[{employee_card_col}]) AS CardNo,
+                    {employee_name_expr} AS EmployeeName,
+                    {department_expr} AS Department
+                FROM [dbo].[TEmployee] emp
+                {department_join_sql}
+                WHERE {active_where}
+                  AND CONVERT(VARCHAR(64), emp.[{employee_card_col}]) IN ({_in_list_placeholders(len(chunk))})
+                ORDER BY EmployeeName, CardNo
+            """
+            cursor.execute(sql, tuple(chunk))
+            for row in cursor.fetchall():
+                card_no = _clean_text(row.get("CardNo"))
+                if not card_no or card_no in found:
+                    continue
+                employee_id = _normalize_emp_id(row.get("EmployeeID"))
+                found[card_no] = {
+                    "emp_id": employee_id,
+                    "employee_id": employee_id,
+                    "card_no": card_no,
+                    "employee_name": _employee_name_or_card(row.get("EmployeeName"), card_no),
+                    "department": _clean_text(row.get("Department")) or None,
+                }
+
+    identities: dict[str, dict[str, Any]] = {}
+    for card_no in card_nos:
+        identities[card_no] = found.get(card_no) or {
+            "emp_id": "",
+            "employee_id": "",
+            "card_no": card_no,
+            "employee_name": card_no,
+            "department": None,
+        }
+    return identities
+
+
+def _fetch_events_for_cards(
+    card_nos: Sequence[str],
+    start: datetime,
+    end: datetime,
+    detector: dict[str, str] | None = None,
+) -> dict[str, list[dict[str, Any]]]:
+    schema = _get_schema()
+    event_card_col = schema.get("event_card_col")
+    event_time_col = schema.get("event_time_col")
+    employee_card_col = schema.get("employee_card_col") or "CardNo"
+    if not event_card_col or not event_time_col or not card_nos:
+        return {}
+
+    resolved_detector = detector or _detect_event_variant(event_alias="e", event_type_alias="et")
+    if resolved_detector["variant"] == "UNSUPPORTED":
+        return {}
+
+    window = _punch_debounce_window()
+    rows_seen = 0
+    rows_dropped = 0
+    grouped: dict[str, list[dict[str, Any]]] = defaultdict(list)
+
+    with get_cursor() as cursor:
+        # Chunks hold disjoint card sets, so per-card ordering survives the merge.
+        for chunk in _chunked(list(card_nos)):
+            sql = f"""
+                SELECT
+                    CONVERT(VARCHAR(64), emp.[{employee_card_col}]) AS CardNo,
+                    e.[{event_time_col}] AS EventTime,
+                    {resolved_detector['inout_expr']} AS InOutFlag
+                FROM [TEvent] e
+                {resolved_detector['join_sql']}
+                INNER JOIN [dbo].[TEmployee] emp
+                    ON CONVERT(VARCHAR(64), e.[{event_card_col}]) = CONVERT(VARCHAR(64), emp.[{employee_card_col}])
+                WHERE CONVERT(VARCHAR(64), emp.[{employee_card_col}]) IN ({_in_list_placeholders(len(chunk))})
+                  AND e.[{event_time_col}] >= %s
+                  AND e.[{event_time_col}] < %s
+                ORDER BY CardNo ASC, e.[{event_time_col}] ASC
+            """
+            cursor.execute(sql, (*chunk, start, end))
+            for row in _iter_cursor_rows(cursor):
+                card_no = _clean_text(row.get("CardNo"))
+                event_time = row.get("EventTime")
+                if not card_no or not isinstance(event_time, datetime):
+                    continue
+
+                event = {
+                    "event_time": event_time,
+                    "inout_flag": _normalize_inout_flag(row.get("InOutFlag")),
+                }
+                card_events = grouped[card_no]
+                rows_seen += 1
+                if _is_duplicate_punch(card_events[-1] if card_events else None, event, window):
+                    rows_dropped += 1
+                    continue
+                card_events.append(event)
+
+    if window is not None:
+        _record_punch_debounce(rows_seen, rows_dropped)
+    return grouped
+
+
+def _fetch_last_events_before_for_cards(
+    card_nos: Sequence[str],
+    boundary: datetime,
+    detector: dict[str, str] | None = None,
+) -> dict[str, dict[str, Any]]:
+    schema = _get_schema()
+    event_card_col = schema.get("event_card_col")
+    event_time_col = schema.get("event_time_col")
+    employee_card_col = schema.get("employee_card_col") or "CardNo"
+    if not event_card_col or not event_time_col or not card_nos:
+        return {}
+
+    resolved_detector = detector or _detect_event_variant(event_alias="e", event_type_alias="et")
+    if resolved_detector["variant"] == "UNSUPPORTED":
+        return {}
+
+    anchors: dict[str, dict[str, Any]] = {}
+    with get_cursor() as cursor:
+        for chunk in _chunked(list(card_nos)):
+            # SQL Server 2000 has no ROW_NUMBER(); a correlated MAX picks the
+            # last punch per card before the boundary in one round trip.
+            sql = f"""
+                SELECT
+                    CONVERT(VARCHAR(64), emp.[{employee_card_col}]) AS CardNo,
+                    e.[{event_time_col}] AS EventTime,
+                    {resolved_detector['inout_expr']} AS InOutFlag
+                FROM [TEvent] e
+                {resolved_detector['join_sql']}
+                INNER JOIN [dbo].[TEmployee] emp
+                    ON CONVERT(VARCHAR(64), e.[{event_card_col}]) = CONVERT(VARCHAR(64), emp.[{employee_card_col}])
+                WHERE CONVERT(VARCHAR(64), emp.[{employee_card_col}]) IN ({_in_list_placeholders(len(chunk))})
+                  AND e.[{event_time_col}] = (
+                      SELECT MAX(prev.[{event_time_col}])
+                      FROM [TEvent] prev
+                      WHERE CONVERT(VARCHAR(64), prev.[{event_card_col}]) = CONVERT(VARCHAR(64), e.[{event_card_col}])
+                        AND prev.[{event_time_col}] < %s
+                  )
+            """
+            cursor.execute(sql, (*chunk, boundary))
+            for row in cursor.fetchall():
+                card_no = _clean_text(row.get("CardNo"))
+                event_time = row.get("EventTime")
+                if not card_no or not isinstance(event_time, datetime):
+                    continue
+                anchors[card_no] = {
+                    "event_time": event_time,
+                    "inout_flag": _normalize_inout_flag(row.get("InOutFlag")),
+                }
+    return anchors
+
+
+def _slice_events(
+    events: Sequence[dict[str, Any]],
+    start: datetime,
+    end: datetime,
+) -> list[dict[str, Any]]:
+    lo = bisect_left(events, start, key=lambda item: item["event_time"])
+    hi = bisect_left(events, end, lo=lo, key=lambda item: item["event_time"])
+    return list(events[lo:hi])
+
+
 def _event_state(event: dict[str, Any], swap_applied: bool) -> int | None:
     flag = event.get("inout_flag")
     if flag not in {0, 1}:
@@ -1592,7 +1929,7 @@ def _build_daily_transactions_and_intervals(
     selected_date: date,
     swap_applied: bool,
     detector: dict[str, str] | None = None,
-) -> dict[str, Any]:
+) -> DailyDetail:
     day_start = datetime.combine(selected_date, datetime.min.time())
     day_end = day_start + timedelta(days=1)
     window_start = day_start - timedelta(hours=12)
@@ -1912,69 +2249,130 @@ def _build_single_day_record(
     return _serialize_day_record(day_record)
 
 
-def fetch_daily_report(card_no: str, date_value: str) -> Dict[str, Any]:
+def _fetch_identity_model(card_no: str) -> EmployeeIdentity:
+    return _identity_model(_fetch_employee_identity(card_no))
+
+
+def _identity_model(identity: dict[str, Any]) -> EmployeeIdentity:
+    return EmployeeIdentity(
+        card_no=identity["card_no"],
+        employee_name=identity["employee_name"],
+        employee_id=identity["employee_id"],
+        department=identity["department"],
+    )
+
+
+def fetch_daily_report_data(card_no: str, date_value: str) -> DailyReportData:
     selected_date = _parse_date(date_value)
     detector = _detect_event_variant(event_alias="e", event_type_alias="et")
     mapping = _get_mapping_state(detector=detector)
-    identity = _fetch_employee_identity(card_no)
+    identity = _fetch_identity_model(card_no)
 
-    day_record = _build_daily_transactions_and_intervals(
+    detail = _build_daily_transactions_and_intervals(
         card_no=card_no,
         selected_date=selected_date,
         swap_applied=bool(mapping["swapApplied"]),
         detector=detector,
     )
+    return DailyReportData(
+        identity=identity,
+        detail=detail,
+        mapping_variant=str(mapping["mappingVariant"]),
+        swap_applied=bool(mapping["swapApplied"]),
+    )
 
-    return {
-        "employee_name": identity["employee_name"],
-        "card_no": identity["card_no"],
-        "department": identity["department"],
-        "date": day_record["date"],
-        "first_in": day_record["first_in"],
-        "last_out": day_record["last_out"],
-        "duration_minutes": day_record["duration_minutes"],
-        "duration_hhmm": day_record["duration_hhmm"],
-        "duration": day_record["duration_hhmm"],
-        "missing_punch": day_record["missing_punch"],
-        "rows": day_record["rows"],
-        "transactions": day_record["transactions"],
-        "intervals": day_record["intervals"],
-        "total_in_minutes": day_record["total_in_minutes"],
-        "total_out_minutes": day_record["total_out_minutes"],
-        "total_in": day_record["total_in"],
-        "total_out": day_record["total_out"],
-        "totalInMinutes": day_record["totalInMinutes"],
-        "totalOutMinutes": day_record["totalOutMinutes"],
-        "totalInHHMM": day_record["totalInHHMM"],
-        "totalOutHHMM": day_record["totalOutHHMM"],
-        "notes": day_record["notes"],
-        "total_work_minutes": day_record["duration_minutes"],
-        "mappingVariant": mapping["mappingVariant"],
-        "swapApplied": mapping["swapApplied"],
-    }
 
+def fetch_daily_report_data_for_cards(card_nos: Sequence[str], date_value: str) -> dict[str, DailyReportData]:
+    """
+    Daily report data for many cards at once, keyed by card number.
 
-def fetch_monthly_report(card_no: str, month_value: str) -> Dict[str, Any]:
-    start, end, normalized_month = _month_bounds(month_value)
-    detector = _detect_event_variant(event_alias="e", event_type_alias="et")
-    mapping = _get_mapping_state(detector=detector)
-    identity = _fetch_employee_identity(card_no)
+    One identity query and one event extraction (IN-list chunked) over the same
+    window fetch_daily_report_data uses per card; everything else is computed
+    in memory. Unknown cards get the same fallback identity as a single fetch.
+    """
+    return fetch_daily_report_data_for_cards_span(card_nos, date_value, date_value).get(date_value, {})
 
-    records = _build_daily_records_for_period(
-        card_no=card_no,
-        start=start,
-        end=end,
-        swap_applied=bool(mapping["swapApplied"]),
-        detector=detector,
-    )
-    period_totals = _compute_period_segment_totals(
-        card_no=card_no,
-        start=start,
-        end=end,
-        swap_applied=bool(mapping["swapApplied"]),
+
+def fetch_daily_report_data_for_cards_span(
+    card_nos: Sequence[str],
+    start_value: str,
+    end_value: str,
+) -> dict[str, dict[str, DailyReportData]]:
+    """
+    Daily report data for many cards over consecutive days, keyed by date then card.
+
+    Events for the whole span are extracted once; each day is built from its
+    own slice of that extraction, identical to a single-day fetch.
+    """
+    start_date = _parse_date(start_value)
+    end_date = _parse_date(end_value)
+    cards = list(dict.fromkeys(card for card in card_nos if card))
+    if not cards or end_date < start_date:
+        return {}
+
+    detector = _detect_event_variant(event_alias="e", event_type_alias="et")
+    mapping = _get_mapping_state(detector=detector)
+    swap_applied = bool(mapping["swapApplied"])
+    identities = {card_no: _identity_model(identity) for card_no, identity in _fetch_employee_identities(cards).items()}
+
+    span_start = datetime.combine(start_date, datetime.min.time())
+    span_end = datetime.combine(end_date, datetime.min.time()) + timedelta(days=1)
+    events_by_card = _fetch_events_for_cards(
+        cards,
+        start=span_start - timedelta(hours=12),
+        end=span_end + timedelta(hours=12),
         detector=detector,
     )
 
+    result: dict[str, dict[str, DailyReportData]] = {}
+    day = start_date
+    while day <= end_date:
+        day_start = datetime.combine(day, datetime.min.time())
+        window_start = day_start - timedelta(hours=12)
+        window_end = day_start + timedelta(days=1, hours=12)
+        by_card: dict[str, DailyReportData] = {}
+        for card_no in cards:
+            by_card[card_no] = DailyReportData(
+                identity=identities[card_no],
+                detail=_build_daily_transactions_and_intervals_from_events(
+                    selected_date=day,
+                    raw_window_events=_slice_events(events_by_card.get(card_no, []), window_start, window_end),
+                    swap_applied=swap_applied,
+                ),
+                mapping_variant=str(mapping["mappingVariant"]),
+                swap_applied=swap_applied,
+            )
+        result[day.strftime("%Y-%m-%d")] = by_card
+        day += timedelta(days=1)
+    return result
+
+
+def serialize_daily_report(data: DailyReportData) -> Dict[str, Any]:
+    day_record = _serialize_daily_detail(data.detail)
+    return {
+        "employee_name": data.identity.employee_name,
+        "card_no": data.identity.card_no,
+        "department": data.identity.department,
+        **day_record,
+        "duration": day_record["duration_hhmm"],
+        "total_work_minutes": day_record["duration_minutes"],
+        "mappingVariant": data.mapping_variant,
+        "swapApplied": data.swap_applied,
+    }
+
+
+def fetch_daily_report(card_no: str, date_value: str) -> Dict[str, Any]:
+    return serialize_daily_report(fetch_daily_report_data(card_no=card_no, date_value=date_value))
+
+
+def _monthly_report_payload(
+    *,
+    identity: dict[str, Any],
+    normalized_month: str,
+    records: list[dict[str, Any]],
+    period_totals: dict[str, Any],
+    mapping: dict[str, Any],
+) -> Dict[str, Any]:
     total_minutes = sum(item["duration_minutes"] or 0 for item in records)
     total_days = sum(1 for item in records if item.get("first_in"))
     missing_punch_days = sum(1 for item in records if bool(item.get("missing_punch")))
@@ -2000,27 +2398,14 @@ def fetch_monthly_report(card_no: str, month_value: str) -> Dict[str, Any]:
     }
 
 
-def fetch_yearly_report(card_no: str, year_value: str) -> Dict[str, Any]:
-    start, end, normalized_year = _year_bounds(year_value)
-    detector = _detect_event_variant(event_alias="e", event_type_alias="et")
-    mapping = _get_mapping_state(detector=detector)
-    identity = _fetch_employee_identity(card_no)
-
-    daily_records = _build_daily_records_for_period(
-        card_no=card_no,
-        start=start,
-        end=end,
-        swap_applied=bool(mapping["swapApplied"]),
-        detector=detector,
-    )
-    period_totals = _compute_period_segment_totals(
-        card_no=card_no,
-        start=start,
-        end=end,
-        swap_applied=bool(mapping["swapApplied"]),
-        detector=detector,
-    )
-
+def _yearly_report_payload(
+    *,
+    identity: dict[str, Any],
+    normalized_year: str,
+    daily_records: list[dict[str, Any]],
+    period_totals: dict[str, Any],
+    mapping: dict[str, Any],
+) -> Dict[str, Any]:
     month_map: dict[str, dict[str, int]] = defaultdict(
         lambda: {
             "worked_days": 0,
@@ -2097,6 +2482,74 @@ def fetch_yearly_report(card_no: str, year_value: str) -> Dict[str, Any]:
     }
 
 
+def fetch_monthly_report(card_no: str, month_value: str) -> Dict[str, Any]:
+    start, end, normalized_month = _month_bounds(month_value)
+    detector = _detect_event_variant(event_alias="e", event_type_alias="et")
+    mapping = _get_mapping_state(detector=detector)
+    identity = _fetch_employee_identity(card_no)
+
+    records = _build_daily_records_for_period(
+        card_no=card_no,
+        start=start,
+        end=end,
+        swap_applied=bool(mapping["swapApplied"]),
+        detector=detector,
+    )
+    period_totals = _compute_period_segment_totals(
+        card_no=card_no,
+        start=start,
+        end=end,
+        swap_applied=bool(mapping["swapApplied"]),
+        detector=detector,
+    )
+    return _monthly_report_payload(
+        identity=identity,
+        normalized_month=normalized_month,
+        records=records,
+        period_totals=period_totals,
+        mapping=mapping,
+    )
+
+
+def fetch_yearly_report(card_no: str, year_value: str) -> Dict[str, Any]:
+    start, end, normalized_year = _year_bounds(year_value)
+    detector = _detect_event_variant(event_alias="e", event_type_alias="et")
+    mapping = _get_mapping_state(detector=detector)
+    identity = _fetch_employee_identity(card_no)
+
+    daily_records = _build_daily_records_for_period(
+        card_no=card_no,
+        start=start,
+        end=end,
+        swap_applied=bool(mapping["swapApplied"]),
+        detector=detector,
+    )
+    period_totals = _compute_period_segment_totals(
+        card_no=card_no,
+        start=start,
+        end=end,
+        swap_applied=bool(mapping["swapApplied"]),
+        detector=detector,
+    )
+    return _yearly_report_payload(
+        identity=identity,
+        normalized_year=normalized_year,
+        daily_records=daily_records,
+        period_totals=period_totals,
+        mapping=mapping,
+    )
+
+
+def _cohort_filters_payload(
+    departments: Sequence[str] | None,
+    card_nos: Sequence[str] | None,
+) -> dict[str, list[str]]:
+    return {
+        "departments": _normalize_cohort_values(departments),
+        "card_nos": _normalize_cohort_values(card_nos),
+    }
+
+
 def _sorted_employee_rows_for_all(employees: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
     return sorted(
         [dict(item) for item in employees],
@@ -2107,19 +2560,117 @@ def _sorted_employee_rows_for_all(employees: Sequence[dict[str, Any]]) -> list[d
     )
 
 
-def fetch_daily_report_all_employees(date_value: str) -> Dict[str, Any]:
+def _daily_all_row(
+    *,
+    employee: dict[str, Any],
+    card_no: str,
+    selected_date: date,
+    events: Sequence[dict[str, Any]],
+    swap_applied: bool,
+) -> dict[str, Any]:
+    daily = _build_daily_transactions_and_intervals_from_events(
+        selected_date=selected_date,
+        raw_window_events=events,
+        swap_applied=swap_applied,
+    )
+    duration_minutes = daily.duration_minutes
+    in_minutes = daily.total_in_minutes
+    out_minutes = daily.total_out_minutes
+
+    return {
+        "employee_name": employee.get("employee_name") or card_no,
+        "card_no": card_no,
+        "department": employee.get("department"),
+        "first_in": _format_dt(daily.first_in),
+        "last_out": _format_dt(daily.last_out),
+        "duration_minutes": duration_minutes,
+        "duration_hhmm": _minutes_to_hhmm(duration_minutes),
+        "total_in_minutes": in_minutes,
+        "total_out_minutes": out_minutes,
+        "total_in_hhmm": _minutes_to_hhmm(in_minutes),
+        "total_out_hhmm": _minutes_to_hhmm(out_minutes),
+        "sessions_count": daily.sessions_count,
+        "missing_punch": daily.missing_punch,
+    }
+
+
+def _period_all_row(
+    *,
+    employee: dict[str, Any],
+    card_no: str,
+    events: Sequence[dict[str, Any]],
+    start: datetime,
+    end: datetime,
+    swap_applied: bool,
+) -> dict[str, Any]:
+    records = _build_daily_records_for_period_from_events(
+        events=events,
+        start=start,
+        end=end,
+        swap_applied=swap_applied,
+    )
+    period_totals = _compute_period_segment_totals_from_events(
+        events=events,
+        start=start,
+        end=end,
+        swap_applied=swap_applied,
+    )
+    sessions = _count_sessions_from_events(
+        events=events,
+        window_start=start,
+        window_end=end + timedelta(hours=settings.shift_out_cutoff_hours),
+        swap_applied=swap_applied,
+    )
+
+    working_days = sum(1 for item in records if item.get("first_in"))
+    missing_punch_days = sum(1 for item in records if bool(item.get("missing_punch")))
+    total_minutes = sum(_to_int(item.get("duration_minutes")) or 0 for item in records)
+    average_minutes = int(total_minutes / working_days) if working_days > 0 else 0
+
+    return {
+        "employee_name": employee.get("employee_name") or card_no,
+        "card_no": card_no,
+        "department": employee.get("department"),
+        "working_days": working_days,
+        "total_minutes": total_minutes,
+        "total_duration_hhmm": _minutes_to_hhmm(total_minutes),
+        "total_duration_readable": format_duration_readable(total_minutes),
+        "avg_minutes_per_day": average_minutes,
+        "avg_duration_hhmm": _minutes_to_hhmm(average_minutes),
+        "missing_punch_days": missing_punch_days,
+        "sessions_count": sessions,
+        "total_in_minutes": _to_int(period_totals.get("totalInMinutes")) or 0,
+        "total_out_minutes": _to_int(period_totals.get("totalOutMinutes")) or 0,
+        "total_in_hhmm": period_totals.get("totalInHHMM"),
+        "total_out_hhmm": period_totals.get("totalOutHHMM"),
+    }
+
+
+def fetch_daily_report_all_employees(
+    date_value: str,
+    departments: Sequence[str] | None = None,
+    card_nos: Sequence[str] | None = None,
+) -> Dict[str, Any]:
     selected_date = _parse_date(date_value)
     detector = _detect_event_variant(event_alias="e", event_type_alias="et")
     mapping = _get_mapping_state(detector=detector)
     swap_applied = bool(mapping["swapApplied"])
 
-    employees = _sorted_employee_rows_for_all(_fetch_all_active_employees())
+    employees = _sorted_employee_rows_for_all(
+        _fetch_all_active_employees(departments=departments, card_nos=card_nos)
+    )
 
     day_start = datetime.combine(selected_date, datetime.min.time())
     day_end = day_start + timedelta(days=1)
     window_start = day_start - timedelta(hours=12)
     window_end = day_end + timedelta(hours=12)
-    events_by_card = _fetch_all_active_events(start=window_start, end=window_end, detector=detector)
+    events_by_card = _fetch_all_active_events(
+        start=window_start,
+        end=window_end,
+        detector=detector,
+        departments=departments,
+        card_nos=card_nos,
+    )
 
     rows: list[dict[str, Any]] = []
     total_in_minutes = 0
@@ -2134,44 +2685,26 @@ def fetch_daily_report_all_employees(date_value: str) -> Dict[str, Any]:
         if not card_no:
             continue
 
-        daily = _build_daily_transactions_and_intervals_from_events(
+        row = _daily_all_row(
+            employee=employee,
+            card_no=card_no,
             selected_date=selected_date,
-            raw_window_events=events_by_card.get(card_no, []),
+            events=events_by_card.get(card_no, []),
             swap_applied=swap_applied,
         )
-        sessions_count = len(daily.get("rows") or [])
-        duration_minutes = _to_int(daily.get("duration_minutes"))
-        in_minutes = _to_int(daily.get("totalInMinutes")) or _to_int(daily.get("total_in_minutes")) or 0
-        out_minutes = _to_int(daily.get("totalOutMinutes")) or _to_int(daily.get("total_out_minutes")) or 0
-        missing_punch = bool(daily.get("missing_punch"))
+        duration_minutes = row["duration_minutes"]
 
         if duration_minutes is not None:
             total_duration_minutes += duration_minutes
             working_rows += 1
-        if missing_punch:
+        if row["missing_punch"]:
             missing_punch_count += 1
 
-        total_in_minutes += max(0, in_minutes)
-        total_out_minutes += max(0, out_minutes)
-        total_sessions += max(0, sessions_count)
+        total_in_minutes += max(0, row["total_in_minutes"])
+        total_out_minutes += max(0, row["total_out_minutes"])
+        total_sessions += max(0, row["sessions_count"])
 
-        rows.append(
-            {
-                "employee_name": employee.get("employee_name") or card_no,
-                "card_no": card_no,
-                "department": employee.get("department"),
-                "first_in": daily.get("first_in"),
-                "last_out": daily.get("last_out"),
-                "duration_minutes": duration_minutes,
-                "duration_hhmm": daily.get("duration_hhmm"),
-                "total_in_minutes": in_minutes,
-                "total_out_minutes": out_minutes,
-                "total_in_hhmm": daily.get("totalInHHMM") or daily.get("total_in"),
-                "total_out_hhmm": daily.get("totalOutHHMM") or daily.get("total_out"),
-                "sessions_count": sessions_count,
-                "missing_punch": missing_punch,
-            }
-        )
+        rows.append(row)
 
     return {
         "date": selected_date.strftime("%Y-%m-%d"),
@@ -2189,21 +2722,34 @@ def fetch_daily_report_all_employees(date_value: str) -> Dict[str, Any]:
             "total_duration_hhmm": _minutes_to_hhmm(total_duration_minutes),
             "total_duration_readable": format_duration_readable(total_duration_minutes),
         },
+        "filters": _cohort_filters_payload(departments, card_nos),
         "mappingVariant": mapping["mappingVariant"],
         "swapApplied": mapping["swapApplied"],
     }
 
 
-def fetch_monthly_report_all_employees(month_value: str) -> Dict[str, Any]:
+def fetch_monthly_report_all_employees(
+    month_value: str,
+    departments: Sequence[str] | None = None,
+    card_nos: Sequence[str] | None = None,
+) -> Dict[str, Any]:
     start, end, normalized_month = _month_bounds(month_value)
     detector = _detect_event_variant(event_alias="e", event_type_alias="et")
     mapping = _get_mapping_state(detector=detector)
     swap_applied = bool(mapping["swapApplied"])
 
-    employees = _sorted_employee_rows_for_all(_fetch_all_active_employees())
+    employees = _sorted_employee_rows_for_all(
+        _fetch_all_active_employees(departments=departments, card_nos=card_nos)
+    )
     window_start = start - timedelta(hours=12)
     window_end = end + timedelta(days=1, hours=settings.shift_out_cutoff_hours)
-    events_by_card = _fetch_all_active_events(start=window_start, end=window_end, detector=detector)
+    events_by_card = _fetch_all_active_events(
+        start=window_start,
+        end=window_end,
+        detector=detector,
+        departments=departments,
+        card_nos=card_nos,
+    )
 
     rows: list[dict[str, Any]] = []
     total_in_minutes = 0
@@ -2218,60 +2764,23 @@ def fetch_monthly_report_all_employees(month_value: str) -> Dict[str, Any]:
         if not card_no:
             continue
 
-        events = events_by_card.get(card_no, [])
-        records = _build_daily_records_for_period_from_events(
-            events=events,
+        row = _period_all_row(
+            employee=employee,
+            card_no=card_no,
+            events=events_by_card.get(card_no, []),
             start=start,
             end=end,
             swap_applied=swap_applied,
         )
-        period_totals = _compute_period_segment_totals_from_events(
-            events=events,
-            start=start,
-            end=end,
-            swap_applied=swap_applied,
-        )
-        sessions = _count_sessions_from_events(
-            events=events,
-            window_start=start,
-            window_end=end + timedelta(hours=settings.shift_out_cutoff_hours),
-            swap_applied=swap_applied,
-        )
-
-        working_days = sum(1 for item in records if item.get("first_in"))
-        missing_punch_days = sum(1 for item in records if bool(item.get("missing_punch")))
-        total_minutes = sum(_to_int(item.get("duration_minutes")) or 0 for item in records)
-        average_minutes = int(total_minutes / working_days) if working_days > 0 else 0
 
-        in_minutes = _to_int(period_totals.get("totalInMinutes")) or 0
-        out_minutes = _to_int(period_totals.get("totalOutMinutes")) or 0
+        total_working_days += row["working_days"]
+        total_missing_punch += row["missing_punch_days"]
+        total_work_minutes += row["total_minutes"]
+        total_in_minutes += row["total_in_minutes"]
+        total_out_minutes += row["total_out_minutes"]
+        total_sessions += max(0, row["sessions_count"])
 
-        total_working_days += working_days
-        total_missing_punch += missing_punch_days
-        total_work_minutes += total_minutes
-        total_in_minutes += in_minutes
-        total_out_minutes += out_minutes
-        total_sessions += max(0, sessions)
-
-        rows.append(
-            {
-                "employee_name": employee.get("employee_name") or card_no,
-                "card_no": card_no,
-                "department": employee.get("department"),
-                "working_days": working_days,
-                "total_minutes": total_minutes,
-                "total_duration_hhmm": _minutes_to_hhmm(total_minutes),
-                "total_duration_readable": format_duration_readable(total_minutes),
-                "avg_minutes_per_day": average_minutes,
-                "avg_duration_hhmm": _minutes_to_hhmm(average_minutes),
-                "missing_punch_days": missing_punch_days,
-                "sessions_count": sessions,
-                "total_in_minutes": in_minutes,
-                "total_out_minutes": out_minutes,
-                "total_in_hhmm": period_totals.get("totalInHHMM"),
-                "total_out_hhmm": period_totals.get("totalOutHHMM"),
-            }
-        )
+        rows.append(row)
 
     return {
         "month": normalized_month,
@@ -2289,21 +2798,34 @@ def fetch_monthly_report_all_employees(month_value: str) -> Dict[str, Any]:
             "total_work_hhmm": _minutes_to_hhmm(total_work_minutes),
             "total_work_readable": format_duration_readable(total_work_minutes),
         },
+        "filters": _cohort_filters_payload(departments, card_nos),
         "mappingVariant": mapping["mappingVariant"],
         "swapApplied": mapping["swapApplied"],
     }
 
 
-def fetch_yearly_report_all_employees(year_value: str) -> Dict[str, Any]:
+def fetch_yearly_report_all_employees(
+    year_value: str,
+    departments: Sequence[str] | None = None,
+    card_nos: Sequence[str] | None = None,
+) -> Dict[str, Any]:
     start, end, normalized_year = _year_bounds(year_value)
     detector = _detect_event_variant(event_alias="e", event_type_alias="et")
     mapping = _get_mapping_state(detector=detector)
     swap_applied = bool(mapping["swapApplied"])
 
-    employees = _sorted_employee_rows_for_all(_fetch_all_active_employees())
+    employees = _sorted_employee_rows_for_all(
+        _fetch_all_active_employees(departments=departments, card_nos=card_nos)
+    )
     window_start = start - timedelta(hours=12)
     window_end = end + timedelta(days=1, hours=settings.shift_out_cutoff_hours)
-    events_by_card = _fetch_all_active_events(start=window_start, end=window_end, detector=detector)
+    events_by_card = _fetch_all_active_events(
+        start=window_start,
+        end=window_end,
+        detector=detector,
+        departments=departments,
+        card_nos=card_nos,
+    )
 
     rows: list[dict[str, Any]] = []
     total_in_minutes = 0
@@ -2318,60 +2840,23 @@ def fetch_yearly_report_all_employees(year_value: str) -> Dict[str, Any]:
         if not card_no:
             continue
 
-        events = events_by_card.get(card_no, [])
-        records = _build_daily_records_for_period_from_events(
-            events=events,
+        row = _period_all_row(
+            employee=employee,
+            card_no=card_no,
+            events=events_by_card.get(card_no, []),
             start=start,
             end=end,
             swap_applied=swap_applied,
         )
-        period_totals = _compute_period_segment_totals_from_events(
-            events=events,
-            start=start,
-            end=end,
-            swap_applied=swap_applied,
-        )
-        sessions = _count_sessions_from_events(
-            events=events,
-            window_start=start,
-            window_end=end + timedelta(hours=settings.shift_out_cutoff_hours),
-            swap_applied=swap_applied,
-        )
-
-        working_days = sum(1 for item in records if item.get("first_in"))
-        missing_punch_days = sum(1 for item in records if bool(item.get("missing_punch")))
-        total_minutes = sum(_to_int(item.get("duration_minutes")) or 0 for item in records)
-        average_minutes = int(total_minutes / working_days) if working_days > 0 else 0
 
-        in_minutes = _to_int(period_totals.get("totalInMinutes")) or 0
-        out_minutes = _to_int(period_totals.get("totalOutMinutes")) or 0
+        total_working_days += row["working_days"]
+        total_missing_punch += row["missing_punch_days"]
+        total_work_minutes += row["total_minutes"]
+        total_in_minutes += row["total_in_minutes"]
+        total_out_minutes += row["total_out_minutes"]
+        total_sessions += max(0, row["sessions_count"])
 
-        total_working_days += working_days
-        total_missing_punch += missing_punch_days
-        total_work_minutes += total_minutes
-        total_in_minutes += in_minutes
-        total_out_minutes += out_minutes
-        total_sessions += max(0, sessions)
-
-        rows.append(
-            {
-                "employee_name": employee.get("employee_name") or card_no,
-                "card_no": card_no,
-                "department": employee.get("department"),
-                "working_days": working_days,
-                "total_minutes": total_minutes,
-                "total_duration_hhmm": _minutes_to_hhmm(total_minutes),
-                "total_duration_readable": format_duration_readable(total_minutes),
-                "avg_minutes_per_day": average_minutes,
-                "avg_duration_hhmm": _minutes_to_hhmm(average_minutes),
-                "missing_punch_days": missing_punch_days,
-                "sessions_count": sessions,
-                "total_in_minutes": in_minutes,
-                "total_out_minutes": out_minutes,
-                "total_in_hhmm": period_totals.get("totalInHHMM"),
-                "total_out_hhmm": period_totals.get("totalOutHHMM"),
-            }
-        )
+        rows.append(row)
 
     return {
         "year": normalized_year,
@@ -2389,11 +2874,734 @@ def fetch_yearly_report_all_employees(year_value: str) -> Dict[str, Any]:
             "total_work_hhmm": _minutes_to_hhmm(total_work_minutes),
             "total_work_readable": format_duration_readable(total_work_minutes),
         },
+        "filters": _cohort_filters_payload(departments, card_nos),
         "mappingVariant": mapping["mappingVariant"],
         "swapApplied": mapping["swapApplied"],
     }
 
 
+_UNASSIGNED_DEPARTMENT = "Unassigned"
+
+
+def _all_report_period(period_value: str) -> tuple[str, str, datetime, datetime, datetime, datetime]:
+    # Returns (period type, normalized period, period start, period end, fetch start,
+    # fetch end) using the same extraction windows as the all-employee reports.
+    value = _clean_text(period_value)
+    if len(value) == 10:
+        selected_date = _parse_date(value)
+        day_start = datetime.combine(selected_date, datetime.min.time())
+        day_end = day_start + timedelta(days=1)
+        return (
+            "daily",
+            selected_date.strftime("%Y-%m-%d"),
+            day_start,
+            day_end,
+            day_start - timedelta(hours=12),
+            day_end + timedelta(hours=12),
+        )
+
+    if len(value) == 7:
+        period_type = "monthly"
+        start, end, normalized = _month_bounds(value)
+    elif len(value) == 4:
+        period_type = "yearly"
+        start, end, normalized = _year_bounds(value)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="period must be YYYY-MM-DD, YYYY-MM or YYYY",
+        )
+    return (
+        period_type,
+        normalized,
+        start,
+        end,
+        start - timedelta(hours=12),
+        end + timedelta(days=1, hours=settings.shift_out_cutoff_hours),
+    )
+
+
+def _fetch_department_headcounts() -> dict[str, int]:
+    schema = _get_schema()
+    employee_card_col = schema["employee_card_col"] or "CardNo"
+    active_where = _active_employee_where("emp", schema)
+    department_expr, department_join_sql = _employee_department_select_components(
+        employee_alias="emp",
+        schema=schema,
+        department_alias="dept",
+    )
+
+    # Without a department column everyone is Unassigned; SQL Server rejects
+    # GROUP BY on the constant placeholder, so count the whole table instead.
+    if schema.get("employee_department_col"):
+        department_select = f"{department_expr} AS Department,"
+        group_by_sql = f"GROUP BY {department_expr}"
+    else:
+        department_select = ""
+        group_by_sql = ""
+
+    sql = f"""
+        SELECT
+            {department_select}
+            COUNT(*) AS Headcount
+        FROM [dbo].[TEmployee] emp
+        {department_join_sql}
+        WHERE {active_where}
+          AND LTRIM(RTRIM(ISNULL(CONVERT(VARCHAR(64), emp.[{employee_card_col}]), ''))) <> ''
+        {group_by_sql}
+    """
+
+    with get_cursor() as cursor:
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+
+    headcounts: dict[str, int] = defaultdict(int)
+    for row in rows:
+        label = _clean_text(row.get("Department")) or _UNASSIGNED_DEPARTMENT
+        headcounts[label] += _to_int(row.get("Headcount")) or 0
+    return headcounts
+
+
+def _empty_department_bucket() -> dict[str, int]:
+    return {
+        "headcount": 0,
+        "employees_with_events": 0,
+        "working_days": 0,
+        "missing_punch_count": 0,
+        "total_work_minutes": 0,
+        "total_in_minutes": 0,
+        "total_out_minutes": 0,
+        "total_sessions": 0,
+    }
+
+
+def _serialize_department_bucket(department: str, bucket: dict[str, int]) -> dict[str, Any]:
+    return {
+        "department": department,
+        **bucket,
+        "total_work_hhmm": _minutes_to_hhmm(bucket["total_work_minutes"]),
+        "total_work_readable": format_duration_readable(bucket["total_work_minutes"]),
+        "total_in_hhmm": _minutes_to_hhmm(bucket["total_in_minutes"]),
+        "total_out_hhmm": _minutes_to_hhmm(bucket["total_out_minutes"]),
+    }
+
+
+def fetch_department_report(period_value: str) -> Dict[str, Any]:
+    """
+    Per-department totals for a day, month or year (type inferred from the format).
+
+    Headcount is a GROUP BY on TEmployee; activity totals are folded card by card
+    from the streamed event extraction, so no per-employee rows are retained.
+    """
+    period_type, normalized, start, end, window_start, window_end = _all_report_period(period_value)
+    detector = _detect_event_variant(event_alias="e", event_type_alias="et")
+    mapping = _get_mapping_state(detector=detector)
+    swap_applied = bool(mapping["swapApplied"])
+
+    buckets: dict[str, dict[str, int]] = defaultdict(_empty_department_bucket)
+    for label, headcount in _fetch_department_headcounts().items():
+        buckets[label]["headcount"] = headcount
+
+    for card_no, department, events in _iter_all_active_events(
+        start=window_start,
+        end=window_end,
+        detector=detector,
+        include_department=True,
+    ):
+        employee = {"employee_name": card_no, "department": department}
+        if period_type == "daily":
+            row = _daily_all_row(
+                employee=employee,
+                card_no=card_no,
+                selected_date=start.date(),
+                events=events,
+                swap_applied=swap_applied,
+            )
+            working_days = 1 if row["duration_minutes"] is not None else 0
+            missing_punch = 1 if row["missing_punch"] else 0
+            work_minutes = row["duration_minutes"] or 0
+        else:
+            row = _period_all_row(
+                employee=employee,
+                card_no=card_no,
+                events=events,
+                start=start,
+                end=end,
+                swap_applied=swap_applied,
+            )
+            working_days = row["working_days"]
+            missing_punch = row["missing_punch_days"]
+            work_minutes = row["total_minutes"]
+
+        bucket = buckets[department or _UNASSIGNED_DEPARTMENT]
+        bucket["employees_with_events"] += 1
+        bucket["working_days"] += working_days
+        bucket["missing_punch_count"] += missing_punch
+        bucket["total_work_minutes"] += work_minutes
+        bucket["total_in_minutes"] += max(0, row["total_in_minutes"])
+        bucket["total_out_minutes"] += max(0, row["total_out_minutes"])
+        bucket["total_sessions"] += max(0, row["sessions_count"])
+
+    ordered_labels = sorted(
+        buckets.keys(),
+        key=lambda label: (label == _UNASSIGNED_DEPARTMENT, label.lower()),
+    )
+    totals = _empty_department_bucket()
+    for bucket in buckets.values():
+        for key, value in bucket.items():
+            totals[key] += value
+
+    return {
+        "period_type": period_type,
+        "period": normalized,
+        "departments": [_serialize_department_bucket(label, buckets[label]) for label in ordered_labels],
+        "summary": _serialize_department_bucket("All", totals),
+        "mappingVariant": mapping["mappingVariant"],
+        "swapApplied": mapping["swapApplied"],
+    }
+
+
+_DAILY_EXPORT_COLUMNS = (
+    "period",
+    "employee_name",
+    "card_no",
+    "department",
+    "first_in",
+    "last_out",
+    "duration_minutes",
+    "duration_hhmm",
+    "total_in_minutes",
+    "total_out_minutes",
+    "total_in_hhmm",
+    "total_out_hhmm",
+    "sessions_count",
+    "missing_punch",
+)
+_PERIOD_EXPORT_COLUMNS = (
+    "period",
+    "employee_name",
+    "card_no",
+    "department",
+    "working_days",
+    "total_minutes",
+    "total_duration_hhmm",
+    "avg_minutes_per_day",
+    "avg_duration_hhmm",
+    "missing_punch_days",
+    "sessions_count",
+    "total_in_minutes",
+    "total_out_minutes",
+    "total_in_hhmm",
+    "total_out_hhmm",
+)
+_MUSTER_EXPORT_COLUMNS = (
+    "date",
+    "employee_name",
+    "card_no",
+    "department",
+    "first_in",
+    "last_out",
+    "duration_minutes",
+    "duration_hhmm",
+    "missing_punch",
+)
+
+
+def _iter_cohort_events(
+    *,
+    employees: Sequence[dict[str, Any]],
+    start: datetime,
+    end: datetime,
+    detector: dict[str, str],
+    departments: Sequence[str] | None,
+    card_nos: Sequence[str] | None,
+) -> Iterator[tuple[dict[str, Any], list[dict[str, Any]]]]:
+    # Employees with punches come first, in the card order of the event stream;
+    # the rest of the cohort follows with no events.
+    pending = {str(employee["card_no"]): employee for employee in employees}
+    for card_no, _department, events in _iter_all_active_events(
+        start=start,
+        end=end,
+        detector=detector,
+        departments=departments,
+        card_nos=card_nos,
+    ):
+        employee = pending.pop(card_no, None)
+        if employee is not None:
+            yield employee, events
+    for employee in pending.values():
+        yield employee, []
+
+
+def _started(iterator: Iterator[Any]) -> Iterator[Any]:
+    # Runs a lazy extraction up to its first item now, so connection and query
+    # errors raise while the caller can still answer with a 503 rather than
+    # after a streaming response has sent its status line.
+    try:
+        first = next(iterator)
+    except StopIteration:
+        return iter(())
+    return chain((first,), iterator)
+
+
+def _prepare_cohort_export(
+    period_value: str,
+    departments: Sequence[str] | None,
+    card_nos: Sequence[str] | None,
+) -> dict[str, Any]:
+    period_type, normalized, start, end, window_start, window_end = _all_report_period(period_value)
+    detector = _detect_event_variant(event_alias="e", event_type_alias="et")
+    mapping = _get_mapping_state(detector=detector)
+    employees = _sorted_employee_rows_for_all(
+        _fetch_all_active_employees(departments=departments, card_nos=card_nos)
+    )
+    return {
+        "period_type": period_type,
+        "period": normalized,
+        "start": start,
+        "end": end,
+        "window_start": window_start,
+        "window_end": window_end,
+        "detector": detector,
+        "swap_applied": bool(mapping["swapApplied"]),
+        "employees": employees,
+    }
+
+
+def stream_all_employee_rows(
+    period_value: str,
+    departments: Sequence[str] | None = None,
+    card_nos: Sequence[str] | None = None,
+) -> Dict[str, Any]:
+    """
+    All-employee report rows for a day, month or year, computed lazily.
+
+    Detector, mapping and the cohort are resolved, and the event query executed,
+    before this returns, so connection and query errors surface before streaming
+    starts; "rows" is an iterator that reads events card by card and builds each
+    employee's row only when it is consumed.
+    """
+    export = _prepare_cohort_export(period_value, departments, card_nos)
+    period_type = export["period_type"]
+    start, end = export["start"], export["end"]
+    swap_applied = export["swap_applied"]
+    cohort_events = _started(
+        _iter_cohort_events(
+            employees=export["employees"],
+            start=export["window_start"],
+            end=export["window_end"],
+            detector=export["detector"],
+            departments=departments,
+            card_nos=card_nos,
+        )
+    )
+
+    def _rows() -> Iterator[dict[str, Any]]:
+        for employee, events in cohort_events:
+            card_no = str(employee["card_no"])
+            if period_type == "daily":
+                row = _daily_all_row(
+                    employee=employee,
+                    card_no=card_no,
+                    selected_date=start.date(),
+                    events=events,
+                    swap_applied=swap_applied,
+                )
+            else:
+                row = _period_all_row(
+                    employee=employee,
+                    card_no=card_no,
+                    events=events,
+                    start=start,
+                    end=end,
+                    swap_applied=swap_applied,
+                )
+            yield {"period": export["period"], **row}
+
+    return {
+        "period_type": period_type,
+        "period": export["period"],
+        "columns": _DAILY_EXPORT_COLUMNS if period_type == "daily" else _PERIOD_EXPORT_COLUMNS,
+        "rows": _rows(),
+    }
+
+
+def stream_muster_rows(
+    period_value: str,
+    departments: Sequence[str] | None = None,
+    card_nos: Sequence[str] | None = None,
+) -> Dict[str, Any]:
+    """
+    One row per employee per day with activity, as in the monthly report's
+    daily records, computed lazily like stream_all_employee_rows.
+    """
+    export = _prepare_cohort_export(period_value, departments, card_nos)
+    period_type = export["period_type"]
+    start, end = export["start"], export["end"]
+    swap_applied = export["swap_applied"]
+    # Day records look past midnight up to the shift-out cutoff.
+    window_end = max(export["window_end"], end + timedelta(hours=settings.shift_out_cutoff_hours))
+    cohort_events = _started(
+        _iter_cohort_events(
+            employees=export["employees"],
+            start=export["window_start"],
+            end=window_end,
+            detector=export["detector"],
+            departments=departments,
+            card_nos=card_nos,
+        )
+    )
+
+    def _rows() -> Iterator[dict[str, Any]]:
+        for employee, events in cohort_events:
+            if not events:
+                continue
+            card_no = str(employee["card_no"])
+            records = _build_daily_records_for_period_from_events(
+                events=events,
+                start=start,
+                end=end,
+                swap_applied=swap_applied,
+            )
+            for record in records:
+                yield {
+                    "date": record["date"],
+                    "employee_name": employee.get("employee_name") or card_no,
+                    "card_no": card_no,
+                    "department": employee.get("department"),
+                    "first_in": record["first_in"],
+                    "last_out": record["last_out"],
+                    "duration_minutes": record["duration_minutes"],
+                    "duration_hhmm": record["duration_hhmm"],
+                    "missing_punch": record["missing_punch"],
+                }
+
+    return {
+        "period_type": period_type,
+        "period": export["period"],
+        "columns": _MUSTER_EXPORT_COLUMNS,
+        "rows": _rows(),
+    }
+
+
+def stream_cohort_daily_details(
+    period_value: str,
+    departments: Sequence[str] | None = None,
+    card_nos: Sequence[str] | None = None,
+) -> Dict[str, Any]:
+    """
+    Per-day detail for every active employee over a day or month, computed lazily.
+
+    One streamed extraction covers the whole period; each day is built from its
+    own slice exactly like fetch_daily_report_data. "employees" is the cohort;
+    "details" yields (employee, DailyDetail) only for days with a punch.
+    """
+    export = _prepare_cohort_export(period_value, departments, card_nos)
+    start, end = export["start"], export["end"]
+    swap_applied = export["swap_applied"]
+    days = [(start + timedelta(days=offset)).date() for offset in range((end - start).days)]
+
+    def _details() -> Iterator[tuple[dict[str, Any], DailyDetail]]:
+        for employee, events in _iter_cohort_events(
+            employees=export["employees"],
+            start=start - timedelta(hours=12),
+            end=end + timedelta(hours=12),
+            detector=export["detector"],
+            departments=departments,
+            card_nos=card_nos,
+        ):
+            if not events:
+                continue
+            for day in days:
+                day_start = datetime.combine(day, datetime.min.time())
+                detail = _build_daily_transactions_and_intervals_from_events(
+                    selected_date=day,
+                    raw_window_events=_slice_events(
+                        events,
+                        day_start - timedelta(hours=12),
+                        day_start + timedelta(days=1, hours=12),
+                    ),
+                    swap_applied=swap_applied,
+                )
+                if detail.first_in is None and detail.last_out is None:
+                    continue
+                yield employee, detail
+
+    return {
+        "period_type": export["period_type"],
+        "period": export["period"],
+        "employees": export["employees"],
+        "details": _details(),
+    }
+
+
+def _batch_period_window(period_type: str, period: str) -> tuple[str, datetime, datetime, datetime, datetime]:
+    # Returns (normalized period, period start, period end, fetch start, fetch end)
+    # using the same extraction windows as the single-card report builders.
+    if period_type == "daily":
+        selected_date = _parse_date(period)
+        day_start = datetime.combine(selected_date, datetime.min.time())
+        day_end = day_start + timedelta(days=1)
+        return (
+            selected_date.strftime("%Y-%m-%d"),
+            day_start,
+            day_end,
+            day_start - timedelta(hours=12),
+            day_end + timedelta(hours=12),
+        )
+
+    if period_type == "monthly":
+        start, end, normalized = _month_bounds(period)
+    elif period_type == "yearly":
+        start, end, normalized = _year_bounds(period)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="period_type must be daily, monthly or yearly",
+        )
+    return normalized, start, end, start, end + timedelta(days=1, hours=settings.shift_out_cutoff_hours)
+
+
+def _batch_result(
+    *,
+    index: int,
+    card_no: str,
+    period_type: str,
+    period: str,
+    report: Dict[str, Any] | None = None,
+    error: str | None = None,
+) -> Dict[str, Any]:
+    return {
+        "index": index,
+        "key": f"{period_type}:{period}:{card_no}",
+        "card_no": card_no,
+        "period_type": period_type,
+        "period": period,
+        "ok": error is None,
+        "report": report,
+        "error": error,
+    }
+
+
+def _build_batch_report(
+    *,
+    period_type: str,
+    normalized_period: str,
+    identity: dict[str, Any],
+    events: Sequence[dict[str, Any]],
+    anchor: dict[str, Any] | None,
+    start: datetime,
+    end: datetime,
+    mapping: dict[str, Any],
+) -> Dict[str, Any]:
+    swap_applied = bool(mapping["swapApplied"])
+
+    if period_type == "daily":
+        detail = _build_daily_transactions_and_intervals_from_events(
+            selected_date=start.date(),
+            raw_window_events=events,
+            swap_applied=swap_applied,
+        )
+        return serialize_daily_report(
+            DailyReportData(
+                identity=_identity_model(identity),
+                detail=detail,
+                mapping_variant=str(mapping["mappingVariant"]),
+                swap_applied=swap_applied,
+            )
+        )
+
+    records = _build_daily_records_for_period_from_events(
+        events=events,
+        start=start,
+        end=end,
+        swap_applied=swap_applied,
+    )
+    timeline = _slice_events(events, start, end)
+    if anchor is not None:
+        timeline.insert(0, anchor)
+    period_totals = _compute_period_segment_totals_from_events(
+        events=timeline,
+        start=start,
+        end=end,
+        swap_applied=swap_applied,
+    )
+
+    if period_type == "monthly":
+        return _monthly_report_payload(
+            identity=identity,
+            normalized_month=normalized_period,
+            records=records,
+            period_totals=period_totals,
+            mapping=mapping,
+        )
+    return _yearly_report_payload(
+        identity=identity,
+        normalized_year=normalized_period,
+        daily_records=records,
+        period_totals=period_totals,
+        mapping=mapping,
+    )
+
+
+def _iter_report_batch(
+    *,
+    rejected: list[Dict[str, Any]],
+    groups: list[dict[str, Any]],
+    identities: dict[str, dict[str, Any]],
+    detector: dict[str, str],
+    mapping: dict[str, Any],
+) -> Iterator[Dict[str, Any]]:
+    yield from rejected
+
+    for group in groups:
+        period_type = group["period_type"]
+        card_nos = list(dict.fromkeys(card_no for _, card_no in group["items"]))
+
+        try:
+            events_by_card = _fetch_events_for_cards(
+                card_nos,
+                start=group["fetch_start"],
+                end=group["fetch_end"],
+                detector=detector,
+            )
+            anchors: dict[str, dict[str, Any]] = {}
+            if period_type != "daily":
+                anchors = _fetch_last_events_before_for_cards(
+                    card_nos,
+                    boundary=group["start"],
+                    detector=detector,
+                )
+        except Exception as exc:
+            logger.exception("Batch extraction failed for %s %s", period_type, group["period"])
+            error = "DB connection failed" if isinstance(exc, DBOperationalError) else "Report extraction failed"
+            for index, card_no in group["items"]:
+                yield _batch_result(
+                    index=index,
+                    card_no=card_no,
+                    period_type=period_type,
+                    period=group["period"],
+                    error=error,
+                )
+            continue
+
+        for index, card_no in group["items"]:
+            try:
+                report = _build_batch_report(
+                    period_type=period_type,
+                    normalized_period=group["period"],
+                    identity=identities[card_no],
+                    events=events_by_card.get(card_no, []),
+                    anchor=anchors.get(card_no),
+                    start=group["start"],
+                    end=group["end"],
+                    mapping=mapping,
+                )
+            except Exception:
+                logger.exception("Batch report failed for card %s (%s %s)", card_no, period_type, group["period"])
+                yield _batch_result(
+                    index=index,
+                    card_no=card_no,
+                    period_type=period_type,
+                    period=group["period"],
+                    error="Report generation failed",
+                )
+                continue
+
+            yield _batch_result(
+                index=index,
+                card_no=card_no,
+                period_type=period_type,
+                period=group["period"],
+                report=report,
+            )
+
+
+def fetch_report_batch(items: Sequence[dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Plan a batch of (card_no, period_type, period) report requests.
+
+    Items sharing a period are grouped so each group costs one event extraction
+    (plus one anchor query for monthly/yearly) regardless of how many cards it
+    holds. Detector, mapping and identities are resolved eagerly, so connection
+    failures surface before the caller starts streaming; the returned iterator
+    yields one result per item, in group order, each carrying its input index.
+    """
+    rejected: list[Dict[str, Any]] = []
+    grouped: dict[tuple[str, str], dict[str, Any]] = {}
+
+    for index, item in enumerate(items):
+        card_no = _clean_text(item.get("card_no"))
+        period_type = _clean_text(item.get("period_type")).lower()
+        period = _clean_text(item.get("period"))
+
+        try:
+            if not card_no:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="card_no is required",
+                )
+            normalized, start, end, fetch_start, fetch_end = _batch_period_window(period_type, period)
+        except HTTPException as exc:
+            rejected.append(
+                _batch_result(
+                    index=index,
+                    card_no=card_no,
+                    period_type=period_type,
+                    period=period,
+                    error=str(exc.detail),
+                )
+            )
+            continue
+
+        group = grouped.setdefault(
+            (period_type, normalized),
+            {
+                "period_type": period_type,
+                "period": normalized,
+                "start": start,
+                "end": end,
+                "fetch_start": fetch_start,
+                "fetch_end": fetch_end,
+                "items": [],
+            },
+        )
+        group["items"].append((index, card_no))
+
+    detector = _detect_event_variant(event_alias="e", event_type_alias="et")
+    mapping = _get_mapping_state(detector=detector)
+
+    all_cards = list(dict.fromkeys(card_no for group in grouped.values() for _, card_no in group["items"]))
+    identities = _fetch_employee_identities(all_cards) if all_cards else {}
+
+    return _iter_report_batch(
+        rejected=rejected,
+        groups=list(grouped.values()),
+        identities=identities,
+        detector=detector,
+        mapping=mapping,
+    )
+
+
+def fetch_report_bundle(
+    period_type: str,
+    period: str,
+    *,
+    departments: Sequence[str] | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Per-employee reports for every active employee (optionally limited to
+    departments) for one period, as batch results from fetch_report_batch.
+    """
+    employees = _fetch_all_active_employees(departments=departments)
+    return fetch_report_batch(
+        [
+            {"card_no": employee["card_no"], "period_type": period_type, "period": period}
+            for employee in employees
+        ]
+    )
+
+
 def quick_daily_sequence_sanity() -> dict[str, dict[str, Any]]:
     """
     Lightweight self-check helper for interval pairing logic.
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable
+
+from .app_db import (
+    acquire_lease,
+    claim_schedule_run,
+    ensure_schedules,
+    finish_schedule_run,
+    list_schedules,
+    release_lease,
+    set_schedule_next_run,
+)
+from .config import settings
+from .notification_jobs import enqueue_notification_run
+from . import pdf_cache
+from .pdf_pool import render_pdf
+from .report_cache import is_period_closed, refresh_all_employees_report
+
+logger = logging.getLogger(__name__)
+
+_LEASE_NAME = "scheduler"
+_OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_WORKER: threading.Thread | None = None
+_WORKER_LOCK = threading.Lock()
+_STOP = threading.Event()
+
+# minute, hour, day of month, month, day of week (0 = Sunday; 7 is accepted too)
+_CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _parse_cron_field(value: str, low: int, high: int) -> set[int]:
+    result: set[int] = set()
+    for part in value.split(","):
+        part, _, step_text = part.partition("/")
+        step = int(step_text) if step_text else 1
+        if step < 1:
+            raise ValueError(f"invalid step in {value!r}")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(part)
+            end = high if step_text else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"{value!r} is outside {low}-{high}")
+        result.update(range(start, end + 1, step))
+    return result
+
+
+@dataclass(frozen=True)
+class CronRule:
+    minutes: frozenset[int]
+    hours: frozenset[int]
+    days: frozenset[int]
+    months: frozenset[int]
+    weekdays: frozenset[int]
+    # Standard cron: when both day fields are restricted, either may match.
+    either_day: bool
+
+    def matches_day(self, day: date) -> bool:
+        if day.month not in self.months:
+            return False
+        in_days = day.day in self.days
+        in_weekdays = (day.isoweekday() % 7) in self.weekdays
+        return (in_days or in_weekdays) if self.either_day else (in_days and in_weekdays)
+
+
+def parse_cron(expression: str) -> CronRule:
+    """Parse a five-field cron rule; raises ValueError when it is malformed."""
+    parts = expression.split()
+    if len(parts) != len(_CRON_FIELDS):
+        raise ValueError("cron rule must have 5 fields: minute hour day month weekday")
+    try:
+        minutes, hours, days, months, weekdays = (
+            _parse_cron_field(part, low, high) for part, (low, high) in zip(parts, _CRON_FIELDS)
+        )
+    except ValueError as exc:
+        raise ValueError(f"invalid cron rule {expression!r}: {exc}") from exc
+    if 7 in weekdays:
+        weekdays = (weekdays - {7}) | {0}
+    return CronRule(
+        minutes=frozenset(minutes),
+        hours=frozenset(hours),
+        days=frozenset(days),
+        months=frozenset(months),
+        weekdays=frozenset(weekdays),
+        either_day=parts[2] != "*" and parts[4] != "*",
+    )
+
+
+def next_run_after(expression: str, after: datetime) -> datetime:
+    """First local time strictly after `after` matching the rule."""
+    rule = parse_cron(expression)
+    minutes, hours = sorted(rule.minutes), sorted(rule.hours)
+    start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    day = start.date()
+    for _ in range(366 * 5):
+        if rule.matches_day(day):
+            for hour in hours:
+                for minute in minutes:
+                    candidate = datetime.combine(day, datetime.min.time()).replace(hour=hour, minute=minute)
+                    if candidate >= start:
+                        return candidate
+        day += timedelta(days=1)
+    raise ValueError(f"cron rule {expression!r} never matches")
+
+
+def _to_utc_iso(local_value: datetime) -> str:
+    return local_value.astimezone(timezone.utc).replace(microsecond=0).isoformat()
+
+
+def default_schedules() -> list[dict[str, Any]]:
+    # Yesterday's punches are final SHIFT_OUT_CUTOFF_HOURS after midnight;
+    # everything runs shortly after that, monthly/yearly work on the 1st.
+    cutoff_hour = settings.shift_out_cutoff_hours
+    warm_hour = min(cutoff_hour + 1, 23)
+    return [
+        {"name": "daily-notifications", "task": "notifications", "cron": f"30 {cutoff_hour} * * *"},
+        {
+            "name": "prewarm-daily-reports",
+            "task": "prewarm_reports",
+            "cron": f"0 {warm_hour} * * *",
+            "params": json.dumps({"period": "daily"}),
+        },
+        {
+            "name": "prewarm-monthly-reports",
+            "task": "prewarm_reports",
+            "cron": f"20 {warm_hour} 1 * *",
+            "params": json.dumps({"period": "monthly"}),
+        },
+        {
+            "name": "prewarm-yearly-reports",
+            "task": "prewarm_reports",
+            "cron": f"40 {warm_hour} 1 1 *",
+            "params": json.dumps({"period": "yearly"}),
+        },
+    ]
+
+
+def _latest_closed_period(period_type: str, now: datetime) -> tuple[str, str]:
+    yesterday = now.date() - timedelta(days=1)
+    if period_type == "daily":
+        kind, period = "daily_all", yesterday.isoformat()
+    elif period_type == "monthly":
+        last_month = now.date().replace(day=1) - timedelta(days=1)
+        kind, period = "monthly_all", last_month.strftime("%Y-%m")
+    elif period_type == "yearly":
+        kind, period = "yearly_all", str(now.year - 1)
+    else:
+        raise ValueError(f"Unknown period type: {period_type}")
+    if not is_period_closed(kind, period, now):
+        raise RuntimeError(f"{period} is not final until {settings.shift_out_cutoff_hours}:00 the next day")
+    return kind, period
+
+
+def _task_notifications(_params: dict[str, Any]) -> str:
+    now = datetime.now()
+    target = (now.date() - timedelta(days=1)).isoformat()
+    if not is_period_closed("daily_all", target, now):
+        raise RuntimeError(f"{target} is not final until {settings.shift_out_cutoff_hours}:00")
+    job = enqueue_notification_run(target, None, "scheduler")
+    return f"queued notification job {job['id']} for {target}"
+
+
+def _task_prewarm_reports(params: dict[str, Any]) -> str:
+    kind, period = _latest_closed_period(str(params.get("period") or "daily"), datetime.now())
+    report = refresh_all_employees_report(kind, period)
+    key = pdf_cache.cache_key(kind, report)
+    if pdf_cache.lookup(key):
+        return f"{kind} {period}: report refreshed, PDF already cached"
+    pdf_file = render_pdf(kind, report)
+    try:
+        pdf_cache.store(key, pdf_file)
+    finally:
+        pdf_file.close()
+    return f"{kind} {period}: report and PDF cached"
+
+
+_TASKS: dict[str, Callable[[dict[str, Any]], str]] = {
+    "notifications": _task_notifications,
+    "prewarm_reports": _task_prewarm_reports,
+}
+
+
+def _run_schedule(schedule: dict[str, Any], now_local: datetime) -> None:
+    schedule_id = int(schedule["id"])
+    try:
+        next_run = _to_utc_iso(next_run_after(str(schedule["cron"]), now_local))
+    except ValueError as exc:
+        finish_schedule_run(schedule_id, status="failed", message=str(exc))
+        return
+
+    expected = schedule.get("next_run_at")
+    if not expected:
+        set_schedule_next_run(schedule_id, next_run)
+        return
+    if str(expected) > _to_utc_iso(now_local):
+        return
+    if not claim_schedule_run(schedule_id, str(expected), next_run):
+        return
+
+    task = _TASKS.get(str(schedule["task"]))
+    try:
+        if task is None:
+            raise RuntimeError(f"unknown task {schedule['task']!r}")
+        summary = task(json.loads(schedule.get("params") or "{}"))
+    except Exception as exc:
+        logger.warning("Scheduled task %s failed: %s", schedule["name"], exc)
+        finish_schedule_run(schedule_id, status="failed", message=str(exc) or type(exc).__name__)
+        return
+    logger.info("Scheduled task %s: %s", schedule["name"], summary)
+    finish_schedule_run(schedule_id, status="ok", message=summary)
+
+
+def run_scheduler_once() -> bool:
+    """Run due schedules if this process holds the scheduler lease; False otherwise."""
+    lease_seconds = max(3 * settings.scheduler_poll_seconds, 120)
+    if not acquire_lease(_LEASE_NAME, _OWNER, lease_seconds):
+        return False
+    for schedule in list_schedules():
+        if not schedule.get("enabled") or _STOP.is_set():
+            continue
+        _run_schedule(schedule, datetime.now())
+        # Long tasks (a yearly pre-warm) must not let the lease lapse.
+        acquire_lease(_LEASE_NAME, _OWNER, lease_seconds)
+    return True
+
+
+def _scheduler_loop() -> None:
+    while not _STOP.is_set():
+        try:
+            run_scheduler_once()
+        except Exception:
+            logger.exception("Scheduler pass failed")
+        _STOP.wait(settings.scheduler_poll_seconds)
+
+
+def start_scheduler() -> None:
+    global _WORKER
+    ensure_schedules(default_schedules())
+    if settings.scheduler_poll_seconds <= 0:
+        return
+    with _WORKER_LOCK:
+        if _WORKER is not None and _WORKER.is_alive():
+            return
+        _STOP.clear()
+        _WORKER = threading.Thread(target=_scheduler_loop, name="scheduler", daemon=True)
+        _WORKER.start()
+
+
+def stop_scheduler() -> None:
+    global _WORKER
+    with _WORKER_LOCK:
+        worker, _WORKER = _WORKER, None
+    _STOP.set()
+    if worker is not None:
+        worker.join(timeout=10)
+    try:
+        release_lease(_LEASE_NAME, _OWNER)
+    except Exception:
+        logger.exception("Could not release scheduler lease")
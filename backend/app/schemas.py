@@ -46,6 +46,60 @@ class DashboardSummaryResponse(BaseModel):
     generatedAt: str
 
 
+class PunchDebounceStatsResponse(BaseModel):
+    enabled: bool
+    window_seconds: int
+    rows_seen: int
+    rows_dropped: int
+
+
+class PDFPoolStatsResponse(BaseModel):
+    workers: int
+    queue_max: int
+    job_timeout_seconds: int
+    queued_jobs: int
+    queued_cost: int
+    completed: int
+    failed: int
+    rejected: int
+    timed_out: int
+    avg_render_seconds: float
+
+
+class PDFCacheStatsResponse(BaseModel):
+    enabled: bool
+    max_mb: int
+    max_age_hours: int
+    entries: int
+    size_bytes: int
+    hits: int
+    misses: int
+    stores: int
+    evictions: int
+
+
+class ScheduleItem(BaseModel):
+    name: str
+    task: str
+    cron: str
+    params: str
+    enabled: bool
+    next_run_at: Optional[str]
+    last_run_at: Optional[str]
+    last_status: Optional[str]
+    last_message: Optional[str]
+    updated_at: str
+
+
+class SchedulesResponse(BaseModel):
+    schedules: List[ScheduleItem]
+
+
+class ScheduleUpdateRequest(BaseModel):
+    cron: Optional[str] = Field(default=None, min_length=9, max_length=120)
+    enabled: Optional[bool] = None
+
+
 class DailyReport(BaseModel):
     employee_name: str
     card_no: str
@@ -134,6 +188,65 @@ class YearlyReport(BaseModel):
     swapApplied: bool
 
 
+class DepartmentReportRow(BaseModel):
+    department: str
+    headcount: int
+    employees_with_events: int
+    working_days: int
+    missing_punch_count: int
+    total_work_minutes: int
+    total_in_minutes: int
+    total_out_minutes: int
+    total_sessions: int
+    total_work_hhmm: Optional[str]
+    total_work_readable: Optional[str]
+    total_in_hhmm: Optional[str]
+    total_out_hhmm: Optional[str]
+
+
+class DepartmentReportResponse(BaseModel):
+    period_type: Literal["daily", "monthly", "yearly"]
+    period: str
+    departments: List[DepartmentReportRow]
+    summary: DepartmentReportRow
+    mappingVariant: str
+    swapApplied: bool
+
+
+class ExceptionRow(BaseModel):
+    date: str
+    employee_name: str
+    card_no: str
+    department: Optional[str] = None
+    notice_type: Literal["LATE", "EARLY", "LATE_EARLY", "MISSING_PUNCH"]
+    status: str
+    first_in: Optional[str] = None
+    last_out: Optional[str] = None
+    scheduled_start: str
+    scheduled_end: str
+    late_minutes: int
+    early_minutes: int
+
+
+class ExceptionsReportResponse(BaseModel):
+    period_type: Literal["daily", "monthly"]
+    period: str
+    total_employees: int
+    employees_with_exceptions: int
+    counts: dict[str, int]
+    rows: List[ExceptionRow]
+
+
+class ReportBatchItem(BaseModel):
+    card_no: str = Field(min_length=1, max_length=64)
+    period_type: str = Field(min_length=1, max_length=16)
+    period: str = Field(min_length=1, max_length=16)
+
+
+class ReportBatchRequest(BaseModel):
+    items: List[ReportBatchItem] = Field(min_length=1, max_length=500)
+
+
 class SMTPSettingsRequest(BaseModel):
     host: str = Field(default="", max_length=255)
     port: int = Field(default=587, ge=1, le=65535)
@@ -259,6 +372,7 @@ class EmployeeSettingUpsertRequest(BaseModel):
 
 class NotificationRunItem(BaseModel):
     card_no: str
+    date: Optional[str] = None
     employee_name: str
     status: str
     notice_type: Optional[str]
@@ -266,13 +380,22 @@ class NotificationRunItem(BaseModel):
     error: Optional[str]
 
 
-class NotificationRunResponse(BaseModel):
+class NotificationJobResponse(BaseModel):
+    id: int
+    status: str
     date: str
+    end_date: Optional[str]
+    card_no: Optional[str]
     total_targets: int
     sent_count: int
     skipped_count: int
     failed_count: int
+    pending_count: int
     results: List[NotificationRunItem]
+    error: Optional[str]
+    created_at: str
+    started_at: Optional[str]
+    finished_at: Optional[str]
 
 
 class NotificationLogItem(BaseModel):
@@ -289,3 +412,8 @@ class NotificationLogItem(BaseModel):
 
 class NotificationLogsResponse(BaseModel):
     logs: List[NotificationLogItem]
+    next_after_id: Optional[int] = None
+
+
+class NotificationLogCountResponse(BaseModel):
+    count: int
@@ -0,0 +1,490 @@
+"""
+PDF rendering benchmark with synthetic report payloads.
+
+Builds report dicts of the shapes the API hands to app.pdf_exports and times
+each generator over a range of sizes, recording peak traced memory, output
+size and page count. Results are written as JSON so runs can be compared.
+
+Run from backend/:
+
+    python -m benchmarks.pdf_render
+    python -m benchmarks.pdf_render --kinds monthly_all --employees 100,1200,5000 --repeat 5
+    python -m benchmarks.pdf_render --output after.json --compare before.json
+    python -m benchmarks.pdf_render --kinds yearly --days 366 --profile
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import json
+import platform
+import pstats
+import random
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from typing import Any, Callable
+
+import reportlab
+
+from app import pdf_exports
+
+GENERATORS: dict[str, Callable[[Any], bytes | None]] = {
+    "daily": pdf_exports.generate_daily_pdf,
+    "monthly": pdf_exports.generate_monthly_pdf,
+    "yearly": pdf_exports.generate_yearly_pdf,
+    "daily_all": pdf_exports.generate_daily_all_pdf,
+    "monthly_all": pdf_exports.generate_monthly_all_pdf,
+    "yearly_all": pdf_exports.generate_yearly_all_pdf,
+}
+DEPARTMENTS = ("Finance", "HR", "Operations", "Maintenance", "Logistics", "Quality", "IT")
+FIRST_NAMES = ("Ahmed", "Fatima", "John", "Maria", "Ravi", "Aisha", "Chen", "Omar", "Sara", "Yusuf")
+LAST_NAMES = ("Al Mansouri", "Khan", "Fernandes", "Nair", "Haddad", "Smith", "Rahman", "Das", "Qureshi")
+BASE_DAY = date(2026, 1, 1)
+PAGE_OBJECT = re.compile(rb"/Type\s*/Page(?![s\w])")
+
+
+def _hhmm(minutes: int | None) -> str | None:
+    if minutes is None:
+        return None
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _readable(minutes: int) -> str:
+    return f"{minutes // 60} Hrs {minutes % 60:02d} Mins"
+
+
+def _stamp(value: datetime) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _employee(rng: random.Random, index: int) -> dict[str, Any]:
+    return {
+        "employee_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {index}",
+        "card_no": str(100000 + index),
+        "department": rng.choice(DEPARTMENTS),
+    }
+
+
+def _day_record(rng: random.Random, day: date) -> dict[str, Any]:
+    first_in = datetime.combine(day, datetime.min.time()) + timedelta(minutes=rng.randint(6 * 60 + 30, 9 * 60 + 30))
+    missing_punch = rng.random() < 0.06
+    if missing_punch:
+        return {
+            "date": day.isoformat(),
+            "first_in": _stamp(first_in),
+            "last_out": None,
+            "duration_minutes": None,
+            "duration_hhmm": None,
+            "missing_punch": True,
+        }
+    duration = rng.randint(6 * 60, 11 * 60)
+    return {
+        "date": day.isoformat(),
+        "first_in": _stamp(first_in),
+        "last_out": _stamp(first_in + timedelta(minutes=duration)),
+        "duration_minutes": duration,
+        "duration_hhmm": _hhmm(duration),
+        "missing_punch": False,
+    }
+
+
+def _day_records(rng: random.Random, days: int) -> list[dict[str, Any]]:
+    # Roughly one day in seven has no punches, like weekends and leave.
+    return [
+        _day_record(rng, BASE_DAY + timedelta(days=offset))
+        for offset in range(days)
+        if rng.random() >= 1 / 7
+    ]
+
+
+def build_daily_payload(rng: random.Random, *, sessions: int) -> dict[str, Any]:
+    employee = _employee(rng, 1)
+    cursor = datetime.combine(BASE_DAY, datetime.min.time()) + timedelta(hours=7)
+    rows: list[dict[str, Any]] = []
+    total_in = 0
+    total_out = 0
+    for index in range(sessions):
+        if index:
+            gap = rng.randint(5, 45)
+            cursor += timedelta(minutes=gap)
+            total_out += gap
+        minutes = rng.randint(20, 180)
+        start, end = cursor, cursor + timedelta(minutes=minutes)
+        total_in += minutes
+        rows.append(
+            {
+                "date": start.strftime("%Y-%m-%d"),
+                "in": start.strftime("%I:%M:%S %p"),
+                "out": end.strftime("%I:%M:%S %p"),
+                "duration": _hhmm(minutes),
+                "in_raw": _stamp(start),
+                "out_raw": _stamp(end),
+                "duration_minutes": minutes,
+            }
+        )
+        cursor = end
+
+    first_in = rows[0]["in_raw"] if rows else None
+    last_out = rows[-1]["out_raw"] if rows else None
+    return {
+        **employee,
+        "date": BASE_DAY.isoformat(),
+        "first_in": first_in,
+        "last_out": last_out,
+        "duration_minutes": total_in + total_out,
+        "duration_hhmm": _hhmm(total_in + total_out),
+        "missing_punch": False,
+        "rows": rows,
+        "total_in_minutes": total_in,
+        "total_out_minutes": total_out,
+        "total_in": _hhmm(total_in),
+        "total_out": _hhmm(total_out),
+        "mappingVariant": "normal",
+        "swapApplied": False,
+    }
+
+
+def build_monthly_payload(rng: random.Random, *, days: int) -> dict[str, Any]:
+    records = _day_records(rng, days)
+    total_minutes = sum(item["duration_minutes"] or 0 for item in records)
+    total_out = sum(rng.randint(0, 60) for _ in records)
+    return {
+        **_employee(rng, 1),
+        "month": BASE_DAY.strftime("%Y-%m"),
+        "records": records,
+        "total_days": sum(1 for item in records if item["first_in"]),
+        "missing_punch_days": sum(1 for item in records if item["missing_punch"]),
+        "total_minutes": total_minutes,
+        "total_duration_hhmm": _hhmm(total_minutes),
+        "total_duration_readable": _readable(total_minutes),
+        "totalInMinutes": total_minutes - total_out,
+        "totalOutMinutes": total_out,
+        "totalInHHMM": _hhmm(total_minutes - total_out),
+        "totalOutHHMM": _hhmm(total_out),
+        "total_work_minutes": total_minutes,
+        "mappingVariant": "normal",
+        "swapApplied": False,
+    }
+
+
+def build_yearly_payload(rng: random.Random, *, days: int) -> dict[str, Any]:
+    by_month: dict[str, list[dict[str, Any]]] = {}
+    for record in _day_records(rng, days):
+        by_month.setdefault(record["date"][:7], []).append(record)
+
+    months: list[dict[str, Any]] = []
+    for month_key in sorted(by_month):
+        records = by_month[month_key]
+        durations = [item["duration_minutes"] for item in records if item["duration_minutes"] is not None]
+        month_minutes = sum(durations)
+        average = int(month_minutes / len(durations)) if durations else None
+        months.append(
+            {
+                "month": month_key,
+                "worked_days": sum(1 for item in records if item["first_in"]),
+                "missing_punch_days": sum(1 for item in records if item["missing_punch"]),
+                "total_minutes": month_minutes,
+                "average_minutes_per_day": average,
+                "average_duration_hhmm": _hhmm(average),
+                "total_duration_hhmm": _hhmm(month_minutes),
+                "total_duration_readable": _readable(month_minutes),
+            }
+        )
+
+    total_minutes = sum(item["total_minutes"] for item in months)
+    return {
+        **_employee(rng, 1),
+        "year": str(BASE_DAY.year),
+        "months": months,
+        "total_worked_days": sum(item["worked_days"] for item in months),
+        "missing_punch_days": sum(item["missing_punch_days"] for item in months),
+        "total_minutes": total_minutes,
+        "total_duration_hhmm": _hhmm(total_minutes),
+        "total_duration_readable": _readable(total_minutes),
+        "totalInMinutes": total_minutes,
+        "totalOutMinutes": 0,
+        "totalInHHMM": _hhmm(total_minutes),
+        "totalOutHHMM": _hhmm(0),
+        "total_work_minutes": total_minutes,
+        "mappingVariant": "normal",
+        "swapApplied": False,
+    }
+
+
+def build_daily_all_payload(rng: random.Random, *, employees: int) -> dict[str, Any]:
+    rows: list[dict[str, Any]] = []
+    for index in range(employees):
+        record = _day_record(rng, BASE_DAY) if rng.random() > 0.1 else None
+        duration = record["duration_minutes"] if record else None
+        total_out = rng.randint(0, 60) if duration else 0
+        total_in = (duration or 0) - total_out
+        rows.append(
+            {
+                **_employee(rng, index),
+                "first_in": record["first_in"] if record else None,
+                "last_out": record["last_out"] if record else None,
+                "duration_minutes": duration,
+                "duration_hhmm": _hhmm(duration),
+                "total_in_minutes": total_in,
+                "total_out_minutes": total_out,
+                "total_in_hhmm": _hhmm(total_in),
+                "total_out_hhmm": _hhmm(total_out),
+                "sessions_count": rng.randint(1, 6) if record else 0,
+                "missing_punch": bool(record and record["missing_punch"]),
+            }
+        )
+
+    total_duration = sum(item["duration_minutes"] or 0 for item in rows)
+    total_in = sum(item["total_in_minutes"] for item in rows)
+    total_out = sum(item["total_out_minutes"] for item in rows)
+    return {
+        "date": BASE_DAY.isoformat(),
+        "rows": rows,
+        "summary": {
+            "total_employees": employees,
+            "total_working_days": sum(1 for item in rows if item["duration_minutes"] is not None),
+            "total_in_minutes": total_in,
+            "total_out_minutes": total_out,
+            "total_duration_minutes": total_duration,
+            "total_sessions": sum(item["sessions_count"] for item in rows),
+            "missing_punch_count": sum(1 for item in rows if item["missing_punch"]),
+            "total_in_hhmm": _hhmm(total_in),
+            "total_out_hhmm": _hhmm(total_out),
+            "total_duration_hhmm": _hhmm(total_duration),
+            "total_duration_readable": _readable(total_duration),
+        },
+        "filters": {"departments": [], "card_nos": []},
+        "mappingVariant": "normal",
+        "swapApplied": False,
+    }
+
+
+def _period_all_payload(rng: random.Random, *, employees: int, days: int, period_key: str, period: str) -> dict[str, Any]:
+    rows: list[dict[str, Any]] = []
+    for index in range(employees):
+        working_days = rng.randint(int(days * 0.6), max(int(days * 0.6), int(days * 6 / 7)))
+        total_minutes = sum(rng.randint(6 * 60, 11 * 60) for _ in range(working_days))
+        total_out = rng.randint(0, 45) * working_days
+        average = int(total_minutes / working_days) if working_days else 0
+        rows.append(
+            {
+                **_employee(rng, index),
+                "working_days": working_days,
+                "total_minutes": total_minutes,
+                "total_duration_hhmm": _hhmm(total_minutes),
+                "total_duration_readable": _readable(total_minutes),
+                "avg_minutes_per_day": average,
+                "avg_duration_hhmm": _hhmm(average),
+                "missing_punch_days": rng.randint(0, max(1, days // 15)),
+                "sessions_count": working_days * rng.randint(1, 4),
+                "total_in_minutes": total_minutes - total_out,
+                "total_out_minutes": total_out,
+                "total_in_hhmm": _hhmm(total_minutes - total_out),
+                "total_out_hhmm": _hhmm(total_out),
+            }
+        )
+
+    total_work = sum(item["total_minutes"] for item in rows)
+    total_in = sum(item["total_in_minutes"] for item in rows)
+    total_out = sum(item["total_out_minutes"] for item in rows)
+    return {
+        period_key: period,
+        "rows": rows,
+        "summary": {
+            "total_employees": employees,
+            "total_working_days": sum(item["working_days"] for item in rows),
+            "total_in_minutes": total_in,
+            "total_out_minutes": total_out,
+            "total_work_minutes": total_work,
+            "total_sessions": sum(item["sessions_count"] for item in rows),
+            "missing_punch_count": sum(item["missing_punch_days"] for item in rows),
+            "total_in_hhmm": _hhmm(total_in),
+            "total_out_hhmm": _hhmm(total_out),
+            "total_work_hhmm": _hhmm(total_work),
+            "total_work_readable": _readable(total_work),
+        },
+        "filters": {"departments": [], "card_nos": []},
+        "mappingVariant": "normal",
+        "swapApplied": False,
+    }
+
+
+def build_monthly_all_payload(rng: random.Random, *, employees: int) -> dict[str, Any]:
+    return _period_all_payload(rng, employees=employees, days=31, period_key="month", period=BASE_DAY.strftime("%Y-%m"))
+
+
+def build_yearly_all_payload(rng: random.Random, *, employees: int) -> dict[str, Any]:
+    return _period_all_payload(rng, employees=employees, days=365, period_key="year", period=str(BASE_DAY.year))
+
+
+def _cases(args: argparse.Namespace) -> list[dict[str, Any]]:
+    cases: list[dict[str, Any]] = []
+    for kind in args.kinds:
+        if kind == "daily":
+            cases.extend({"kind": kind, "sessions": value} for value in args.sessions)
+        elif kind in {"monthly", "yearly"}:
+            cases.extend({"kind": kind, "days": value} for value in args.days)
+        else:
+            cases.extend({"kind": kind, "employees": value} for value in args.employees)
+    return cases
+
+
+def _build_payload(case: dict[str, Any], seed: int) -> dict[str, Any]:
+    rng = random.Random(seed)
+    kind = case["kind"]
+    if kind == "daily":
+        return build_daily_payload(rng, sessions=case["sessions"])
+    if kind == "monthly":
+        return build_monthly_payload(rng, days=case["days"])
+    if kind == "yearly":
+        return build_yearly_payload(rng, days=case["days"])
+    if kind == "daily_all":
+        return build_daily_all_payload(rng, employees=case["employees"])
+    if kind == "monthly_all":
+        return build_monthly_all_payload(rng, employees=case["employees"])
+    return build_yearly_all_payload(rng, employees=case["employees"])
+
+
+def _case_label(case: dict[str, Any]) -> str:
+    size = ",".join(f"{key}={value}" for key, value in case.items() if key != "kind")
+    return f"{case['kind']}[{size}]"
+
+
+def _profile(render: Callable[[], bytes | None], top: int) -> list[dict[str, Any]]:
+    profiler = cProfile.Profile()
+    profiler.runcall(render)
+    stats = pstats.Stats(profiler)
+    entries = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+    return [
+        {
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "tottime": round(tottime, 6),
+            "cumtime": round(cumtime, 6),
+        }
+        for (filename, line, name), (_primitive, calls, tottime, cumtime, _callers) in entries
+    ]
+
+
+def run_case(case: dict[str, Any], *, repeat: int, seed: int, profile_top: int) -> dict[str, Any]:
+    payload = _build_payload(case, seed)
+    generator = GENERATORS[case["kind"]]
+
+    # Warm-up: font metrics, logo decoding and module-level caches.
+    output = generator(payload) or b""
+
+    timings: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = generator(payload) or b""
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    generator(payload)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "case": _case_label(case),
+        **case,
+        "payload_rows": len(payload.get("rows") or payload.get("records") or payload.get("months") or []),
+        "repeat": repeat,
+        "seconds": [round(value, 6) for value in timings],
+        "min_seconds": round(min(timings), 6),
+        "median_seconds": round(statistics.median(timings), 6),
+        "mean_seconds": round(statistics.fmean(timings), 6),
+        "peak_traced_bytes": peak,
+        "output_bytes": len(output),
+        "pages": len(PAGE_OBJECT.findall(output)),
+    }
+    if profile_top:
+        result["profile"] = _profile(lambda: generator(payload), profile_top)
+    return result
+
+
+def _compare(results: list[dict[str, Any]], baseline_path: str) -> list[dict[str, Any]]:
+    with open(baseline_path, "r", encoding="utf-8") as handle:
+        baseline = {item["case"]: item for item in json.load(handle).get("results", [])}
+
+    comparison: list[dict[str, Any]] = []
+    for item in results:
+        before = baseline.get(item["case"])
+        if not before:
+            continue
+        comparison.append(
+            {
+                "case": item["case"],
+                "median_ratio": round(item["median_seconds"] / before["median_seconds"], 3) if before["median_seconds"] else None,
+                "peak_ratio": round(item["peak_traced_bytes"] / before["peak_traced_bytes"], 3) if before["peak_traced_bytes"] else None,
+                "bytes_ratio": round(item["output_bytes"] / before["output_bytes"], 3) if before["output_bytes"] else None,
+            }
+        )
+    return comparison
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark PDF rendering with synthetic report payloads.")
+    parser.add_argument("--kinds", type=lambda value: value.split(","), default=list(GENERATORS))
+    parser.add_argument("--employees", type=_int_list, default=[10, 100, 1200, 5000])
+    parser.add_argument("--days", type=_int_list, default=[1, 31, 366])
+    parser.add_argument("--sessions", type=_int_list, default=[4, 40])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=20260101)
+    parser.add_argument("--profile", action="store_true", help="include the top cumulative-time functions per case")
+    parser.add_argument("--profile-top", type=int, default=25)
+    parser.add_argument("--output", default="", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", default="", help="earlier JSON report to compute ratios against")
+    args = parser.parse_args(argv)
+
+    unknown = [kind for kind in args.kinds if kind not in GENERATORS]
+    if unknown:
+        parser.error(f"unknown kinds: {', '.join(unknown)}")
+
+    results: list[dict[str, Any]] = []
+    for case in _cases(args):
+        result = run_case(
+            case,
+            repeat=max(1, args.repeat),
+            seed=args.seed,
+            profile_top=args.profile_top if args.profile else 0,
+        )
+        results.append(result)
+        print(
+            f"{result['case']:<32} median {result['median_seconds']:8.3f}s  "
+            f"peak {result['peak_traced_bytes'] / 1048576:8.1f} MiB  "
+            f"{result['output_bytes'] / 1024:8.1f} KiB  {result['pages']} pages",
+            file=sys.stderr,
+        )
+
+    report: dict[str, Any] = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "reportlab": reportlab.Version,
+        "platform": platform.platform(),
+        "template_version": pdf_exports.PDF_TEMPLATE_VERSION,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.compare:
+        report["comparison"] = _compare(results, args.compare)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
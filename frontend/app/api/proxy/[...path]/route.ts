@@ -36,20 +36,17 @@ async function handler(request: NextRequest, context: RouteContext) {
   }
 
   const upstream = await fetch(targetUrl, requestInit);
-  const payload = await upstream.arrayBuffer();
 
   const responseHeaders = new Headers();
-  const upstreamType = upstream.headers.get("content-type");
-  const upstreamDisposition = upstream.headers.get("content-disposition");
-
-  if (upstreamType) {
-    responseHeaders.set("content-type", upstreamType);
-  }
-  if (upstreamDisposition) {
-    responseHeaders.set("content-disposition", upstreamDisposition);
+  // Forward the body as a stream so large PDF exports are never buffered here.
+  for (const name of ["content-type", "content-disposition", "content-length", "retry-after"]) {
+    const value = upstream.headers.get(name);
+    if (value) {
+      responseHeaders.set(name, value);
+    }
   }
 
-  return new NextResponse(payload, {
+  return new NextResponse(upstream.body, {
     status: upstream.status,
     headers: responseHeaders
   });
@@ -1,7 +1,7 @@
 "use client";
 
 import Image from "next/image";
-import { useCallback, useEffect, useMemo, useState } from "react";
+import { useCallback, useEffect, useMemo, useRef, useState } from "react";
 import { useRouter } from "next/navigation";
 import TimeStamp from "@/components/time-stamp";
 
@@ -99,15 +99,27 @@ type NotificationResult = {
   error: string | null;
 };
 
-type NotificationRunResponse = {
+type NotificationJobResponse = {
+  id: number;
+  status: "queued" | "running" | "sending" | "completed" | "failed";
   date: string;
+  card_no: string | null;
   total_targets: number;
   sent_count: number;
   skipped_count: number;
   failed_count: number;
+  pending_count: number;
   results: NotificationResult[];
+  error: string | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
 };
 
+const NOTIFICATION_POLL_MS = 1500;
+// Stop watching after this long; the job keeps running on the server.
+const NOTIFICATION_POLL_MAX_MS = 10 * 60 * 1000;
+
 type SMTPSettings = {
   host: string;
   port: number;
@@ -251,7 +263,8 @@ export default function DashboardClient() {
 
   const [notifyDate, setNotifyDate] = useState(today);
   const [notifyRunning, setNotifyRunning] = useState(false);
-  const [notifyResult, setNotifyResult] = useState<NotificationRunResponse | null>(null);
+  const notifyPollRef = useRef<AbortController | null>(null);
+  const [notifyResult, setNotifyResult] = useState<NotificationJobResponse | null>(null);
 
   const [smtpForm, setSmtpForm] = useState<SMTPSettings>({
     host: "",
@@ -640,7 +653,12 @@ export default function DashboardClient() {
     }
   }
 
+  useEffect(() => () => notifyPollRef.current?.abort(), []);
+
   async function runNotification(scope: "selected" | "all") {
+    notifyPollRef.current?.abort();
+    const controller = new AbortController();
+    notifyPollRef.current = controller;
     setNotifyRunning(true);
     setNotifyResult(null);
     setError("");
@@ -667,12 +685,46 @@ export default function DashboardClient() {
         throw new Error(payload?.detail ?? "Failed to run notifications");
       }
 
-      const payload = (await response.json()) as NotificationRunResponse;
-      setNotifyResult(payload);
+      let job = (await response.json()) as NotificationJobResponse;
+      setNotifyResult(job);
+
+      const pollUntil = Date.now() + NOTIFICATION_POLL_MAX_MS;
+      while (job.status !== "completed" && job.status !== "failed") {
+        if (Date.now() >= pollUntil) {
+          throw new Error(`Notification job ${job.id} is still running; check the notification log later.`);
+        }
+        await new Promise((resolve) => setTimeout(resolve, NOTIFICATION_POLL_MS));
+        if (controller.signal.aborted) {
+          return;
+        }
+        const pollResponse = await fetch(`/api/proxy/notifications/jobs/${job.id}`, {
+          cache: "no-store",
+          signal: controller.signal
+        });
+        if (await handleUnauthorized(pollResponse.status)) {
+          return;
+        }
+        if (!pollResponse.ok) {
+          const payload = (await pollResponse.json().catch(() => null)) as { detail?: string } | null;
+          throw new Error(payload?.detail ?? "Failed to check notification progress");
+        }
+        job = (await pollResponse.json()) as NotificationJobResponse;
+        setNotifyResult(job);
+      }
+
+      if (job.status === "failed") {
+        throw new Error(job.error ?? "Notification run failed");
+      }
     } catch (err) {
+      if (controller.signal.aborted) {
+        return;
+      }
       setError((err as Error).message || "Failed to run notifications");
     } finally {
-      setNotifyRunning(false);
+      if (notifyPollRef.current === controller) {
+        notifyPollRef.current = null;
+        setNotifyRunning(false);
+      }
     }
   }
 
@@ -1409,7 +1461,13 @@ export default function DashboardClient() {
                 </div>
               </div>
 
-              {notifyRunning ? <p className="text-sm text-zinc-400">Running notifications...</p> : null}
+              {notifyRunning ? (
+                <p className="text-sm text-zinc-400">
+                  {notifyResult?.status === "sending"
+                    ? `Sending notifications... ${notifyResult.pending_count} pending`
+                    : "Running notifications..."}
+                </p>
+              ) : null}
 
               {notifyResult ? (
                 <div className="space-y-3">
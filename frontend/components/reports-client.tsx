@@ -429,6 +429,20 @@ export default function ReportsClient() {
     return `/api/proxy/reports/${tab}/all?${params.toString()}`;
   }, [dailyDate, monthValue, tab, yearValue]);
 
+  const bundleExportUrl = useMemo(() => {
+    const params = new URLSearchParams();
+    if (tab === "daily") {
+      params.set("date", dailyDate);
+    }
+    if (tab === "monthly") {
+      params.set("month", monthValue);
+    }
+    if (tab === "yearly") {
+      params.set("year", yearValue);
+    }
+    return `/api/proxy/export/${tab}-bundle.zip?${params.toString()}`;
+  }, [dailyDate, monthValue, tab, yearValue]);
+
   async function saveEmployeeSetting() {
     const selectedEmployee = employees.find((item) => item.card_no === selectedCardNo);
     if (!selectedCardNo || !selectedEmployee) {
@@ -550,6 +564,14 @@ export default function ReportsClient() {
                   >
                     Export {tab.toUpperCase()} (All Employees)
                   </button>
+                  <button
+                    type="button"
+                    disabled={reportLoading}
+                    onClick={() => window.open(bundleExportUrl, "_blank", "noopener,noreferrer")}
+                    className="rounded-lg border border-cyan-500/60 bg-cyan-500/10 px-3 py-2 text-sm text-cyan-100 transition hover:bg-cyan-500/20 disabled:cursor-not-allowed disabled:opacity-50"
+                  >
+                    Download {tab.toUpperCase()} PDFs (ZIP)
+                  </button>
                 </div>
               </div>
             ) : null}
@@ -1,7 +1,7 @@
 "use client";
 
 import Link from "next/link";
-import { type FormEvent, useCallback, useEffect, useMemo, useState } from "react";
+import { type FormEvent, useCallback, useEffect, useMemo, useRef, useState } from "react";
 
 import AppHeader from "@/components/app-header";
 import { useAuthUser } from "@/components/use-auth-user";
@@ -50,15 +50,27 @@ type NotificationResult = {
   error: string | null;
 };
 
-type NotificationRunResponse = {
+type NotificationJobResponse = {
+  id: number;
+  status: "queued" | "running" | "sending" | "completed" | "failed";
   date: string;
+  card_no: string | null;
   total_targets: number;
   sent_count: number;
   skipped_count: number;
   failed_count: number;
+  pending_count: number;
   results: NotificationResult[];
+  error: string | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
 };
 
+const NOTIFICATION_POLL_MS = 1500;
+// Stop watching after this long; the job keeps running on the server.
+const NOTIFICATION_POLL_MAX_MS = 10 * 60 * 1000;
+
 type SettingsClientProps = {
   section: SettingsSection;
 };
@@ -103,7 +115,8 @@ export default function SettingsClient({ section }: SettingsClientProps) {
 
   const [notifyDate, setNotifyDate] = useState(todayIsoDate());
   const [notifyRunning, setNotifyRunning] = useState(false);
-  const [notifyResult, setNotifyResult] = useState<NotificationRunResponse | null>(null);
+  const notifyPollRef = useRef<AbortController | null>(null);
+  const [notifyResult, setNotifyResult] = useState<NotificationJobResponse | null>(null);
   const [notifyMessage, setNotifyMessage] = useState("");
   const [employeeSearch, setEmployeeSearch] = useState("");
   const [employees, setEmployees] = useState<Employee[]>([]);
@@ -392,7 +405,12 @@ export default function SettingsClient({ section }: SettingsClientProps) {
     }
   }
 
+  useEffect(() => () => notifyPollRef.current?.abort(), []);
+
   async function runNotifications(scope: "selected" | "all") {
+    notifyPollRef.current?.abort();
+    const controller = new AbortController();
+    notifyPollRef.current = controller;
     setNotifyRunning(true);
     setNotifyResult(null);
     setNotifyMessage("");
@@ -419,12 +437,46 @@ export default function SettingsClient({ section }: SettingsClientProps) {
         throw new Error(payload?.error ?? payload?.detail ?? "Failed to run notifications");
       }
 
-      const payload = (await response.json()) as NotificationRunResponse;
-      setNotifyResult(payload);
+      let job = (await response.json()) as NotificationJobResponse;
+      setNotifyResult(job);
+
+      const pollUntil = Date.now() + NOTIFICATION_POLL_MAX_MS;
+      while (job.status !== "completed" && job.status !== "failed") {
+        if (Date.now() >= pollUntil) {
+          throw new Error(`Notification job ${job.id} is still running; check the notification log later.`);
+        }
+        await new Promise((resolve) => setTimeout(resolve, NOTIFICATION_POLL_MS));
+        if (controller.signal.aborted) {
+          return;
+        }
+        const pollResponse = await fetch(`/api/proxy/notifications/jobs/${job.id}`, {
+          cache: "no-store",
+          signal: controller.signal
+        });
+        if (await handleUnauthorized(pollResponse.status)) {
+          return;
+        }
+        if (!pollResponse.ok) {
+          const payload = (await pollResponse.json().catch(() => null)) as { detail?: string; error?: string } | null;
+          throw new Error(payload?.error ?? payload?.detail ?? "Failed to check notification progress");
+        }
+        job = (await pollResponse.json()) as NotificationJobResponse;
+        setNotifyResult(job);
+      }
+
+      if (job.status === "failed") {
+        throw new Error(job.error ?? "Notification run failed");
+      }
     } catch (err) {
+      if (controller.signal.aborted) {
+        return;
+      }
       setNotifyMessage((err as Error).message || "Failed to run notifications");
     } finally {
-      setNotifyRunning(false);
+      if (notifyPollRef.current === controller) {
+        notifyPollRef.current = null;
+        setNotifyRunning(false);
+      }
     }
   }
 
@@ -755,7 +807,13 @@ export default function SettingsClient({ section }: SettingsClientProps) {
               {employeeLoading ? <p className="self-center text-xs text-zinc-500">Loading employees...</p> : null}
             </div>
 
-            {notifyRunning ? <p className="text-sm text-zinc-400">Running notifications...</p> : null}
+            {notifyRunning ? (
+              <p className="text-sm text-zinc-400">
+                {notifyResult?.status === "sending"
+                  ? `Sending notifications... ${notifyResult.pending_count} pending`
+                  : "Running notifications..."}
+              </p>
+            ) : null}
             {notifyMessage ? <p className="text-sm text-zinc-300">{notifyMessage}</p> : null}
             {selectedEmployee ? <p className="text-xs text-zinc-500">Selected: {selectedEmployee.employee_name}</p> : null}
 